@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 ContentAgent (7섹션 · 프롬프트 기반 · 이미지 바인딩 해석 · 의료광고 필터 · 로그 저장)
-- 입력: 최신 input/plan/title 결과 자동 탐색 또는 경로 지정
+- 입력: PipelineRun으로 직접 전달받거나, 최신 input/plan/title 결과 자동 탐색 또는 경로 지정
 - 프롬프트: test_prompt/content{1..7}_*.txt
 - 모델: Gemini (GEMINI_API_KEY 필요)
 - 저장:
@@ -19,7 +19,6 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # 상단에 추가
 import sys
@@ -35,6 +34,8 @@ if __package__ is None:
 
 # 이제 아래처럼 일반 임포트 사용
 from utils.html_converter import convert_content_to_html
+from utils.log_store import INPUT_LOG_PATTERNS, glob_input_logs, latest_entry, load_log
+from utils import phrase_lexicon
 
 # UI 모드에서 emote 이미지 가져오기 위한 import
 import sys
@@ -47,44 +48,10 @@ load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 if not API_KEY:
     raise RuntimeError("GEMINI_API_KEY가 필요합니다(.env)")
-genai.configure(api_key=API_KEY)
-
-class GeminiClient:
-    def __init__(self, model="models/gemini-1.5-flash", temperature=0.65, max_output_tokens=4096):
-        self.model = model
-        self.temperature = temperature
-        self.max_output_tokens = max_output_tokens
-        self.max_retries = 3
-        self.retry_delay = 1.0
-
-    def generate(self, prompt: str, temperature: Optional[float] = None) -> str:
-        for attempt in range(self.max_retries):
-            try:
-                m = genai.GenerativeModel(self.model)
-                resp = m.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=self.temperature if temperature is None else temperature,
-                        max_output_tokens=self.max_output_tokens,
-                        candidate_count=1,
-                        top_p=0.95,
-                        top_k=40,
-                    ),
-                )
-                if getattr(resp, "text", None):
-                    return resp.text
-                if getattr(resp, "candidates", None):
-                    parts = getattr(resp.candidates[0].content, "parts", [])
-                    if parts and getattr(parts[0], "text", ""):
-                        return parts[0].text
-                raise ValueError("응답에 text 없음")
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                print(f"⚠️ Gemini 호출 실패 (시도 {attempt+1}/{self.max_retries}): {e}")
-                time.sleep(self.retry_delay * (2 ** attempt))
-
-gem = GeminiClient()
+
+from llm import DeadlineExceeded, LLMClient
+
+gem = LLMClient("content")
 
 # =========================
 # 유틸 (시간/경로/로딩)
@@ -119,28 +86,23 @@ def _get(d: Dict[str, Any], path: str, default=None):
 # 최신 input 탐색 (신규/구형 모두)
 def _latest_input(mode: str) -> Tuple[Optional[Path], Optional[dict]]:
     day = Path(f"test_logs/{mode}/{_today()}")
-    patterns = ["*_input_logs.json", "*_input_log.json"]
-    for pat in patterns:
+    for pat in INPUT_LOG_PATTERNS:
         hits = sorted(day.glob(pat), key=_mtime, reverse=True)
         if hits:
             p = hits[0]
             try:
-                data = _json_load(p)
-                if isinstance(data, list) and data:
-                    return p, data[-1]
-                if isinstance(data, dict):
-                    return p, data
+                row = latest_entry(p)
+                if row is not None:
+                    return p, row
             except Exception:
                 pass
     root = Path(f"test_logs/{mode}")
     if not root.exists(): return None, None
-    all_hits = sorted(list(root.rglob("*_input_logs.json")) + list(root.rglob("*_input_log.json")), key=_mtime, reverse=True)
+    all_hits = sorted(glob_input_logs(root, recursive=True), key=_mtime, reverse=True)
     if not all_hits: return None, None
     p = all_hits[0]
-    data = _json_load(p)
-    if isinstance(data, list) and data: return p, data[-1]
-    if isinstance(data, dict): return p, data
-    return None, None
+    row = latest_entry(p)
+    return (p, row) if row is not None else (None, None)
 
 def _latest_plan(mode: str) -> Optional[Path]:
     day = Path(f"test_logs/{mode}/{_today()}")
@@ -196,7 +158,8 @@ FORBIDDEN = [
     r"\b100%\b", r"무통증", r"완치", r"유일", r"최고", r"즉시\s*효과", r"파격", r"이벤트", r"특가",
     r"\d+\s*원", r"\d+\s*만원", r"가격\s*", r"전화\s*\d", r"http[s]?://", r"www\."
 ]
-FORBIDDEN_RE = re.compile("|".join(FORBIDDEN))
+phrase_lexicon.register("content_forbidden", FORBIDDEN)
+FORBIDDEN_RE = phrase_lexicon.combined("content_forbidden")
 
 def _clean_output(text: str) -> str:
     s = (text or "").strip()
@@ -207,7 +170,7 @@ def _clean_output(text: str) -> str:
     s = re.sub(r"[ \t]+\n", "\n", s)
     s = re.sub(r"\n{3,}", "\n\n", s)
     # 금칙어 간단 마스킹(완전 삭제 대신 안전표기)
-    s = FORBIDDEN_RE.sub(lambda _: "(광고성 문구 제거)", s)
+    s = phrase_lexicon.sub("content_forbidden", s, lambda _: "(광고성 문구 제거)")
     return s
 
 def _improve_readability(text: str) -> str:
@@ -284,8 +247,22 @@ import random
 GIF_DIR = Path("test_data/test_image/gif")
 
 _EMOTICON_MARK_RE = re.compile(r"\((행복|슬픔|신남|화남|일반|마무리|눈물)\)")
-# 게시글 단위로 동물 고정 & 풀 캐시
-_SESSION: Dict[str, Any] = {"animal": None, "pool": None}
+# 게시글 단위로 동물 고정 (스레드별 → 동시에 생성되는 게시글끼리 섞이지 않음)
+import threading
+
+class _PostSession(threading.local):
+    def __init__(self):
+        self.state: Dict[str, Any] = {"animal": None}
+
+_POST = _PostSession()
+
+def _session() -> Dict[str, Any]:
+    return _POST.state
+
+# GIF 풀은 프로세스 공용 캐시 ((use_airtable, ui_mode)별, GIF_POOL_TTL_SEC 동안 재사용)
+GIF_POOL_TTL_SEC = float(os.getenv("GIF_POOL_TTL_SEC", "600"))
+_GIF_POOLS: Dict[Tuple[bool, bool], Tuple[float, Dict[str, Dict[str, List[Dict[str, str]]]]]] = {}
+_GIF_POOL_LOCK = threading.Lock()
 
 def _scan_gif_pool_local() -> Dict[str, Dict[str, List[Dict[str, str]]]]:
     """로컬 파일 시스템에서 GIF 스캔"""
@@ -318,12 +295,10 @@ def _scan_gif_pool_airtable() -> Dict[str, Dict[str, List[Dict[str, str]]]]:
         from dotenv import load_dotenv
         load_dotenv()
         
-        from pyairtable import Api
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Emote Images')
+        from utils.airtable_gateway import cached_all
         
-        # Active 필드가 빈 값이므로 모든 레코드 가져오기
-        records = table.all()
+        # Active 필드가 빈 값이므로 모든 레코드 가져오기 (TTL 캐시)
+        records = cached_all('Emote Images')
         
         for record in records:
             fields = record['fields']
@@ -444,15 +419,26 @@ def _pick_gif_by(animal: str, category: str, pool: Dict[str, Dict[str, List[Dict
     return random.choice(candidates)
 
 def _gif_pool_cached(use_airtable: bool = False, ui_mode: bool = False) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
-    """캐시된 GIF 풀 반환"""
-    if _SESSION["pool"] is None:
-        _SESSION["pool"] = _scan_gif_pool(use_airtable=use_airtable, ui_mode=ui_mode)
-    return _SESSION["pool"]
+    """캐시된 GIF 풀 반환 (읽기 전용으로 공유)"""
+    key = (use_airtable, ui_mode)
+    hit = _GIF_POOLS.get(key)
+    if hit and time.time() - hit[0] < GIF_POOL_TTL_SEC:
+        return hit[1]
+    with _GIF_POOL_LOCK:
+        hit = _GIF_POOLS.get(key)
+        if hit and time.time() - hit[0] < GIF_POOL_TTL_SEC:
+            return hit[1]
+        pool = _scan_gif_pool(use_airtable=use_airtable, ui_mode=ui_mode)
+        _GIF_POOLS[key] = (time.time(), pool)
+        return pool
+
+def warmup_gif_pool(use_airtable: bool = True, ui_mode: bool = True):
+    """배치/서버 기동 시 GIF 풀 미리 로딩"""
+    return _gif_pool_cached(use_airtable=use_airtable, ui_mode=ui_mode)
 
 def _reset_gif_session():
-    """새 게시글 시작 시 GIF 세션 초기화"""
-    _SESSION["animal"] = None
-    _SESSION["pool"] = None
+    """새 게시글 시작 시 GIF 세션(동물 고정) 초기화"""
+    _POST.state = {"animal": None}
 
 def _inject_emoticons_inline(text: str, sec_key: str, use_airtable: bool = False, ui_mode: bool = False) -> Tuple[str, List[Dict[str, str]]]:
     """
@@ -473,7 +459,7 @@ def _inject_emoticons_inline(text: str, sec_key: str, use_airtable: bool = False
         if sec_key == "7_conclusion":
             if tag != "마무리":
                 return ""  # 다른 마커는 제거
-            animal = _SESSION.get("animal")
+            animal = _session().get("animal")
             if not animal:
                 return ""  # 앞 섹션에서 동물 확정 안 됨 → 삽입 안 함
             media = _pick_gif_by(animal, "마무리", pool)
@@ -488,12 +474,12 @@ def _inject_emoticons_inline(text: str, sec_key: str, use_airtable: bool = False
             return f"({media['url']})"
 
         # 섹션 1~6: 동물 없으면 지금 랜덤 고정
-        animal = _SESSION.get("animal")
+        animal = _session().get("animal")
         if not animal:
             if not pool:
                 return ""  # 풀 비어있으면 제거
             animal = random.choice(list(pool.keys()))
-            _SESSION["animal"] = animal
+            _session()["animal"] = animal
 
         # 카테고리 선택: '마무리' 마커가 1~6에 오면 '일반'로 처리
         desired = "일반" if tag == "마무리" else tag
@@ -517,28 +503,20 @@ def _inject_emoticons_inline(text: str, sec_key: str, use_airtable: bool = False
 # =========================
 # [NEW] 전역 dedup/경로정규화/해시/페어링 유틸
 # =========================
-import hashlib  # [NEW]
-
 def _norm_path(p: str) -> str:  # [NEW]
     p = (p or "").strip().replace("\\", "/")
     p = re.sub(r"[?#].*$", "", p)  # 쿼리/프래그먼트 제거
     return p.lower()
 
-def _file_hash_safe(p: str) -> Optional[str]:  # [NEW]
+def _dedup_key_for_image(im: Dict[str, str]) -> str:  # [NEW]
     """
-    동일 파일이 경로만 다른 복사본일 수 있어, 해시를 우선 키로 사용(선택).
-    실패 시 None 반환하여 경로 기반으로 대체.
+    동일 이미지가 경로만 다른 복사본일 수 있어 지문을 우선 키로 사용
+    - Airtable 첨부는 attachment id, 로컬 파일은 내용 해시(크기/mtime 기준 캐시 → 파일은 1번만 읽음)
+    - URL이거나 읽을 수 없으면 정규화 경로로 대체
     """
-    try:
-        with open(p, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except Exception:
-        return None
-
-def _dedup_key_for_image(im: Dict[str, str]) -> str:  # [NEW]
-    path = _norm_path(im.get("path", ""))
-    h = _file_hash_safe(path)
-    return f"hash:{h}" if h else f"path:{path}"
+    from utils.image_fingerprint import fingerprint
+    path = im.get("path", "") or ""
+    return fingerprint(path, im.get("attachment_id", "") or "") or f"path:{_norm_path(path)}"
 
 def _limit_for_section(sec_key: str) -> int:  # [NEW]
     return {
@@ -654,7 +632,7 @@ def _resolve_images_for_section(plan_sec: Dict[str, Any], input_row: Dict[str, A
             
             # 동물 한 번 고정 (선호 동물이 오면 그걸 우선)
             preferred_animal = b.get("animal")  # 예: "토끼" / "햄스터" 등
-            animal = _pick_animal_once(_SESSION, pool, preferred=preferred_animal)
+            animal = _pick_animal_once(_session(), pool, preferred=preferred_animal)
             
             if animal:
                 # 카테고리 후보: category_try > category > 기본 ["일반"]
@@ -731,7 +709,12 @@ def _resolve_images_for_section(plan_sec: Dict[str, Any], input_row: Dict[str, A
             # URL이 있으면 별도로도 저장
             if url:
                 entry["url"] = url
-            
+
+            # Airtable 첨부 id (이미지 중복 제거 키 — 서명 URL은 재발급마다 바뀜)
+            attachment_id = it.get("attachment_id", "")
+            if attachment_id:
+                entry["attachment_id"] = attachment_id
+
             desc = it.get("description", "")
             if desc:  # 값이 있을 때만 추가
                 entry["alt"] = desc 
@@ -894,6 +877,51 @@ def _save_json(mode: str, name: str, payload: dict) -> Path:
     p.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     return p
 
+# =========================
+# 섹션 병렬 생성
+# =========================
+# 섹션 프롬프트는 서로의 출력에 의존하지 않으므로 LLM 호출만 병렬로 실행하고,
+# 후처리(이모티콘 치환 · 이미지 dedup)는 섹션 순서대로 직렬 처리해 결과를 결정적으로 유지
+SECTION_CONCURRENCY = int(os.getenv("CONTENT_SECTION_CONCURRENCY", "4"))
+# 진행 이벤트 구독자가 있을 때 섹션 텍스트를 토큰(조각) 단위로도 전달
+STREAM_TOKENS = os.getenv("CONTENT_STREAM_TOKENS", "0") == "1"
+
+def _generate_section(prompt: str, on_token=None) -> Optional[str]:
+    """섹션 1개 생성 (데드라인 초과 시 None → 호출 측에서 plan 요약으로 대체)"""
+    try:
+        return gem.generate(prompt, on_token=on_token)
+    except DeadlineExceeded as e:
+        print(f"⚠️ 섹션 생성 데드라인 초과: {e}")
+        return None
+
+def _generate_sections(prompts: Dict[str, str], order: List[str], max_workers: Optional[int] = None,
+                       on_section=None, on_token=None) -> Dict[str, Optional[str]]:
+    """
+    섹션별 프롬프트를 동시 호출해 {섹션키: raw 텍스트} 반환 (실패 시 첫 예외를 그대로 전파)
+    - 데드라인을 넘긴 섹션은 None
+    - on_section(key, raw): 섹션 하나가 끝날 때마다 (완료 순서대로) 호출
+    - on_token(key, piece): 스트리밍 조각 콜백
+    """
+    def _one(k: str) -> Optional[str]:
+        raw = _generate_section(prompts[k], (lambda piece: on_token(k, piece)) if on_token else None)
+        if on_section:
+            on_section(k, raw)
+        return raw
+
+    workers = max(1, min(max_workers or SECTION_CONCURRENCY, len(order) or 1))
+    if workers == 1:
+        return {k: _one(k) for k in order}
+
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="content-section") as ex:
+        # 단계 데드라인(contextvar)이 워커 스레드에도 적용되도록 섹션마다 컨텍스트 복사
+        futures = {k: ex.submit(contextvars.copy_context().run, _one, k) for k in order}
+        raws = {k: futures[k].result() for k in order}
+    print(f"⚡ 섹션 {len(order)}개 병렬 생성 완료 (동시 {workers}개, {time.time() - t0:.1f}s)")
+    return raws
+
 # =========================
 # 실행
 # =========================
@@ -902,30 +930,39 @@ def run(mode: str = DEF_MODE,
         plan_path: Optional[str|Path] = None,
         title_path: Optional[str|Path] = None,
         use_airtable: bool = True,
-        ui_mode: bool = True) -> Dict[str, Any]:
+        ui_mode: bool = True,
+        pipeline_run=None,
+        section_concurrency: Optional[int] = None) -> Dict[str, Any]:
 
     # 0) GIF 세션 초기화 (새 게시글 시작)
     _reset_gif_session()
     
-    # 1) 입력 수집
-    if input_path:
-        inp_path = Path(input_path); inp_row = _json_load(inp_path)
+    # 1) 입력 수집 (PipelineRun이 주어지면 파일 탐색 없이 run의 input/plan/title 사용)
+    pr = pipeline_run
+    if not input_path and pr is not None and pr.input_row is not None:
+        inp_row, inp_src = pr.input_row, pr.input_source
+    elif input_path:
+        inp_path = Path(input_path); inp_row = load_log(inp_path)
         if isinstance(inp_row, list) and inp_row: inp_row = inp_row[-1]
         inp_src = str(inp_path)
     else:
         found_path, row = _latest_input(mode)
         if row is None:
-            raise FileNotFoundError("최신 *_input_log(s).json을 찾지 못했습니다. 먼저 InputAgent를 실행하세요.")
+            raise FileNotFoundError("최신 *_input_log(s).json(l)을 찾지 못했습니다. 먼저 InputAgent를 실행하세요.")
         inp_row, inp_src = row, str(found_path)
 
-    if plan_path:
+    if not plan_path and pr is not None and pr.plan is not None:
+        plan, plan_src = pr.plan, pr.artifacts.get("plan", "(in-memory)")
+    elif plan_path:
         plan = _json_load(Path(plan_path)); plan_src = plan_path
     else:
         p = _latest_plan(mode)
         if not p: raise FileNotFoundError("최신 *_plan.json을 찾지 못했습니다. 먼저 PlanAgent를 실행하세요.")
         plan = _json_load(p); plan_src = str(p)
 
-    if title_path:
+    if not title_path and pr is not None and pr.title is not None:
+        title_obj, title_src = pr.title, pr.artifacts.get("title", "(in-memory)")
+    elif title_path:
         title_obj = _json_load(Path(title_path)); title_src = title_path
     else:
         t = _latest_title(mode)
@@ -943,10 +980,29 @@ def run(mode: str = DEF_MODE,
 
     used_image_keys: set = set()  # [NEW] 전역 dedup 키 저장소
 
+    # 3-1) 프롬프트 구성 → LLM 병렬 호출
+    prompts = {k: _build_section_prompt(k, sections_plan.get(k, {}), base_ctx) for k in order}
+    on_section = on_token = None
+    if pr is not None and pr.has_listeners:
+        def on_section(k: str, raw: Optional[str]):
+            text = _improve_readability(_clean_output(raw)) if raw is not None else sections_plan.get(k, {}).get("summary", "")
+            pr.emit("section", key=k, title=SECTION_TITLE_MAP.get(k, k), text=text, fallback=raw is None)
+        if STREAM_TOKENS:
+            def on_token(k: str, piece: str):
+                pr.emit("section_token", key=k, text=piece)
+    raws = _generate_sections(prompts, order, section_concurrency, on_section, on_token)
+    timed_out = [k for k in order if raws[k] is None]
+    if timed_out and pr is not None:
+        pr.degrade("content", "section_summary_fallback", f"섹션 {', '.join(timed_out)}")
+
+    # 3-2) 후처리는 섹션 순서대로 (동물 고정 · 전역 dedup 순서 보존)
     for k in order:
         sec_plan = sections_plan.get(k, {})
-        prompt = _build_section_prompt(k, sec_plan, base_ctx)
-        raw = gem.generate(prompt)
+        prompt = prompts[k]
+        raw = raws[k]
+        if raw is None:
+            # 시간 예산 초과 섹션은 plan 요약으로 대체
+            raw = sec_plan.get("summary", "") or ""
         text = _clean_output(raw)
         text = _improve_readability(text)  # ← 추가
         # ✅ 이모티콘 마커 치환을 섹션별로 적용
@@ -972,6 +1028,7 @@ def run(mode: str = DEF_MODE,
             "prompt_rendered_preview": prompt[:1200],
             "llm_raw_preview": raw[:1200],
             "used_summary": sec_plan.get("summary", ""),
+            "summary_fallback": k in timed_out,
             "resolved_images": images,
         }
 
@@ -1026,6 +1083,12 @@ def run(mode: str = DEF_MODE,
     }
     log_path = _save_json(mode, "content_log", log)
 
+    if pr is not None:
+        pr.content = result
+        pr.set_artifact("content", out_path)
+        pr.set_artifact("content_html", html_path)
+        pr.set_artifact("content_txt", txt_path)
+
     print(f"✅ Content 저장: {out_path}")
     print(f"🧾 로그 저장: {log_path}")
     print(f"📝 복붙용 TXT 저장: {txt_path}")
@@ -1036,14 +1099,16 @@ if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser(description="ContentAgent — plan/title/input 기반 7섹션 본문 생성")
     ap.add_argument("--mode", default=DEF_MODE, choices=["test","use"])
-    ap.add_argument("--input", default="", help="*_input_log(s).json 경로(미지정 시 최신)")
+    ap.add_argument("--input", default="", help="*_input_log(s).json(l) 경로(미지정 시 최신)")
     ap.add_argument("--plan",  default="", help="*_plan.json 경로(미지정 시 최신)")
     ap.add_argument("--title", default="", help="*_title.json 경로(미지정 시 최신)")
     ap.add_argument("--use-airtable", action="store_true", help="Airtable에서 GIF 이모티콘 로드 (기본: 로컬)")
+    ap.add_argument("--concurrency", type=int, default=0, help="섹션 동시 생성 수 (기본: CONTENT_SECTION_CONCURRENCY 또는 4)")
     args = ap.parse_args()
 
     run(mode=args.mode,
         input_path=(args.input or None),
         plan_path=(args.plan or None),
         title_path=(args.title or None),
-        use_airtable=args.use_airtable)
\ No newline at end of file
+        use_airtable=args.use_airtable,
+        section_concurrency=(args.concurrency or None))
\ No newline at end of file
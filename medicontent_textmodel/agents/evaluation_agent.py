@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
 EvaluationAgent (FINAL) - 통합 평가 시스템
-- 프롬프트: test_prompt/llm_evaluation_prompt.txt, seo_evaluation_prompt.txt, llm_regeneration_prompt.txt
+- 프롬프트: test_prompt/llm_evaluation_prompt.txt, seo_evaluation_prompt.txt, llm_regeneration_prompt.txt, llm_delta_evaluation_prompt.txt
 - 로그: 기본 test_logs/use/ (CLI로 변경 가능)
 - 기준: test_data/evaluation_criteria.json (의료법), seo_evaluation_criteria.json (SEO)
 - 체크리스트 CSV: test_data/medical_ad_checklist.csv (또는 /mnt/test_data/medical_ad_checklist.csv)
@@ -15,6 +15,7 @@ EvaluationAgent (FINAL) - 통합 평가 시스템
 5) 우선순위 가중 총점: 의료법(0~100), SEO(합계)
 6) 임계 비교: evaluation_criteria.json(엄격/표준/유연), seo_criteria.json(우수/양호/보통)
 7) 재생성 프롬프트 적용 → 재평가, Regen-Fit(0~100) 산출
+   재평가는 바뀐 문단만 다시 계산 (규칙/SEO 측정값 문단 캐시, LLM은 위반 항목 위주 재채점)
 8) 통합 평가: 의료법 + SEO 동시 실행 (기본값)
 
 평가 모드
@@ -32,20 +33,28 @@ CLI
 
 import os
 import re
+import sys
 import csv
 import json
+import time
+import threading
 import argparse
+import weakref
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Union, Iterable
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union, Iterable
 
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 
 
 # ===== 경로 기본 =====
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from utils import phrase_lexicon
 DEFAULT_LOG_DIR = ROOT / "test_logs" / "use"
 PROMPTS_DIR = ROOT / "test_prompt"
 DATA_DIR = ROOT / "test_data"
@@ -141,6 +150,9 @@ def generate_ui_checklist_logs(evaluation_data: Dict[str, Any], base_log_path: s
         checklist.append(checklist_item)
     
     # 파일명 생성 (before/after/declined 패턴 지원)
+    # 통합 평가의 모드 태그({ts}_legal_evaluation.json 등)는 제거 → UI checklist 파일명 규칙 유지
+    log_path = Path(base_log_path)
+    base_log_path = str(log_path.with_name(re.sub(r'_(?:legal|seo)(?=_evaluation)', '', log_path.name)))
     if is_seo:
         if '_evaluation_before.json' in base_log_path:
             ui_log_path = base_log_path.replace('_evaluation_before.json', '_seo_ui_checklist_before.json')
@@ -180,8 +192,352 @@ def generate_ui_checklist_logs(evaluation_data: Dict[str, Any], base_log_path: s
         return None
 
 # ===== DB 업데이트 함수 =====
-def auto_update_medicontent_posts(evaluation_data: Dict[str, Any], evaluation_file_path: str) -> bool:
-    """evaluation 완료 후 자동으로 Medicontent Posts 테이블 업데이트"""
+def _post_id_from_log_entry(entry: Dict[str, Any]) -> Union[str, None]:
+    """input 로그 엔트리에서 PostID 추출 (post_ 접두사 보정)"""
+    for key in ['actualPostDataRequestPostIdFull', 'medicontentPostId', 'postId']:
+        if key in entry and entry[key]:
+            post_id = str(entry[key])
+            if not post_id.startswith('post_'):
+                post_id = f"post_{post_id}"
+            return post_id
+    return None
+
+def _find_content_for_update(evaluation_file_path: str, pipeline_run=None) -> Tuple[Union[Path, None], Union[str, None]]:
+    """평가 결과에 대응하는 content.json과 PostID 확정 (run 우선, 없으면 로그 폴더 스캔)"""
+    if pipeline_run is not None and pipeline_run.artifacts.get("content"):
+        content_file = Path(pipeline_run.artifacts["content"])
+        matched_post_id = _post_id_from_log_entry(pipeline_run.input_row or {})
+        if matched_post_id:
+            print(f"✅ run 기반 Content 파일: {content_file} (PostID: {matched_post_id})")
+            return content_file, matched_post_id
+
+    # PostID 기반 매칭으로 content.json 찾기 (기존/새로운 경로 구조 모두 고려)
+    eval_dir = Path(evaluation_file_path).parent
+    base_use_dir = ROOT / "test_logs" / "use"
+    
+    search_dirs = [
+        eval_dir,  # 현재 evaluation 파일이 있는 폴더
+        eval_dir.parent if eval_dir.parent != base_use_dir else eval_dir,  # 상위 폴더
+        base_use_dir,  # test_logs/use/
+        base_use_dir / "results",  # 기존 results/ 폴더
+    ]
+    
+    # 모든 날짜 폴더들도 추가 (YYYYMMDD 형태)
+    if base_use_dir.exists():
+        for date_dir in base_use_dir.iterdir():
+            if date_dir.is_dir() and date_dir.name.isdigit() and len(date_dir.name) == 8:
+                search_dirs.append(date_dir)
+    
+    # results 폴더의 모든 날짜/타임스탬프 폴더들도 추가
+    results_dir = base_use_dir / "results" 
+    if results_dir.exists():
+        for sub_dir in results_dir.iterdir():
+            if sub_dir.is_dir():
+                search_dirs.append(sub_dir)
+    
+    # 모든 디렉토리에서 content.json 파일들 스캔 (최신순)
+    all_content_files = []
+    for search_dir in search_dirs:
+        if search_dir.exists():
+            all_content_files.extend(list(search_dir.glob("**/*_content.json")))
+    
+    # 중복 제거 및 최신순 정렬
+    content_files = sorted(list(set(all_content_files)), key=lambda x: x.stat().st_mtime, reverse=True)
+    
+    for cf in content_files:
+        try:
+            with open(cf, 'r', encoding='utf-8') as f:
+                content_data = json.load(f)
+            
+            # content.json에서 input_source 추출
+            input_source = content_data.get("meta", {}).get("input_source", "")
+            if not input_source:
+                continue
+            
+            # input_source 경로를 절대 경로로 변환
+            if not Path(input_source).is_absolute():
+                input_file = ROOT / input_source
+            else:
+                input_file = Path(input_source)
+            
+            if not input_file.exists():
+                continue
+            
+            # input_source에서 PostID 추출 (.jsonl / .json 모두)
+            from utils.log_store import load_log
+            input_logs = load_log(input_file)
+            
+            # PostID 추출 로직
+            post_id = None
+            if isinstance(input_logs, list) and input_logs:
+                for log_entry in input_logs:
+                    if isinstance(log_entry, dict):
+                        post_id = _post_id_from_log_entry(log_entry)
+                        if post_id:
+                            break
+            elif isinstance(input_logs, dict):
+                post_id = _post_id_from_log_entry(input_logs)
+            
+            if post_id:
+                print(f"✅ PostID 기반 Content 파일 발견: {cf}")
+                print(f"🔍 추출된 PostID: {post_id}")
+                return cf, post_id
+                
+        except Exception as e:
+            continue
+    
+    return None, None
+
+def _find_ui_checklist_json(timestamp: str, is_seo_score: bool, evaluation_file_path: str) -> str:
+    """해당 타임스탬프의 UI checklist 로그 내용 (기존/새로운 구조 모두 지원, 없으면 빈 문자열)"""
+    kind = "seo" if is_seo_score else "legal"
+    ui_patterns = [
+        f"{timestamp}_{kind}_ui_checklist_after.json",
+        f"{timestamp}_{kind}_ui_checklist_before.json",
+        f"{timestamp}_{kind}_ui_checklist_declined.json",
+        f"{timestamp}_{kind}_ui_checklist.json"
+    ]
+    
+    # UI checklist 파일을 찾을 검색 디렉토리들
+    eval_dir = Path(evaluation_file_path).parent
+    base_use_dir = ROOT / "test_logs" / "use"
+    ui_search_dirs = [
+        eval_dir,  # 현재 폴더
+        eval_dir.parent,  # 상위 폴더
+        base_use_dir,  # test_logs/use/
+        base_use_dir / "results",  # results/ 폴더
+    ]
+    
+    # 모든 날짜 폴더와 results의 하위 폴더들도 추가
+    if base_use_dir.exists():
+        for date_dir in base_use_dir.iterdir():
+            if date_dir.is_dir() and date_dir.name.isdigit() and len(date_dir.name) == 8:
+                ui_search_dirs.append(date_dir)
+    
+    results_dir = base_use_dir / "results"
+    if results_dir.exists():
+        for sub_dir in results_dir.iterdir():
+            if sub_dir.is_dir():
+                ui_search_dirs.append(sub_dir)
+    
+    ui_files = []
+    for pattern in ui_patterns:
+        for search_dir in ui_search_dirs:
+            if search_dir.exists():
+                ui_files.extend(list(search_dir.glob(pattern)))
+        if ui_files:
+            break
+    
+    if not ui_files:
+        print(f"⚠️ UI checklist 파일을 찾을 수 없습니다: {ui_patterns}")
+        print("   체크리스트 파일이 없어도 점수는 업데이트합니다.")
+        return ""
+    
+    print(f"✅ UI checklist 파일 발견: {ui_files[0]}")
+    return ui_files[0].read_text(encoding='utf-8')
+
+def _push_evaluation_scores(post_id: str, content_file: Path, score_entries: List[Dict[str, Any]]) -> bool:
+    """
+    Medicontent Posts / Post Reviews에 평가 점수 반영 (Airtable 쓰기 1회씩)
+    score_entries: [{"kind": "seo"|"legal", "total": 점수, "criteria": 기준, "checklist_json": 문자열}]
+    """
+    # content.json과 같은 디렉토리에서 HTML 파일 찾기
+    content_dir = content_file.parent
+    content_stem = content_file.stem.replace("_content", "")  # 타임스탬프 부분 추출
+    
+    html_files = []
+    html_patterns = [
+        f"{content_stem}.html",
+        f"{content_stem}_content.html", 
+        f"{content_stem}_result.html"
+    ]
+    
+    for pattern in html_patterns:
+        html_files.extend(list(content_dir.glob(pattern)))
+        if html_files:
+            break
+    
+    html_file = html_files[0] if html_files else None
+    if html_file:
+        print(f"✅ HTML 파일 발견: {html_file}")
+    else:
+        print(f"⚠️ content.json과 연관된 HTML 파일을 찾을 수 없습니다.")
+        print(f"   검색한 패턴: {html_patterns}")
+    
+    print(f"🔍 사용할 PostID: {post_id}")
+    
+    # Medicontent Posts 및 Post Reviews 테이블 업데이트
+    load_dotenv()
+    
+    try:
+        from utils.airtable_gateway import get_table
+        
+        posts_table = get_table('Medicontent Posts')
+        reviews_table = get_table('Post Reviews')
+        
+        # PostID로 직접 매칭
+        print(f"🔍 Medicontent Posts에서 PostID '{post_id}'와 매칭되는 레코드 검색...")
+        
+        matched_record = None
+        
+        # PostID 필드로 필터링하여 레코드 검색
+        records = posts_table.all(formula=f"{{Post Id}} = '{post_id}'")
+        
+        if records:
+            matched_record = records[0]
+            print(f"✅ PostID 매칭 성공!")
+            print(f"   찾은 PostID: {post_id}")
+            print(f"   Record ID: {matched_record['id']}")
+        else:
+            print(f"❌ PostID '{post_id}'에 해당하는 레코드를 찾을 수 없습니다.")
+            
+            # 디버깅: 전체 레코드 목록 출력
+            all_records = posts_table.all()
+            print("📋 전체 Medicontent Posts 레코드 목록:")
+            for i, record in enumerate(all_records[:10]):  # 처음 10개만 출력
+                record_post_id = record['fields'].get('Post Id', '')
+                title = record['fields'].get('Title', '')[:50] if record['fields'].get('Title') else ''
+                print(f"   {i+1}. PostID: '{record_post_id}', Title: '{title}...'")
+                if i > 5:  # 너무 많으면 생략
+                    print(f"   ... ({len(all_records) - 10}개 더)")
+                    break
+            return False
+        
+        record_id = matched_record['id']
+        
+        # HTML 파일에서 제목과 본문 추출
+        title = ""
+        content = ""
+        if html_file:
+            title, content = extract_title_and_content_from_html(str(html_file))
+        else:
+            print("⚠️ HTML 파일이 없어 제목과 본문을 추출할 수 없습니다.")
+        
+        # 현재 레코드에서 기존 SEO Score와 Legal Score 확인
+        current_fields = matched_record['fields']
+        existing_seo_score = current_fields.get('SEO Score')
+        existing_legal_score = current_fields.get('Legal Score')
+        current_status = current_fields.get('Status', '')
+        
+        is_seo_score = any(e["kind"] == "seo" for e in score_entries)
+        is_legal_score = any(e["kind"] == "legal" for e in score_entries)
+        
+        print(f"📊 현재 레코드 상태:")
+        print(f"   기존 SEO Score: {existing_seo_score} ({'있음' if existing_seo_score else '없음'})")
+        print(f"   기존 Legal Score: {existing_legal_score} ({'있음' if existing_legal_score else '없음'})")
+        print(f"   현재 Status: '{current_status}'")
+        print(f"🔍 이번 평가 타입 - is_seo_score: {is_seo_score}, is_legal_score: {is_legal_score}")
+        
+        # HTML ID 생성 (content 파일명에서 추출)
+        html_id = content_file.stem  # ex: 20250825_205923_content
+        
+        # 업데이트할 데이터 준비 (Status는 나중에 결정)
+        update_data = {
+            'HTML ID': html_id
+        }
+        
+        # 제목과 본문 추가
+        if title:
+            update_data['Title'] = title
+            print(f"📝 제목 추가: {title[:50]}...")
+        
+        if content:
+            update_data['Content'] = content
+            print(f"📝 HTML 본문 추가: {len(content)}자 (전체 HTML 파일)")
+        
+        # SEO Score / Legal Score 추가
+        for entry in score_entries:
+            if entry["kind"] == "seo":
+                update_data['SEO Score'] = entry["total"]
+                print(f"📈 SEO Score 설정: {entry['total']} (criteria: {entry['criteria']})")
+            else:
+                update_data['Legal Score'] = entry["total"]
+                print(f"⚖️ Legal Score 설정: {entry['total']} (criteria: {entry['criteria']})")
+        
+        # 둘 다 있을 때만 작업 완료로 변경
+        will_have_seo = existing_seo_score or is_seo_score
+        will_have_legal = existing_legal_score or is_legal_score
+        
+        print(f"🔄 Score 상태 확인:")
+        print(f"   이번에 추가할 SEO Score: {'있음' if is_seo_score else '없음'}")
+        print(f"   이번에 추가할 Legal Score: {'있음' if is_legal_score else '없음'}")
+        print(f"   결과 - will_have_seo: {will_have_seo}, will_have_legal: {will_have_legal}")
+        
+        if will_have_seo and will_have_legal:
+            update_data['Status'] = '작업 완료'
+            print(f"✅ SEO Score와 Legal Score 모두 있음 → Status: '작업 완료'로 변경")
+        else:
+            print(f"⏳ 아직 한쪽 Score만 있음 → Status 유지 ('{current_status}')")
+            print(f"   SEO Score: {'✅' if will_have_seo else '❌'}")
+            print(f"   Legal Score: {'✅' if will_have_legal else '❌'}")
+        
+        # Airtable 업데이트 실행 - Medicontent Posts
+        posts_table.update(record_id, update_data)
+        
+        # Post Reviews 테이블도 업데이트
+        try:
+            # 기존 Post Review 레코드 검색
+            existing_reviews = reviews_table.all(formula=f"{{Post ID}} = '{post_id}'")
+            
+            # Post Reviews 업데이트 데이터 준비
+            review_update_data = {
+                'Reviewer': '리걸케어',
+                'Reviewed At': datetime.now().isoformat()
+            }
+            
+            for entry in score_entries:
+                checklist_json = entry.get("checklist_json", "")
+                if entry["kind"] == "seo":
+                    review_update_data['SEO Score'] = entry["total"]
+                    if checklist_json:
+                        review_update_data['SEO Checklist'] = checklist_json
+                        print(f"✅ SEO Checklist JSON 저장: {len(checklist_json)}자")
+                else:
+                    review_update_data['Legal Score'] = entry["total"]
+                    if checklist_json:
+                        review_update_data['Legal Checklist'] = checklist_json  
+                        print(f"✅ Legal Checklist JSON 저장: {len(checklist_json)}자")
+            
+            if existing_reviews:
+                # 기존 레코드 업데이트
+                review_record_id = existing_reviews[0]['id']
+                reviews_table.update(review_record_id, review_update_data)
+                print(f"✅ Post Review 업데이트 완료: {post_id}")
+            else:
+                # 새 레코드 생성
+                review_update_data['Post ID'] = post_id
+                reviews_table.create(review_update_data)
+                print(f"✅ Post Review 생성 완료: {post_id}")
+                
+        except Exception as review_error:
+            print(f"⚠️ Post Reviews 업데이트 실패 (Medicontent Posts는 성공): {review_error}")
+        
+        print(f"✅ Medicontent Posts 자동 업데이트 완료!")
+        print(f"   Content 파일: {content_file.name}")
+        print(f"   PostID: {post_id}")
+        print(f"   Record ID: {record_id}")
+        print(f"   Title: {title[:50]}..." if title else "")
+        print(f"   Content length: {len(content)}")
+        for entry in score_entries:
+            print(f"   Score: {entry['total']} ({entry['criteria']})")
+        
+        return True
+        
+    except ImportError:
+        print("⚠️ pyairtable 라이브러리가 없어 DB 업데이트를 건너뜁니다.")
+        return False
+    except Exception as e:
+        print(f"❌ Airtable 업데이트 실패: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def auto_update_medicontent_posts(evaluation_data: Dict[str, Any], evaluation_file_path: str,
+                                  pipeline_run=None) -> bool:
+    """
+    evaluation 완료 후 자동으로 Medicontent Posts 테이블 업데이트
+    pipeline_run이 주어지면 content 파일 스캔 없이 run의 input/content로 PostID를 확정
+    """
     try:
         print("🔄 Evaluation 완료 - 자동 DB 업데이트 시작...")
         
@@ -191,7 +547,6 @@ def auto_update_medicontent_posts(evaluation_data: Dict[str, Any], evaluation_fi
         
         # 타임스탬프 추출 (evaluation 파일명 우선, source_log는 백업)
         timestamp = None
-        import re
         
         # 1. evaluation 파일명에서 먼저 추출 시도 (UI 체크리스트와 동일한 타임스탬프)
         eval_filename = Path(evaluation_file_path).stem
@@ -218,362 +573,59 @@ def auto_update_medicontent_posts(evaluation_data: Dict[str, Any], evaluation_fi
         # criteria에 따라 SEO Score vs Legal Score 구분
         is_legal_score = criteria in ["엄격", "표준", "유연"]
         is_seo_score = criteria in ["우수", "양호", "보통"]
+        if not (is_legal_score or is_seo_score):
+            print(f"⚠️ 알 수 없는 criteria: {criteria}")
+            return False
         
-        # PostID 기반 매칭으로 content.json 찾기 (기존/새로운 경로 구조 모두 고려)
-        eval_dir = Path(evaluation_file_path).parent
-        base_use_dir = ROOT / "test_logs" / "use"
-        
-        search_dirs = [
-            eval_dir,  # 현재 evaluation 파일이 있는 폴더
-            eval_dir.parent if eval_dir.parent != base_use_dir else eval_dir,  # 상위 폴더
-            base_use_dir,  # test_logs/use/
-            base_use_dir / "results",  # 기존 results/ 폴더
-        ]
-        
-        # 모든 날짜 폴더들도 추가 (YYYYMMDD 형태)
-        if base_use_dir.exists():
-            for date_dir in base_use_dir.iterdir():
-                if date_dir.is_dir() and date_dir.name.isdigit() and len(date_dir.name) == 8:
-                    search_dirs.append(date_dir)
-        
-        # results 폴더의 모든 날짜/타임스탬프 폴더들도 추가
-        results_dir = base_use_dir / "results" 
-        if results_dir.exists():
-            for sub_dir in results_dir.iterdir():
-                if sub_dir.is_dir():
-                    search_dirs.append(sub_dir)
-        
-        content_file = None
-        matched_post_id = None
-        
-        # 모든 디렉토리에서 content.json 파일들 스캔 (최신순)
-        all_content_files = []
-        for search_dir in search_dirs:
-            if search_dir.exists():
-                if "**" in str(search_dir):
-                    # 특별한 glob 패턴 처리
-                    base_dir = search_dir.parent
-                    if base_dir.exists():
-                        all_content_files.extend(list(base_dir.glob("**/*_content.json")))
-                else:
-                    all_content_files.extend(list(search_dir.glob("**/*_content.json")))
-        
-        # 중복 제거 및 최신순 정렬
-        content_files = sorted(list(set(all_content_files)), key=lambda x: x.stat().st_mtime, reverse=True)
-        
-        for cf in content_files:
-            try:
-                with open(cf, 'r', encoding='utf-8') as f:
-                    content_data = json.load(f)
-                
-                # content.json에서 input_source 추출
-                input_source = content_data.get("meta", {}).get("input_source", "")
-                if not input_source:
-                    continue
-                
-                # input_source 경로를 절대 경로로 변환
-                if not Path(input_source).is_absolute():
-                    input_file = ROOT / input_source
-                else:
-                    input_file = Path(input_source)
-                
-                if not input_file.exists():
-                    continue
-                
-                # input_source에서 PostID 추출
-                with open(input_file, 'r', encoding='utf-8') as f:
-                    input_logs = json.load(f)
-                
-                # PostID 추출 로직
-                post_id = None
-                if isinstance(input_logs, list) and input_logs:
-                    for log_entry in input_logs:
-                        if isinstance(log_entry, dict):
-                            for key in ['actualPostDataRequestPostIdFull', 'medicontentPostId', 'postId']:
-                                if key in log_entry and log_entry[key]:
-                                    post_id = str(log_entry[key])
-                                    if not post_id.startswith('post_'):
-                                        post_id = f"post_{post_id}"
-                                    break
-                            if post_id:
-                                break
-                elif isinstance(input_logs, dict):
-                    for key in ['actualPostDataRequestPostIdFull', 'medicontentPostId', 'postId']:
-                        if key in input_logs and input_logs[key]:
-                            post_id = str(input_logs[key])
-                            if not post_id.startswith('post_'):
-                                post_id = f"post_{post_id}"
-                            break
-                
-                if post_id:
-                    content_file = cf
-                    matched_post_id = post_id
-                    print(f"✅ PostID 기반 Content 파일 발견: {content_file}")
-                    print(f"🔍 추출된 PostID: {matched_post_id}")
-                    break
-                    
-            except Exception as e:
-                continue
-        
-        if not content_file or not matched_post_id:
+        content_file, post_id = _find_content_for_update(evaluation_file_path, pipeline_run)
+        if not content_file or not post_id:
             print("⚠️ PostID를 추출할 수 있는 content.json을 찾을 수 없습니다.")
             return False
         
-        # content.json과 같은 디렉토리에서 HTML 파일 찾기
-        content_dir = content_file.parent
-        content_stem = content_file.stem.replace("_content", "")  # 타임스탬프 부분 추출
-        
-        html_files = []
-        html_patterns = [
-            f"{content_stem}.html",
-            f"{content_stem}_content.html", 
-            f"{content_stem}_result.html"
-        ]
-        
-        for pattern in html_patterns:
-            html_files.extend(list(content_dir.glob(pattern)))
-            if html_files:
-                break
-        
-        html_file = html_files[0] if html_files else None
-        if html_file:
-            print(f"✅ HTML 파일 발견: {html_file}")
-        else:
-            print(f"⚠️ content.json과 연관된 HTML 파일을 찾을 수 없습니다.")
-            print(f"   검색한 패턴: {html_patterns}")
-        
-        # 이미 추출된 PostID 사용
-        post_id = matched_post_id
-        print(f"🔍 사용할 PostID: {post_id}")
-        
-        # Medicontent Posts 및 Post Reviews 테이블 업데이트
-        load_dotenv()
-        
-        try:
-            from pyairtable import Api
-            
-            api = Api(os.getenv('AIRTABLE_API_KEY'))
-            posts_table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Medicontent Posts')
-            reviews_table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Post Reviews')
-            
-            # PostID로 직접 매칭
-            print(f"🔍 Medicontent Posts에서 PostID '{post_id}'와 매칭되는 레코드 검색...")
-            
-            matched_record = None
-            
-            # PostID 필드로 필터링하여 레코드 검색
-            records = posts_table.all(formula=f"{{Post Id}} = '{post_id}'")
-            
-            if records:
-                matched_record = records[0]
-                print(f"✅ PostID 매칭 성공!")
-                print(f"   찾은 PostID: {post_id}")
-                print(f"   Record ID: {matched_record['id']}")
-            else:
-                print(f"❌ PostID '{post_id}'에 해당하는 레코드를 찾을 수 없습니다.")
-                
-                # 디버깅: 전체 레코드 목록 출력
-                all_records = posts_table.all()
-                print("📋 전체 Medicontent Posts 레코드 목록:")
-                for i, record in enumerate(all_records[:10]):  # 처음 10개만 출력
-                    record_post_id = record['fields'].get('Post Id', '')
-                    title = record['fields'].get('Title', '')[:50] if record['fields'].get('Title') else ''
-                    print(f"   {i+1}. PostID: '{record_post_id}', Title: '{title}...'")
-                    if i > 5:  # 너무 많으면 생략
-                        print(f"   ... ({len(all_records) - 10}개 더)")
-                        break
-                return False
-            
-            record_id = matched_record['id']
-            
-            # HTML 파일에서 제목과 본문 추출
-            title = ""
-            content = ""
-            if html_file:
-                title, content = extract_title_and_content_from_html(str(html_file))
-            else:
-                print("⚠️ HTML 파일이 없어 제목과 본문을 추출할 수 없습니다.")
-            
-            # 현재 레코드에서 기존 SEO Score와 Legal Score 확인
-            current_fields = matched_record['fields']
-            existing_seo_score = current_fields.get('SEO Score')
-            existing_legal_score = current_fields.get('Legal Score')
-            current_status = current_fields.get('Status', '')
-            
-            print(f"📊 현재 레코드 상태:")
-            print(f"   기존 SEO Score: {existing_seo_score} ({'있음' if existing_seo_score else '없음'})")
-            print(f"   기존 Legal Score: {existing_legal_score} ({'있음' if existing_legal_score else '없음'})")
-            print(f"   현재 Status: '{current_status}'")
-            print(f"🔍 이번 평가 타입 - is_seo_score: {is_seo_score}, is_legal_score: {is_legal_score}")
-            
-            # HTML ID 생성 (content 파일명에서 추출)
-            html_id = content_file.stem  # ex: 20250825_205923_content
-            
-            # 업데이트할 데이터 준비 (Status는 나중에 결정)
-            update_data = {
-                'HTML ID': html_id
-            }
-            
-            # 제목과 본문 추가
-            if title:
-                update_data['Title'] = title
-                print(f"📝 제목 추가: {title[:50]}...")
-            
-            if content:
-                update_data['Content'] = content
-                print(f"📝 HTML 본문 추가: {len(content)}자 (전체 HTML 파일)")
-            
-            # SEO Score 또는 Legal Score 추가
-            if is_seo_score:
-                update_data['SEO Score'] = weighted_total
-                print(f"📈 SEO Score 설정: {weighted_total} (criteria: {criteria})")
-            elif is_legal_score:
-                update_data['Legal Score'] = weighted_total
-                print(f"⚖️ Legal Score 설정: {weighted_total} (criteria: {criteria})")
-            
-            # 둘 다 있을 때만 작업 완료로 변경 (동시 평가 시에만 완료 처리)
-            will_have_seo = existing_seo_score or is_seo_score
-            will_have_legal = existing_legal_score or is_legal_score
-            
-            print(f"🔄 Score 상태 확인:")
-            print(f"   기존 SEO Score: {existing_seo_score} ({'있음' if existing_seo_score else '없음'})")
-            print(f"   기존 Legal Score: {existing_legal_score} ({'있음' if existing_legal_score else '없음'})")
-            print(f"   이번에 추가할 SEO Score: {'있음' if is_seo_score else '없음'}")
-            print(f"   이번에 추가할 Legal Score: {'있음' if is_legal_score else '없음'}")
-            print(f"   결과 - will_have_seo: {will_have_seo}, will_have_legal: {will_have_legal}")
-            
-            if will_have_seo and will_have_legal:
-                update_data['Status'] = '작업 완료'
-                print(f"✅ SEO Score와 Legal Score 모두 있음 → Status: '작업 완료'로 변경")
-            else:
-                print(f"⏳ 아직 한쪽 Score만 있음 → Status 유지 ('{current_status}')")
-                print(f"   SEO Score: {'✅' if will_have_seo else '❌'}")
-                print(f"   Legal Score: {'✅' if will_have_legal else '❌'}")
-            
-            # Airtable 업데이트 실행 - Medicontent Posts
-            posts_table.update(record_id, update_data)
-            
-            # Post Reviews 테이블도 업데이트
-            try:
-                # 기존 Post Review 레코드 검색
-                existing_reviews = reviews_table.all(formula=f"{{Post ID}} = '{post_id}'")
-                
-                # UI checklist JSON 생성
-                checklist_json = ""
-                ui_log_path = ""
-                
-                # 해당 타임스탬프의 UI checklist 로그 찾기 (기존/새로운 구조 모두 지원)
-                eval_dir = Path(evaluation_file_path).parent
-                ui_patterns = []
-                
-                if is_seo_score:
-                    # SEO 체크리스트 패턴들
-                    ui_patterns = [
-                        f"{timestamp}_seo_ui_checklist_after.json",
-                        f"{timestamp}_seo_ui_checklist_before.json", 
-                        f"{timestamp}_seo_ui_checklist_declined.json",
-                        f"{timestamp}_seo_ui_checklist.json"
-                    ]
-                else:
-                    # Legal 체크리스트 패턴들  
-                    ui_patterns = [
-                        f"{timestamp}_legal_ui_checklist_after.json",
-                        f"{timestamp}_legal_ui_checklist_before.json",
-                        f"{timestamp}_legal_ui_checklist_declined.json", 
-                        f"{timestamp}_legal_ui_checklist.json"
-                    ]
-                
-                # UI checklist 파일을 찾을 검색 디렉토리들
-                ui_search_dirs = [
-                    eval_dir,  # 현재 폴더
-                    eval_dir.parent,  # 상위 폴더
-                    base_use_dir,  # test_logs/use/
-                    base_use_dir / "results",  # results/ 폴더
-                ]
-                
-                # 모든 날짜 폴더와 results의 하위 폴더들도 추가
-                if base_use_dir.exists():
-                    for date_dir in base_use_dir.iterdir():
-                        if date_dir.is_dir() and date_dir.name.isdigit() and len(date_dir.name) == 8:
-                            ui_search_dirs.append(date_dir)
-                
-                results_dir = base_use_dir / "results"
-                if results_dir.exists():
-                    for sub_dir in results_dir.iterdir():
-                        if sub_dir.is_dir():
-                            ui_search_dirs.append(sub_dir)
-                
-                ui_files = []
-                for pattern in ui_patterns:
-                    for search_dir in ui_search_dirs:
-                        if search_dir.exists():
-                            found_files = list(search_dir.glob(pattern))
-                            ui_files.extend(found_files)
-                    if ui_files:
-                        break
-                
-                if ui_files:
-                    ui_file = ui_files[0]
-                    print(f"✅ UI checklist 파일 발견: {ui_file}")
-                    
-                    # UI checklist JSON 읽기
-                    with open(ui_file, 'r', encoding='utf-8') as f:
-                        checklist_json = f.read()
-                else:
-                    print(f"⚠️ UI checklist 파일을 찾을 수 없습니다: {ui_patterns}")
-                    print("   체크리스트 파일이 없어도 점수는 업데이트합니다.")
-                
-                # Post Reviews 업데이트 데이터 준비
-                review_update_data = {
-                    'Reviewer': '리걸케어',
-                    'Reviewed At': datetime.now().isoformat()
-                }
-                
-                if is_seo_score:
-                    review_update_data['SEO Score'] = weighted_total
-                    if checklist_json:
-                        review_update_data['SEO Checklist'] = checklist_json
-                        print(f"✅ SEO Checklist JSON 저장: {len(checklist_json)}자")
-                elif is_legal_score:
-                    review_update_data['Legal Score'] = weighted_total
-                    if checklist_json:
-                        review_update_data['Legal Checklist'] = checklist_json  
-                        print(f"✅ Legal Checklist JSON 저장: {len(checklist_json)}자")
-                
-                if existing_reviews:
-                    # 기존 레코드 업데이트
-                    review_record_id = existing_reviews[0]['id']
-                    reviews_table.update(review_record_id, review_update_data)
-                    print(f"✅ Post Review 업데이트 완료: {post_id}")
-                else:
-                    # 새 레코드 생성
-                    review_update_data['Post ID'] = post_id
-                    reviews_table.create(review_update_data)
-                    print(f"✅ Post Review 생성 완료: {post_id}")
-                    
-            except Exception as review_error:
-                print(f"⚠️ Post Reviews 업데이트 실패 (Medicontent Posts는 성공): {review_error}")
-            
-            print(f"✅ Medicontent Posts 자동 업데이트 완료!")
-            print(f"   Content 파일: {content_file.name}")
-            print(f"   PostID: {post_id}")
-            print(f"   Record ID: {record_id}")
-            print(f"   Status: 작업 완료")
-            print(f"   Title: {title[:50]}..." if title else "")
-            print(f"   Content length: {len(content)}")
-            print(f"   Score: {weighted_total} ({criteria})")
-            
-            return True
+        entry = {
+            "kind": "seo" if is_seo_score else "legal",
+            "total": weighted_total,
+            "criteria": criteria,
+            "checklist_json": _find_ui_checklist_json(timestamp, is_seo_score, evaluation_file_path),
+        }
+        return _push_evaluation_scores(post_id, content_file, [entry])
             
-        except ImportError:
-            print("⚠️ pyairtable 라이브러리가 없어 DB 업데이트를 건너뜁니다.")
+    except Exception as e:
+        print(f"❌ 자동 DB 업데이트 실패: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def auto_update_medicontent_posts_merged(results: Dict[str, Dict[str, Any]], pipeline_run=None) -> bool:
+    """
+    통합 평가(both) 결과를 한 번에 반영 - 의료법/SEO 점수를 Airtable 쓰기 1회로 병합
+    results: {"medical": run_single_mode 결과, "seo": run_single_mode 결과} (실패한 모드는 None)
+    """
+    try:
+        print("🔄 통합 평가 완료 - 자동 DB 업데이트(병합) 시작...")
+        done = {k: v for k, v in results.items() if v and v.get("evaluation")}
+        if not done:
+            print("⚠️ 반영할 평가 결과가 없어 DB 업데이트를 건너뜁니다.")
             return False
-        except Exception as e:
-            print(f"❌ Airtable 업데이트 실패: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        
+        any_path = next(iter(done.values()))["evaluation_path"]
+        content_file, post_id = _find_content_for_update(any_path, pipeline_run)
+        if not content_file or not post_id:
+            print("⚠️ PostID를 추출할 수 있는 content.json을 찾을 수 없습니다.")
             return False
-            
+        
+        entries = []
+        for mode, res in done.items():
+            evaluation = res["evaluation"]
+            ui_path = res.get("ui_checklist_path")
+            entries.append({
+                "kind": "seo" if mode == "seo" else "legal",
+                "total": evaluation.get("scores", {}).get("weighted_total", 0),
+                "criteria": evaluation.get("modes", {}).get("criteria", ""),
+                "checklist_json": Path(ui_path).read_text(encoding='utf-8') if ui_path and Path(ui_path).exists() else "",
+            })
+        return _push_evaluation_scores(post_id, content_file, entries)
+    
     except Exception as e:
         print(f"❌ 자동 DB 업데이트 실패: {str(e)}")
         import traceback
@@ -582,6 +634,7 @@ def auto_update_medicontent_posts(evaluation_data: Dict[str, Any], evaluation_fi
 
 EVAL_PROMPT_PATH = PROMPTS_DIR / "llm_evaluation_prompt.txt"
 REGEN_PROMPT_PATH = PROMPTS_DIR / "llm_regeneration_prompt.txt"
+DELTA_PROMPT_PATH = PROMPTS_DIR / "llm_delta_evaluation_prompt.txt"
 SEO_PROMPT_PATH = PROMPTS_DIR / "seo_evaluation_prompt.txt"
 CRITERIA_PATH = DATA_DIR / "evaluation_criteria.json"
 SEO_CRITERIA_PATH = DATA_DIR / "seo_evaluation_criteria.json"
@@ -665,14 +718,46 @@ def _extract_images_and_clean_text(raw: str) -> Tuple[str, int]:
     image_count = len(md_hits) + len(html_hits) + len(paren_hits)
     return text, image_count
 
+# --- 형태소 분석기 (프로세스당 1개 · 지연 로딩) ---
+# Kiwi 모델 로딩은 수 초/수백 MB → 호출마다 새로 만들지 않고 공유
+# 프로세스 풀(fork)에서는 pid가 바뀌면 자식 프로세스에서 새로 로딩
+_KIWI = None
+_KIWI_PID = None
+_KIWI_LOCK = threading.Lock()
+
+def get_kiwi():
+    """공유 Kiwi 인스턴스 반환 (최초 호출 시 로딩)"""
+    global _KIWI, _KIWI_PID
+    if _KIWI is None or _KIWI_PID != os.getpid():
+        with _KIWI_LOCK:
+            if _KIWI is None or _KIWI_PID != os.getpid():
+                from kiwipiepy import Kiwi
+                t0 = time.time()
+                _KIWI = Kiwi()
+                _KIWI_PID = os.getpid()
+                print(f"✅ Kiwi 형태소 분석기 로딩 완료 ({time.time() - t0:.1f}s)")
+    return _KIWI
+
+def warmup_kiwi() -> bool:
+    """API 시작 시 형태소 분석기 미리 로딩 (실패해도 평가 시점에 재시도)"""
+    try:
+        get_kiwi().tokenize("형태소 분석기 준비")
+        return True
+    except Exception as e:
+        print(f"⚠️ Kiwi 워밍업 실패: {e}")
+        return False
+
+def _count_morphemes_batch(texts: List[str]) -> List[int]:
+    """여러 텍스트의 형태소 개수를 한 번의 Kiwi.tokenize 호출로 계산"""
+    if not texts:
+        return []
+    kiwi = get_kiwi()
+    with _KIWI_LOCK:
+        return [len(tokens) for tokens in kiwi.tokenize(list(texts))]
+
 def _calculate_morphemes(text: str) -> int:
     """형태소 개수 계산 (kiwipiepy 사용)"""
-    from kiwipiepy import Kiwi
-    kiwi = Kiwi()
-    result = kiwi.analyze(text)
-    tokens, score = result[0]
-    morphemes = [token.form for token in tokens]
-    return len(morphemes)
+    return _count_morphemes_batch([text])[0]
 
 def _count_syllables_extended(text: str) -> int:
     """음절 개수 계산 (한글 + 영문)"""
@@ -686,26 +771,24 @@ def _count_syllables_extended(text: str) -> int:
             syllables += 1
     return syllables
 
-def calculate_seo_metrics(title: str, content: str) -> Dict[str, int]:
-    """SEO 평가용 실제 측정값 (렌더 결과 기준: 이미지/alt/파일명 제거, 줄바꿈 제외)"""
-    import re
-
-    # --- 제목(그대로) ---
-    title_with_space = len(title)
-    title_without_space = len(title.replace(" ", ""))
-    print(f"DEBUG - 제목: '{title}'")
-    print(f"DEBUG - 공백 포함: {title_with_space}, 공백 제외: {title_without_space}")
-
-    # --- 본문: 정제 + 이미지 카운트 ---
-    cleaned, image_count = _extract_images_and_clean_text(content)
-
+# 8. 어뷰징 단어 패턴
+ABUSING_PATTERNS = [
+    r'19금', r'성인', r'유해', r'도박', r'불법', r'사기',
+    r'100%', r'완전무료', r'대박', r'짱', r'헐', r'1등', r'최고', r'최강', r'완벽', r'보장', r'완치', r'치료보장',
+    r'즉시', r'당일', r'바로', r'지금\s*당장', r'반드시', r'절대', r'무조건',
+    r'전부', r'전세계', r'국내유일', r'독점', r'유일무이', r'베스트', r'프리미엄',
+    r'명품', r'초특가', r'파격', r'무료', r'공짜', r'할인', r'이벤트', r'사은품',
+    r'한정', r'마감임박', r'재고소진', r'선착순', r'단독', r'최초', r'유일',
+    r'완전', r'필수', r'강력추천'
+]
+phrase_lexicon.register("seo_abusing", ABUSING_PATTERNS, ignore_case=True)
+
+def _seo_metrics_from_cleaned(title: str, cleaned: str, image_count: int, morpheme_count: int) -> Dict[str, int]:
+    """정제 텍스트 + 형태소 개수로 SEO 측정값 구성"""
     # 3/4. 본문 글자수
     content_with_space = len(cleaned)
     content_without_space = len(re.sub(r'\s+', '', cleaned))  # 모든 공백 제거(개행 포함)
 
-    # 5. 형태소(정제 텍스트 기준)
-    morpheme_count = _calculate_morphemes(cleaned)
-
     # 6. 음절(정제 텍스트 기준)
     syllable_count = _count_syllables_extended(cleaned)
 
@@ -713,20 +796,11 @@ def calculate_seo_metrics(title: str, content: str) -> Dict[str, int]:
     word_count = len(re.findall(r'[\w가-힣]+', cleaned))
 
     # 8. 어뷰징 단어(정제 텍스트 기준)
-    abusing_patterns = [
-        r'19금', r'성인', r'유해', r'도박', r'불법', r'사기',
-        r'100%', r'완전무료', r'대박', r'짱', r'헐', r'1등', r'최고', r'최강', r'완벽', r'보장', r'완치', r'치료보장',
-        r'즉시', r'당일', r'바로', r'지금\s*당장', r'반드시', r'절대', r'무조건',
-        r'전부', r'전세계', r'국내유일', r'독점', r'유일무이', r'베스트', r'프리미엄',
-        r'명품', r'초특가', r'파격', r'무료', r'공짜', r'할인', r'이벤트', r'사은품',
-        r'한정', r'마감임박', r'재고소진', r'선착순', r'단독', r'최초', r'유일',
-        r'완전', r'필수', r'강력추천'
-    ]
-    abusing_count = sum(len(re.findall(pat, cleaned, re.IGNORECASE)) for pat in abusing_patterns)
+    abusing_count = phrase_lexicon.count("seo_abusing", cleaned)
 
     return {
-        1: title_with_space,
-        2: title_without_space,
+        1: len(title),
+        2: len(title.replace(" ", "")),
         3: content_with_space,
         4: content_without_space,
         5: morpheme_count,
@@ -736,6 +810,32 @@ def calculate_seo_metrics(title: str, content: str) -> Dict[str, int]:
         9: image_count
     }
 
+def calculate_seo_metrics(title: str, content: str) -> Dict[str, int]:
+    """SEO 평가용 실제 측정값 (렌더 결과 기준: 이미지/alt/파일명 제거, 줄바꿈 제외)"""
+    # --- 제목(그대로) ---
+    print(f"DEBUG - 제목: '{title}'")
+    print(f"DEBUG - 공백 포함: {len(title)}, 공백 제외: {len(title.replace(' ', ''))}")
+
+    # --- 본문: 정제 + 이미지 카운트 ---
+    cleaned, image_count = _extract_images_and_clean_text(content)
+
+    # 5. 형태소(정제 텍스트 기준)
+    morpheme_count = _calculate_morphemes(cleaned)
+
+    return _seo_metrics_from_cleaned(title, cleaned, image_count, morpheme_count)
+
+def calculate_seo_metrics_batch(docs: List[Tuple[str, str]]) -> List[Dict[str, int]]:
+    """
+    (title, content) 여러 건의 SEO 측정값을 한 번에 계산
+    - 형태소 분석은 Kiwi.tokenize 1회 호출로 묶어서 처리 (재생성 전/후 비교, 일괄 재채점용)
+    """
+    prepared = [_extract_images_and_clean_text(content) for _, content in docs]
+    morpheme_counts = _count_morphemes_batch([cleaned for cleaned, _ in prepared])
+    return [
+        _seo_metrics_from_cleaned(title, cleaned, image_count, morphemes)
+        for (title, _), (cleaned, image_count), morphemes in zip(docs, prepared, morpheme_counts)
+    ]
+
 # ===== 유틸 =====
 def _nowstamp() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -809,13 +909,14 @@ def _latest(log_dir: Path, glob_pat: Union[str, List[str]]) -> Path:
     return candidates[0]
 
 # ===== LLM =====
-def _setup_llm():
+def _setup_llm(mode: Union[str, None] = None):
+    """평가용 LLM 클라이언트 (mode=test면 응답 캐시 기본 사용)"""
     load_dotenv()
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY가 .env에 없습니다.")
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-1.5-pro")
+    from llm import LLMClient
+    return LLMClient("evaluation", mode=mode)
 
 def _extract_json(raw: str) -> Dict[str, Any]:
     if not raw:
@@ -831,16 +932,21 @@ def _extract_json(raw: str) -> Dict[str, Any]:
     text = text.strip().strip("`").strip()
     return json.loads(text)
 
+def _regen_time_left(eval_sec: float) -> Union[float, None]:
+    """
+    단계 데드라인 안에 재생성 1회(패치 + 재평가 ≈ 평가 2회분)를 더 돌릴 수 없으면 남은 시간(초), 가능하면 None
+    """
+    from llm import time_left
+    left = time_left()
+    if left is not None and left < 2 * eval_sec:
+        return max(left, 0.0)
+    return None
+
 def _call_llm(model, prompt: str) -> Dict[str, Any]:
-    resp = model.generate_content(prompt)
-    text = getattr(resp, "text", "") or ""
-    if not text:
-        try:
-            cand0 = resp.candidates[0]
-            parts = getattr(getattr(cand0, "content", None), "parts", []) or []
-            text = "".join(getattr(p, "text", "") for p in parts if getattr(p, "text", ""))
-        except Exception:
-            pass
+    try:
+        text = model.generate(prompt)
+    except ValueError:
+        text = ""
     if not text:
         raise RuntimeError("LLM 응답 파싱 실패(빈 응답). 프롬프트 또는 안전필터 확인.")
     return _extract_json(text)
@@ -1007,6 +1113,9 @@ def rule_score_item(idx: int, text: str, pats: Dict[int, List[re.Pattern]]) -> T
     for rgx in pats[idx]:
         m = rgx.search(text)
         if m: hits.append(m.group(0))
+    return _score_rule_hits(idx, hits)
+
+def _score_rule_hits(idx: int, hits: List[str]) -> Tuple[int, List[str]]:
     if not hits: return 0, []
     # 휴리스틱 스코어링
     strong = any(re.search(r"100\s*%|부작용\s*없", h, re.I) for h in hits)
@@ -1015,15 +1124,124 @@ def rule_score_item(idx: int, text: str, pats: Dict[int, List[re.Pattern]]) -> T
     # 기본: 1개 발견=2, 2개 이상=3 (필요시 세분화)
     return (2 if len(hits) == 1 else 3), hits
 
-def rule_score_all(title: str, content: str, pats: Dict[int, List[re.Pattern]]) -> Dict[str, Dict[str, Any]]:
+# 체크리스트 패턴 dict별 매처 (패턴 dict는 reference_registry 공유 객체 → 같은 객체면 재사용)
+_RULE_LEXICONS: Dict[int, Tuple[Dict[int, List[re.Pattern]], Any]] = {}
+
+def _rule_lexicon(pats: Dict[int, List[re.Pattern]]):
+    item = _RULE_LEXICONS.get(id(pats))
+    if item is None or item[0] is not pats:
+        from utils.phrase_lexicon import PhraseLexicon
+        lexicon = PhraseLexicon()
+        for idx, rgx_list in pats.items():
+            lexicon.register(str(idx), rgx_list)
+        if len(_RULE_LEXICONS) >= 8:
+            _RULE_LEXICONS.clear()
+        item = _RULE_LEXICONS[id(pats)] = (pats, lexicon)
+    return item[1]
+
+def rule_score_all(title: str, content: str, pats: Dict[int, List[re.Pattern]],
+                   lexicon=None) -> Dict[str, Dict[str, Any]]:
+    """
+    15개 항목 규칙 패턴을 텍스트 1회 스캔으로 검사 (항목별 결과는 rule_score_item과 동일)
+    lexicon: pats로 만든 매처 (EvaluationRules.lexicon) — 없으면 pats별 캐시에서 조회
+    """
     text = f"{title}\n\n{content}"
+    found = (lexicon or _rule_lexicon(pats)).first_matches(text)
     results: Dict[str, Dict[str, Any]] = {}
     for i in range(1, 16):
-        s, hits = rule_score_item(i, text, pats)
+        s, hits = _score_rule_hits(i, found.get(str(i), []))
         results[str(i)] = {"score": s, "hits": hits}
     return results
 
 # ===== 가중 총점 =====
+def _load_checklist_patterns(path: Path) -> Dict[int, Tuple[re.Pattern, ...]]:
+    """체크리스트 CSV → 컴파일된 규칙 패턴 (프로세스 공용 · 읽기 전용)"""
+    from utils import table_cache
+    pats = compile_patterns(table_cache.cached_object(path, "checklist", load_checklist_csv))
+    return MappingProxyType({idx: tuple(p_list) for idx, p_list in pats.items()})
+
+def warmup_checklists() -> bool:
+    """배치/서버 기동 시 평가 규칙(체크리스트 패턴 · 기준 · 가중치 · 프롬프트) 미리 로드"""
+    try:
+        evaluation_rules("medical")
+        evaluation_rules("seo")
+        return True
+    except Exception as e:
+        print(f"⚠️ 체크리스트 워밍업 실패: {e}")
+        return False
+
+# ===== 평가 규칙 레지스트리 =====
+# 기준 JSON / 체크리스트 CSV / 리포트 MD / 평가 프롬프트를 파일 시그니처별로 1번만 로드·컴파일
+# - 각 파일은 reference_registry가 (mtime, size) 변경 시 다시 로드 → 파일을 고치면 다음 평가부터 반영
+# - 번들과 그 안의 dict/list는 읽기 전용(MappingProxyType/tuple) → 동시 평가(의료법/SEO 스레드, 배치)가 그대로 공유
+@dataclass(frozen=True)
+class EvaluationRules:
+    mode: str                      # medical | seo
+    criteria: Mapping[str, Any]    # 기준 모드(엄격/표준/유연 · 우수/양호/보통) → 항목별 임계값
+    prompt_path: Path
+    prompt_template: str
+    patterns: Optional[Mapping[int, Tuple[re.Pattern, ...]]] = None  # 의료법 규칙 패턴
+    lexicon: Any = None                                             # patterns 1회 스캔 매처
+    weights: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+
+def _freeze(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+def _load_frozen_json(path: Path) -> Mapping[str, Any]:
+    return _freeze(_read_json(path))
+
+def _load_report_weights(path: Path) -> Mapping[str, float]:
+    return MappingProxyType(dict(parse_report_weights(path)))
+
+def _prompt_template(path: Path) -> str:
+    from utils import reference_registry
+    return reference_registry.get("prompt_template", path, _read_text)
+
+_RULES: Dict[Tuple, Tuple[Tuple, EvaluationRules]] = {}
+_RULES_LOCK = threading.Lock()
+
+def evaluation_rules(evaluation_mode: str = "medical",
+                     csv_path: Union[str, Path, None] = None,
+                     report_path: Union[str, Path, None] = None) -> EvaluationRules:
+    """
+    평가 모드별 규칙 번들 (구성 파일 중 하나라도 바뀌면 그 부분만 다시 로드해 새 번들)
+    """
+    from utils import reference_registry
+
+    if evaluation_mode == "seo":
+        criteria_path, prompt_path = SEO_CRITERIA_PATH, SEO_PROMPT_PATH
+    else:
+        criteria_path, prompt_path = CRITERIA_PATH, EVAL_PROMPT_PATH
+    parts: Dict[str, Any] = {
+        "criteria": reference_registry.get("evaluation_criteria", criteria_path, _load_frozen_json),
+        "prompt_template": _prompt_template(prompt_path),
+    }
+    if evaluation_mode == "medical":
+        csv_file = Path(csv_path) if csv_path else _find_existing(DEFAULT_CSV_PATHS)
+        report_file = Path(report_path) if report_path else _find_existing(DEFAULT_REPORT_PATHS)
+        parts["patterns"] = reference_registry.get("checklist_patterns", csv_file, _load_checklist_patterns)
+        parts["weights"] = reference_registry.get("report_weights", report_file, _load_report_weights)
+
+    key = (evaluation_mode, str(csv_path or ""), str(report_path or ""))
+    ident = tuple(id(v) for v in parts.values())
+    cached = _RULES.get(key)
+    if cached is not None and cached[0] == ident:
+        return cached[1]
+    with _RULES_LOCK:
+        cached = _RULES.get(key)
+        if cached is not None and cached[0] == ident:
+            return cached[1]
+        if "patterns" in parts:
+            parts["lexicon"] = _rule_lexicon(parts["patterns"])
+        rules = EvaluationRules(mode=evaluation_mode, prompt_path=prompt_path, **parts)
+        _RULES[key] = (ident, rules)
+        print(f"✅ 평가 규칙 로드: {evaluation_mode}" + (" (변경 감지 → 다시 로드)" if cached else ""))
+        return rules
+
 def parse_report_weights(md_path: Path) -> Dict[str, float]:
     # 간단 파서: 3.1 테이블 라인에서 숫자 추출 (없으면 DEFAULT 사용)
     try:
@@ -1125,7 +1343,7 @@ def apply_patches(title: str, content: str, patch_obj: Dict[str, Any]) -> Tuple[
 
 # ===== 프롬프트 빌드 =====
 def build_eval_prompt(title: str, content: str, prompt_path: Path = EVAL_PROMPT_PATH, seo_metrics: Dict[int, int] = None) -> str:
-    base = _read_text(prompt_path)
+    base = _prompt_template(prompt_path)
 
     # SEO 모드에서 실제 측정값과 정답을 프롬프트에 포함
     if seo_metrics and "seo_evaluation_prompt" in str(prompt_path):
@@ -1199,7 +1417,7 @@ def build_eval_prompt(title: str, content: str, prompt_path: Path = EVAL_PROMPT_
 
 def build_regen_prompt(title: str, content: str, criteria_mode: str,
                        violations: List[int], hints: List[str]) -> str:
-    base = _read_text(REGEN_PROMPT_PATH)
+    base = _prompt_template(REGEN_PROMPT_PATH)
     vnames = [f"{CHECKLIST_NAMES[i]}({i})" for i in violations]
     violations_json = json.dumps(vnames, ensure_ascii=False)
     hints_json = json.dumps(hints or [], ensure_ascii=False)
@@ -1211,6 +1429,168 @@ def build_regen_prompt(title: str, content: str, criteria_mode: str,
               .replace("{hints}", hints_json))
     return prompt
 
+# ===== 증분 재평가 (문단 단위 캐시) =====
+# 국소 수정(apply_patches) 후 재평가 비용을 수정 범위에 비례하게
+# - 규칙 점수: 줄바꿈을 넘을 수 없는 패턴(paragraph_cache.line_local)은 문단별 첫 매치를 캐시해 합침
+#     → 문단 순서대로 처음 나온 매치 = 전체 텍스트 re.search 첫 매치 (rule_score_all과 같은 값)
+#     \s* 등으로 문단 경계를 넘을 수 있는 패턴만 전체 텍스트 검사 (필수 리터럴 사전 필터로 대부분 생략)
+# - SEO 측정값: 문단별 (정제 텍스트, 이미지 수, 형태소 수) 캐시 → 바뀐 문단만 정제 + Kiwi 1회 호출
+# - LLM(의료법): 초과 항목 + 바뀐 문단이 영향을 준 항목만 재채점, 나머지는 직전 점수 유지
+#     EVAL_DELTA_LLM=0이면 항상 전체 재평가, 바뀐 문단 비율이 EVAL_DELTA_MAX_CHANGED_RATIO 초과여도 전체 재평가
+EVAL_DELTA_LLM = os.getenv("EVAL_DELTA_LLM", "1") != "0"
+EVAL_DELTA_MAX_CHANGED_RATIO = float(os.getenv("EVAL_DELTA_MAX_CHANGED_RATIO", "0.5"))
+
+# 규칙 매처별 (패턴 배치, 문단 전용 매처, 경계 패턴 매처, 문단 캐시)
+_RULE_PLANS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_RULE_PLANS_LOCK = threading.Lock()
+_SEO_PARAGRAPHS = None
+
+def _rule_plan(pats: Dict[int, List[re.Pattern]], lexicon):
+    plan = _RULE_PLANS.get(lexicon)
+    if plan is not None:
+        return plan
+    with _RULE_PLANS_LOCK:
+        plan = _RULE_PLANS.get(lexicon)
+        if plan is None:
+            from utils.paragraph_cache import ParagraphCache, line_local
+            from utils.phrase_lexicon import PhraseLexicon
+            local_lex, spanning_lex = PhraseLexicon(), PhraseLexicon()
+            layout: Dict[str, List[Tuple[bool, int]]] = {}  # 항목 → 패턴별 (문단 패턴 여부, 해당 매처 안 순번)
+            for idx, rgx_list in pats.items():
+                groups: Dict[bool, List[re.Pattern]] = {True: [], False: []}
+                order = []
+                for rgx in rgx_list:
+                    is_local = line_local(rgx)
+                    order.append((is_local, len(groups[is_local])))
+                    groups[is_local].append(rgx)
+                local_lex.register(str(idx), groups[True])
+                spanning_lex.register(str(idx), groups[False])
+                layout[str(idx)] = order
+            plan = _RULE_PLANS[lexicon] = (layout, local_lex, spanning_lex, ParagraphCache())
+    return plan
+
+def _paragraph_first_hits(lexicon, paragraphs: List[str]) -> List[Dict[str, Dict[int, str]]]:
+    """문단별 {항목: {패턴 순번: 첫 매치}}"""
+    out = []
+    for para in paragraphs:
+        found = {}
+        for name, spans_list in lexicon.scan(para, first_only=True).items():
+            hits = {k: para[spans[0][0]:spans[0][1]] for k, spans in enumerate(spans_list) if spans}
+            if hits:
+                found[name] = hits
+        out.append(found)
+    return out
+
+def rule_score_incremental(title: str, content: str, pats: Dict[int, List[re.Pattern]],
+                           lexicon=None) -> Dict[str, Dict[str, Any]]:
+    """rule_score_all과 같은 결과를 문단 캐시로 계산 (처음 보는 문단만 검사)"""
+    from utils import paragraph_cache
+    lexicon = lexicon or _rule_lexicon(pats)
+    layout, local_lex, spanning_lex, cache = _rule_plan(pats, lexicon)
+    text = f"{title}\n\n{content}"
+    per_para = cache.get_many(paragraph_cache.split(text),
+                              lambda paras: _paragraph_first_hits(local_lex, paras))
+    spanning = spanning_lex.scan(text, first_only=True)
+    results: Dict[str, Dict[str, Any]] = {}
+    for i in range(1, 16):
+        name = str(i)
+        hits: List[str] = []
+        for is_local, k in layout.get(name, []):
+            if is_local:
+                m = next((ph[name][k] for ph in per_para if k in ph.get(name, {})), None)
+            else:
+                spans = spanning[name][k]
+                m = text[spans[0][0]:spans[0][1]] if spans else None
+            if m is not None:
+                hits.append(m)
+        s, hits = _score_rule_hits(i, hits)
+        results[name] = {"score": s, "hits": hits}
+    return results
+
+def _images_closed(paragraph: str) -> bool:
+    """
+    마크다운/HTML 이미지 표현이 문단 안에서 모두 끝나는지
+    (제거 후 남은 '![' / '<img'는 전체 텍스트에서 다음 문단까지 이어서 매치될 수 있음)
+    """
+    md_removed = _MKDOWN_IMG_RE.sub(' ', paragraph)
+    if "![" in md_removed:
+        return False
+    return "<img" not in _HTML_IMG_RE.sub(' ', md_removed).lower()
+
+def _seo_paragraph_parts(paragraphs: List[str]) -> List[Tuple[str, int, int, bool]]:
+    """문단별 (정제 텍스트, 이미지 수, 형태소 수, 이미지 표현이 문단 안에서 끝났는지)"""
+    prepared = [_extract_images_and_clean_text(p) for p in paragraphs]
+    counts = iter(_count_morphemes_batch([cleaned for cleaned, _ in prepared if cleaned]))
+    return [
+        (cleaned, image_count, next(counts) if cleaned else 0, _images_closed(p))
+        for p, (cleaned, image_count) in zip(paragraphs, prepared)
+    ]
+
+def calculate_seo_metrics_incremental(title: str, content: str) -> Dict[str, int]:
+    """
+    calculate_seo_metrics와 같은 측정값을 문단 캐시로 계산 (바뀐 문단만 정제 + 형태소 분석)
+    - 형태소 수는 문단별 형태소 수의 합
+    - 이미지 표현이 문단 경계를 넘으면 전체 텍스트 계산으로 대체
+    """
+    global _SEO_PARAGRAPHS
+    from utils import paragraph_cache
+    if _SEO_PARAGRAPHS is None:
+        _SEO_PARAGRAPHS = paragraph_cache.ParagraphCache()
+    parts = _SEO_PARAGRAPHS.get_many(paragraph_cache.split(content), _seo_paragraph_parts)
+    if not all(closed for _, _, _, closed in parts):
+        return calculate_seo_metrics(title, content)
+    cleaned = " ".join(c for c, _, _, _ in parts if c)
+    return _seo_metrics_from_cleaned(title, cleaned,
+                                     sum(n for _, n, _, _ in parts),
+                                     sum(m for _, _, m, _ in parts))
+
+def build_delta_eval_prompt(title: str, content: str, items: List[int], changed: List[str],
+                            removed: List[str], previous: Dict[str, int]) -> str:
+    """재평가 프롬프트: 평가 프롬프트(전체 글) + 재채점 범위(초과 항목 · 바뀐 문단)"""
+    base = (_prompt_template(EVAL_PROMPT_PATH)
+            .replace("[여기에 제목 입력]", title)
+            .replace("[여기에 본문 입력]", content))
+    values = {
+        "items": json.dumps([f"{CHECKLIST_NAMES[i]}({i})" for i in items], ensure_ascii=False),
+        "previous": json.dumps(previous, ensure_ascii=False),
+        "changed": "\n\n".join(changed) or "(없음)",
+        "removed": "\n\n".join(removed) or "(없음)",
+    }
+    delta = re.sub(r"\{(items|previous|changed|removed)\}", lambda m: values[m.group(1)],
+                   _prompt_template(DELTA_PROMPT_PATH))
+    enforce = "\n\n반드시 위의 재평가 출력 형식의 JSON만 출력하고, 추가 설명은 쓰지 마십시오."
+    return base + "\n\n" + delta + enforce
+
+def _delta_llm_eval(model, title: str, content: str, items: List[int], changed: List[str],
+                    removed: List[str], previous: Dict[str, int]) -> Union[Dict[str, Any], None]:
+    """
+    초과 항목 위주 LLM 재채점 → 직전 점수에 덮어쓴 전체 평가결과
+    응답을 해석할 수 없으면 None (호출 측에서 전체 재평가)
+    """
+    prev = {str(i): int(previous.get(str(i), 0)) for i in range(1, 16)}
+    try:
+        result = _call_llm(model, build_delta_eval_prompt(title, content, items, changed, removed, prev))
+    except (RuntimeError, ValueError) as e:
+        print(f"⚠️ 부분 재평가 응답 해석 실패 → 전체 재평가: {e}")
+        return None
+    scores = result.get("평가결과")
+    if not isinstance(scores, dict):
+        print("⚠️ 부분 재평가 응답에 평가결과 없음 → 전체 재평가")
+        return None
+    merged = dict(prev)
+    for k, v in scores.items():
+        k = str(k).strip()
+        if k in merged:
+            try:
+                merged[k] = int(v)
+            except (TypeError, ValueError):
+                pass
+    return {
+        "평가결과": merged,
+        "상세분석": result.get("상세분석", "") or "",
+        "권고수정": result.get("권고수정", []) or [],
+    }
+
 # ===== 재생성 적합도(0~100) =====
 RISK_KEYWORDS = {
     "부작용": [r"부작용", r"주의사항", r"개인차", r"합병증"],
@@ -1361,21 +1741,19 @@ def get_medical_violation_status(final_score: int, threshold: int) -> str:
     return "적합" if final_score <= threshold else "부적합"
 
 # ===== 메인 루프 =====
-def run_single_mode(criteria_mode: str = "표준",
-        max_loops: int = 2,
-        auto_yes: bool = False,
-        log_dir: Union[str, None] = None,
-        pattern: Union[str, None] = None,
-        debug: bool = False,
-        csv_path: Union[str, None] = None,
-        report_path: Union[str, None] = None,
-        evaluation_mode: str = "medical"):
-
-    # 로그 디렉토리 (타임스탬프별 폴더 생성)
-    base_log_dir = Path(log_dir) if log_dir else DEFAULT_LOG_DIR
-    current_timestamp = _nowstamp()
-    log_dir_path = _ensure_timestamp_log_dir(base_log_dir, current_timestamp)
+def _mode_result(evaluation_mode: str, criteria_mode: str, out: Dict[str, Any],
+                 out_path: Path, ui_path: Union[str, None]) -> Dict[str, Any]:
+    return {
+        "mode": evaluation_mode,
+        "criteria": criteria_mode,
+        "evaluation": out,
+        "evaluation_path": str(out_path),
+        "ui_checklist_path": ui_path,
+    }
 
+def _load_evaluation_target(log_dir_path: Path, pattern: Union[str, None] = None,
+                            pipeline_run=None) -> Tuple[Path, str, str]:
+    """평가 대상 (content_path, title, content) 로드 - PipelineRun이 있으면 파일 탐색 없이 직접 사용"""
     # 탐색 패턴을 TXT 파일로 변경
     patterns = [p.strip() for p in (pattern.split(",") if pattern else []) if p.strip()]
     search_patterns = patterns or [
@@ -1385,7 +1763,11 @@ def run_single_mode(criteria_mode: str = "표준",
         "*_content_result.txt"
     ]
 
-    # 0) TXT 파일 로드
+    if pipeline_run is not None and pipeline_run.content is not None:
+        content_path = Path(pipeline_run.artifacts.get("content_txt", f"{pipeline_run.run_id}_title_content_result.txt"))
+        title, content = pipeline_run.title_and_body()
+        return content_path, title, content
+
     content_path = _latest(log_dir_path, search_patterns)
     
     # TXT 파일 읽기
@@ -1399,6 +1781,38 @@ def run_single_mode(criteria_mode: str = "표준",
     else:
         title = ""
         content = ""
+    return content_path, title, content
+
+def run_single_mode(criteria_mode: str = "표준",
+        max_loops: int = 2,
+        auto_yes: bool = False,
+        log_dir: Union[str, None] = None,
+        pattern: Union[str, None] = None,
+        debug: bool = False,
+        csv_path: Union[str, None] = None,
+        report_path: Union[str, None] = None,
+        evaluation_mode: str = "medical",
+        pipeline_run=None,
+        timestamp: Union[str, None] = None,
+        file_tag: Union[str, None] = None,
+        target: Union[Tuple[Path, str, str], None] = None,
+        db_update: bool = True) -> Dict[str, Any]:
+    """
+    단일 모드(medical|seo) 평가 + 재생성 루프
+    - timestamp/file_tag: 통합 평가 시 같은 타임스탬프를 쓰되 모드별 파일명이 겹치지 않도록 태그 부여
+    - target: 미리 로드한 (content_path, title, content) — 주어지면 다시 읽지 않음
+    - db_update=False: 자동 DB 업데이트는 호출 측에서 병합 처리
+    반환: {"mode", "criteria", "evaluation", "evaluation_path", "ui_checklist_path"}
+    """
+
+    # 로그 디렉토리 (타임스탬프별 폴더 생성)
+    base_log_dir = Path(log_dir) if log_dir else DEFAULT_LOG_DIR
+    current_timestamp = timestamp or _nowstamp()
+    log_dir_path = _ensure_timestamp_log_dir(base_log_dir, current_timestamp)
+    file_stem = f"{current_timestamp}_{file_tag}" if file_tag else current_timestamp
+
+    # 0) 평가 대상 로드
+    content_path, title, content = target or _load_evaluation_target(log_dir_path, pattern, pipeline_run)
     
     print(f"DEBUG - TXT에서 추출된 제목: '{title}'")
     print(f"DEBUG - TXT에서 추출된 본문 길이: {len(content)}")
@@ -1410,38 +1824,34 @@ def run_single_mode(criteria_mode: str = "표준",
     if not content:
         content = "제목 평가용 더미 콘텐츠입니다."
 
-    # SEO 모드에서 실제 측정값 계산 (정제 적용)
+    # SEO 모드에서 실제 측정값 계산 (정제 적용 · 재평가 때 바뀐 문단만 다시 계산하도록 문단 캐시 사용)
     seo_metrics = {}
     if evaluation_mode == "seo":
-        seo_metrics = calculate_seo_metrics(title, content)
+        seo_metrics = calculate_seo_metrics_incremental(title, content)
 
-    # 1) 기준/CSV/리포트 가중치 로드
-    if evaluation_mode == "seo":
-        criteria = _read_json(SEO_CRITERIA_PATH)
-        eval_prompt_path = SEO_PROMPT_PATH
-    else:
-        criteria = _read_json(CRITERIA_PATH)
-        eval_prompt_path = EVAL_PROMPT_PATH
+    # 1) 기준/CSV/리포트 가중치 로드 (평가 규칙 레지스트리 · 파일이 바뀌었을 때만 다시 로드)
+    rules = evaluation_rules(evaluation_mode, csv_path, report_path)
+    criteria = rules.criteria
+    eval_prompt_path = rules.prompt_path
     if evaluation_mode == "medical":
-        csv_file = Path(csv_path) if csv_path else _find_existing(DEFAULT_CSV_PATHS)
-        rows = load_checklist_csv(csv_file)
-        pats = compile_patterns(rows)
-        report_file = Path(report_path) if report_path else _find_existing(DEFAULT_REPORT_PATHS)
-        weights = parse_report_weights(report_file)
+        pats = rules.patterns
+        weights = dict(rules.weights)  # 결과 JSON에 그대로 기록
         # 2) 규칙 기반 사전 스코어
-        rule_all = rule_score_all(title, content, pats)
+        rule_all = rule_score_incremental(title, content, pats, rules.lexicon)
     else:
         # SEO 모드에서는 규칙 기반 평가 건너뛰기
         rule_all = {}
         weights = {str(i): 1.0 for i in range(1, 10)}  # SEO는 9개 항목
 
     # 3) LLM 평가
-    model = _setup_llm()
+    model = _setup_llm(mode=base_log_dir.name)
     if evaluation_mode == "seo":
         eval_prompt = build_eval_prompt(title, content, eval_prompt_path, seo_metrics)
     else:
         eval_prompt = build_eval_prompt(title, content, eval_prompt_path)
+    t_eval = time.time()
     result = _call_llm(model, eval_prompt)
+    eval_sec = time.time() - t_eval
     llm_scores: Dict[str, int] = result.get("평가결과", {}) or {}
     analysis: str = result.get("상세분석", "") or ""
     tips: List[str] = result.get("권고수정", []) or []
@@ -1460,7 +1870,7 @@ def run_single_mode(criteria_mode: str = "표준",
     # 4) 판정/가중 총점
     violations_before = over_threshold(final_scores, criteria, criteria_mode, evaluation_mode)
     print(f"DEBUG - final_scores: {final_scores}")
-    print(f"DEBUG - criteria[{criteria_mode}]: {criteria.get(criteria_mode)}")
+    print(f"DEBUG - criteria[{criteria_mode}]: {dict(criteria.get(criteria_mode) or {})}")
     weighted_total_before = weighted_total(final_scores, weights, evaluation_mode)
 
     history: List[Dict[str, Any]] = []
@@ -1468,20 +1878,34 @@ def run_single_mode(criteria_mode: str = "표준",
     patched_once = False
     title_before, content_before = title, content
     applied_patch_obj = None  # 패치 객체 초기화
+    regen_skipped = False     # 시간 예산 부족으로 재생성 생략
+    regen_aborted = False     # 재생성 도중 데드라인 초과 → 직전 상태로 복원
+    reeval_info: Dict[str, Any] = {}  # 마지막 재평가 범위 (바뀐 문단 수 / LLM 재채점 방식)
+
+    from llm import DeadlineExceeded
 
     while True:
         loop += 1
-        history.append({
-            "loop": loop,
-            "rule_scores": {k:v["score"] for k,v in rule_all.items()},
-            "llm_scores": llm_scores,
-            "final_scores": final_scores,
-            "violations": violations_before,
-            "analysis": analysis,
-            "tips": tips
-        })
-
-        if not violations_before or loop >= max_loops:
+        if not regen_aborted:  # 재생성 중단 시 복원된 상태는 이미 history에 있음
+            history.append({
+                "loop": loop,
+                "rule_scores": {k:v["score"] for k,v in rule_all.items()},
+                "llm_scores": llm_scores,
+                "final_scores": final_scores,
+                "violations": violations_before,
+                "analysis": analysis,
+                "tips": tips
+            })
+
+        if violations_before and loop < max_loops and not regen_skipped:
+            left = _regen_time_left(eval_sec)
+            if left is not None:
+                regen_skipped = True
+                if pipeline_run is not None:
+                    pipeline_run.degrade("evaluation", "skip_regeneration",
+                                         f"{evaluation_mode}: 남은 {left:.1f}s < 재생성 예상 {2 * eval_sec:.1f}s")
+
+        if not violations_before or loop >= max_loops or regen_skipped:
             # 최종 산출 JSON
             out = {
                 "input": {
@@ -1532,7 +1956,9 @@ def run_single_mode(criteria_mode: str = "표준",
                     "names": [(SEO_CHECKLIST_NAMES[i] if evaluation_mode == "seo" else CHECKLIST_NAMES[i]) for i in violations_before]
                 },
                 "regen_fit": {
-                    "applied": patched_once
+                    "applied": patched_once,
+                    **({"skipped_by_deadline": True} if regen_skipped else {}),
+                    **({"reevaluation": reeval_info} if patched_once and reeval_info else {})
                 },
                 "notes": {
                     "recommendations": tips,
@@ -1557,19 +1983,20 @@ def run_single_mode(criteria_mode: str = "표준",
 
             # 재생성 후 최종 평가 결과는 _after 접미사 추가
             if patched_once:
-                out_path = log_dir_path / f"{current_timestamp}_evaluation_after.json"
+                out_path = log_dir_path / f"{file_stem}_evaluation_after.json"
             else:
-                out_path = log_dir_path / f"{current_timestamp}_evaluation.json"
+                out_path = log_dir_path / f"{file_stem}_evaluation.json"
             _write_json(out_path, out)
             
             # ⭐ UI checklist 로그 생성
-            generate_ui_checklist_logs(out, str(out_path))
+            ui_path = generate_ui_checklist_logs(out, str(out_path))
             
             # ⭐ 자동 DB 업데이트
-            auto_update_medicontent_posts(out, str(out_path))
+            if db_update:
+                auto_update_medicontent_posts(out, str(out_path), pipeline_run=pipeline_run)
 
             if patched_once:
-                patched_path = log_dir_path / f"{current_timestamp}_content.patched.json"
+                patched_path = log_dir_path / f"{file_stem}_content.patched.json"
                 # 패치 정보와 함께 저장
                 patched_data = {
                     "title": title,
@@ -1585,9 +2012,14 @@ def run_single_mode(criteria_mode: str = "표준",
                 }
                 _write_json(patched_path, patched_data)
 
-            print(("✅ 기준 충족. " if not violations_before else "⚠️ 반복 상한 도달. ") +
-                  f"결과 저장: {out_path.name}")
-            return
+            if not violations_before:
+                status = "✅ 기준 충족. "
+            elif regen_skipped:
+                status = "⚠️ 시간 예산 부족으로 재생성 생략. "
+            else:
+                status = "⚠️ 반복 상한 도달. "
+            print(status + f"결과 저장: {out_path.name}")
+            return _mode_result(evaluation_mode, criteria_mode, out, out_path, ui_path)
 
         # 필요 시 재생성
         if not auto_yes:
@@ -1654,17 +2086,18 @@ def run_single_mode(criteria_mode: str = "표준",
                     "content": content
                 }
         
-                out_path = log_dir_path / f"{current_timestamp}_evaluation_declined.json"
+                out_path = log_dir_path / f"{file_stem}_evaluation_declined.json"
                 _write_json(out_path, out)
                 print(f"⚠️ 재생성 거부. 원본 평가 결과 저장: {out_path.name}")
                 
                 # ⭐ UI checklist 로그 생성
-                generate_ui_checklist_logs(out, str(out_path))
+                ui_path = generate_ui_checklist_logs(out, str(out_path))
                 
                 # ⭐ 자동 DB 업데이트
-                auto_update_medicontent_posts(out, str(out_path))
+                if db_update:
+                    auto_update_medicontent_posts(out, str(out_path), pipeline_run=pipeline_run)
                 
-                return
+                return _mode_result(evaluation_mode, criteria_mode, out, out_path, ui_path)
                 
 
         # ⭐ 재생성 전 평가 결과 저장 (BEFORE)
@@ -1729,37 +2162,68 @@ def run_single_mode(criteria_mode: str = "표준",
         }
         
         # 재생성 전 평가 결과 저장
-        before_out_path = log_dir_path / f"{current_timestamp}_evaluation_before.json"
+        before_out_path = log_dir_path / f"{file_stem}_evaluation_before.json"
         _write_json(before_out_path, before_out)
         print(f"💾 재생성 전 평가 결과 저장: {before_out_path.name}")
         
         # ⭐ 재생성 전 UI checklist 로그도 생성
         generate_ui_checklist_logs(before_out, str(before_out_path))
 
-        # 재생성 → 패치
-        stage = map_stage(violations_before)
-        regen_prompt = build_regen_prompt(title, content, criteria_mode, violations_before, tips)
-        patch_obj = _call_llm(model, regen_prompt)
-        title, content = apply_patches(title, content, patch_obj)
-        patched_once = True
-        
-        # 패치 객체를 나중에 사용할 수 있도록 저장
-        applied_patch_obj = patch_obj
-
-        # ⭐ 재평가 사이클: 규칙 + LLM + SEO메트릭 모두 다시 계산
-        if evaluation_mode == "medical":
-            rule_all = rule_score_all(title, content, pats)
-        else:
-            rule_all = {}
-        
-        # ⭐ SEO 모드에서 재생성 후 메트릭 재계산!
-        if evaluation_mode == "seo":
-            seo_metrics = calculate_seo_metrics(title, content)  # ← 재계산!
-            eval_prompt = build_eval_prompt(title, content, eval_prompt_path, seo_metrics)
-        else:
-            eval_prompt = build_eval_prompt(title, content, eval_prompt_path)
-            
-        result = _call_llm(model, eval_prompt)
+        # 재생성 → 패치 (도중에 데드라인을 넘기면 직전 평가 상태로 되돌리고 종료)
+        snapshot = (title, content, patched_once, applied_patch_obj, rule_all, seo_metrics, reeval_info)
+        try:
+            stage = map_stage(violations_before)
+            regen_prompt = build_regen_prompt(title, content, criteria_mode, violations_before, tips)
+            patch_obj = _call_llm(model, regen_prompt)
+            title, content = apply_patches(title, content, patch_obj)
+            patched_once = True
+
+            # 패치 객체를 나중에 사용할 수 있도록 저장
+            applied_patch_obj = patch_obj
+
+            # ⭐ 재평가 사이클: 바뀐 문단만 다시 계산 (규칙 + SEO메트릭은 문단 캐시, LLM은 재채점 범위 축소)
+            from utils import paragraph_cache
+            changed, removed = paragraph_cache.diff(f"{snapshot[0]}\n\n{snapshot[1]}", f"{title}\n\n{content}")
+            total_paragraphs = len(paragraph_cache.split(f"{title}\n\n{content}"))
+            reeval_info = {"changed_paragraphs": len(changed), "removed_paragraphs": len(removed),
+                           "total_paragraphs": total_paragraphs}
+
+            if not changed and not removed:
+                # 패치가 적용되지 않음(before 구절 불일치 등) → 같은 글이므로 직전 평가 그대로
+                print(f"🔁 [{evaluation_mode}] 패치로 바뀐 문단 없음 → 직전 평가 재사용")
+                reeval_info["llm"] = "reused"
+                result = {"평가결과": llm_scores, "상세분석": analysis, "권고수정": tips}
+            else:
+                if evaluation_mode == "medical":
+                    rule_all = rule_score_incremental(title, content, pats, rules.lexicon)
+                else:
+                    rule_all = {}
+
+                # ⭐ SEO 모드에서 재생성 후 메트릭 재계산! (바뀐 문단만)
+                if evaluation_mode == "seo":
+                    seo_metrics = calculate_seo_metrics_incremental(title, content)
+
+                result = None
+                if (evaluation_mode == "medical" and EVAL_DELTA_LLM
+                        and len(changed) <= EVAL_DELTA_MAX_CHANGED_RATIO * total_paragraphs):
+                    result = _delta_llm_eval(model, title, content, violations_before,
+                                             changed, removed, llm_scores)
+                    reeval_info["llm"] = "delta"
+                if result is None:
+                    if evaluation_mode == "seo":
+                        eval_prompt = build_eval_prompt(title, content, eval_prompt_path, seo_metrics)
+                    else:
+                        eval_prompt = build_eval_prompt(title, content, eval_prompt_path)
+                    result = _call_llm(model, eval_prompt)
+                    reeval_info["llm"] = "full"
+                print(f"🔁 [{evaluation_mode}] 재평가: 문단 {len(changed)}/{total_paragraphs}개 변경"
+                      f"{f' · {len(removed)}개 삭제' if removed else ''} → LLM {reeval_info['llm']}")
+        except DeadlineExceeded as e:
+            title, content, patched_once, applied_patch_obj, rule_all, seo_metrics, reeval_info = snapshot
+            regen_skipped = regen_aborted = True
+            if pipeline_run is not None:
+                pipeline_run.degrade("evaluation", "skip_regeneration", f"{evaluation_mode}: {e}")
+            continue
         llm_scores = result.get("평가결과", {}) or {}
         analysis = result.get("상세분석", "") or ""
         tips = result.get("권고수정", []) or []
@@ -1770,6 +2234,10 @@ def run_single_mode(criteria_mode: str = "표준",
         weighted_total_before = weighted_total(final_scores, weights, evaluation_mode)
         # 다음 루프
 
+# 통합 평가 시 의료법 → SEO 기준 매핑
+MEDICAL_CRITERIA_MODES = {"엄격": "엄격", "표준": "표준", "유연": "유연"}
+SEO_CRITERIA_MODES = {"엄격": "우수", "표준": "양호", "유연": "보통"}
+
 def run(criteria_mode: str = "표준",
         max_loops: int = 2,
         auto_yes: bool = False,
@@ -1778,74 +2246,88 @@ def run(criteria_mode: str = "표준",
         debug: bool = False,
         csv_path: Union[str, None] = None,
         report_path: Union[str, None] = None,
-        evaluation_mode: str = "both"):
+        evaluation_mode: str = "both",
+        pipeline_run=None):
     """
     메인 실행 함수 - 기본적으로 의료법과 SEO 둘 다 실행
+    pipeline_run: PipelineRun이 주어지면 최신 TXT 탐색 대신 run.content를 평가
+    반환: both → {"medical": 결과, "seo": 결과} / 개별 모드 → 해당 모드 결과
     """
     
     if evaluation_mode == "both":
-        print("🔄 통합 평가 모드: 의료법 + SEO 평가를 순차 실행합니다")
-        print("=" * 60)
-        
-        # 1) 의료법 평가 실행
-        print("📋 1단계: 의료법 평가 실행 중...")
-        medical_criteria_modes = {
-            "엄격": "엄격",
-            "표준": "표준", 
-            "유연": "유연"
-        }
-        medical_criteria = medical_criteria_modes.get(criteria_mode, "표준")
-        
-        try:
-            run_single_mode(
-                criteria_mode=medical_criteria,
-                max_loops=max_loops,
-                auto_yes=auto_yes,
-                log_dir=log_dir,
-                pattern=pattern,
-                debug=debug,
-                csv_path=csv_path,
-                report_path=report_path,
-                evaluation_mode="medical"
-            )
-            print("✅ 의료법 평가 완료!")
-        except Exception as e:
-            print(f"❌ 의료법 평가 실패: {e}")
-        
-        print("-" * 60)
-        
-        # 2) SEO 평가 실행  
-        print("📈 2단계: SEO 평가 실행 중...")
-        seo_criteria_modes = {
-            "엄격": "우수",
-            "표준": "양호",
-            "유연": "보통"
+        # 평가 대상은 한 번만 로드해서 두 모드가 공유 (각 모드의 점수/재생성 상태는 독립)
+        current_timestamp = _nowstamp()
+        base_log_dir = Path(log_dir) if log_dir else DEFAULT_LOG_DIR
+        log_dir_path = _ensure_timestamp_log_dir(base_log_dir, current_timestamp)
+        target = _load_evaluation_target(log_dir_path, pattern, pipeline_run)
+
+        jobs = {
+            "medical": dict(criteria_mode=MEDICAL_CRITERIA_MODES.get(criteria_mode, "표준"),
+                            evaluation_mode="medical", file_tag="legal"),
+            "seo": dict(criteria_mode=SEO_CRITERIA_MODES.get(criteria_mode, "양호"),
+                        evaluation_mode="seo", file_tag="seo"),
         }
-        seo_criteria = seo_criteria_modes.get(criteria_mode, "양호")
-        
-        try:
-            run_single_mode(
-                criteria_mode=seo_criteria,
-                max_loops=max_loops,
-                auto_yes=auto_yes,
-                log_dir=log_dir,
-                pattern=pattern,
-                debug=debug,
-                csv_path=csv_path,
-                report_path=report_path,
-                evaluation_mode="seo"
-            )
-            print("✅ SEO 평가 완료!")
-        except Exception as e:
-            print(f"❌ SEO 평가 실패: {e}")
+        labels = {"medical": "의료법", "seo": "SEO"}
+
+        from llm import DeadlineExceeded
+
+        def _run_mode(name: str):
+            try:
+                result = run_single_mode(
+                    max_loops=max_loops,
+                    auto_yes=auto_yes,
+                    log_dir=log_dir,
+                    pattern=pattern,
+                    debug=debug,
+                    csv_path=csv_path,
+                    report_path=report_path,
+                    pipeline_run=pipeline_run,
+                    timestamp=current_timestamp,
+                    target=target,
+                    db_update=False,
+                    **jobs[name]
+                )
+                print(f"✅ {labels[name]} 평가 완료!")
+                return result
+            except DeadlineExceeded as e:
+                print(f"⚠️ {labels[name]} 평가 시간 예산 초과: {e}")
+                if pipeline_run is not None:
+                    pipeline_run.degrade("evaluation", f"skip_{name}", str(e))
+                return None
+            except Exception as e:
+                print(f"❌ {labels[name]} 평가 실패: {e}")
+                return None
+
+        results: Dict[str, Any] = {}
+        if auto_yes:
+            # 재생성 확인 입력이 없으므로 두 모드를 병렬 실행
+            print("🔄 통합 평가 모드: 의료법 + SEO 평가를 병렬 실행합니다")
+            print("=" * 60)
+            import contextvars
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="evaluation") as pool:
+                # 단계 데드라인(contextvar)을 워커 스레드로 전달
+                futures = {name: pool.submit(contextvars.copy_context().run, _run_mode, name) for name in jobs}
+                results = {name: fut.result() for name, fut in futures.items()}
+        else:
+            # 대화형(재생성 Y/n 입력)일 때는 입력이 섞이지 않도록 순차 실행
+            print("🔄 통합 평가 모드: 의료법 + SEO 평가를 순차 실행합니다")
+            print("=" * 60)
+            for name in jobs:
+                results[name] = _run_mode(name)
+                print("-" * 60)
+
+        # ⭐ 자동 DB 업데이트 (두 모드 점수를 한 번에 반영)
+        auto_update_medicontent_posts_merged(results, pipeline_run=pipeline_run)
         
         print("=" * 60)
         print("🎉 통합 평가 완료! 의료법과 SEO 평가 결과를 각각 확인하세요.")
+        return results
         
     else:
         # 개별 모드 실행
         print(f"🎯 개별 평가 모드: {evaluation_mode} 평가만 실행합니다")
-        run_single_mode(
+        return run_single_mode(
             criteria_mode=criteria_mode,
             max_loops=max_loops,
             auto_yes=auto_yes,
@@ -1854,7 +2336,8 @@ def run(criteria_mode: str = "표준",
             debug=debug,
             csv_path=csv_path,
             report_path=report_path,
-            evaluation_mode=evaluation_mode
+            evaluation_mode=evaluation_mode,
+            pipeline_run=pipeline_run
         )
 
 # ===== CLI =====
@@ -6,17 +6,17 @@ InputAgent (병원 입력/이미지 업로드 통합 + 임상 컨텍스트 빌
 - 공통 목표: test/use 모두 최종 스키마 동일 + case_id 업서트 + 날짜별 로그
 - 질문 순서: Q1 → Q2 → Q3(이미지 배열) → Q4 → Q5(이미지 배열) → Q6 → Q7(이미지 배열) → Q8
 - 이미지 필드: question3_visit_images / question5_therapy_images / question7_result_images
-- 로그: test_logs/{mode}/{YYYYMMDD}/{YYYYMMDD_HHMMSS}_input_logs.json (배열 append)
+- 로그: test_logs/{mode}/{YYYYMMDD}/{YYYYMMDD_HHMMSS}_input_logs.jsonl (한 줄 append · 파일 잠금)
 """
 
 from __future__ import annotations
 
+import io
 import os
 import re
+import sys
 import json
 import shutil
-import pickle
-import hashlib
 import difflib
 from pathlib import Path
 from datetime import datetime
@@ -24,10 +24,18 @@ from typing import Optional, Dict, List, Tuple, Any
 
 import pandas as pd
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from utils import file_index, log_index, log_store, reference_registry, table_cache
+
 # =========================
 # 경로/시간 유틸 & JSON 헬퍼
 # =========================
 TEST_RESULT_PATH = Path("test_data/test_input_result.json")
+# 임상 컨텍스트 빌드 여부 (CLINICAL_CONTEXT=0 이면 끔)
+CLINICAL_CONTEXT_ENABLED = os.getenv("CLINICAL_CONTEXT", "1") != "0"
 
 def _today_str() -> str:
     return datetime.now().strftime("%Y%m%d")
@@ -43,20 +51,6 @@ def _ensure_date_log_dir(mode: str) -> Path:
     d.mkdir(parents=True, exist_ok=True)
     return d
 
-def _append_json_array(path: Path, item: dict):
-    arr = []
-    if path.exists():
-        try:
-            with open(path, encoding="utf-8") as f:
-                arr = json.load(f)
-            if not isinstance(arr, list):
-                arr = []
-        except Exception:
-            arr = []
-    arr.append(item)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(arr, f, ensure_ascii=False, indent=2)
-
 def _read_json(path: Path):
     if path.exists():
         try:
@@ -80,21 +74,24 @@ def _gen_case_id(save_name: str) -> str:
 # CSV 로더 (인코딩 강인)
 # =========================
 def read_csv_kr(path: str | Path):
+    """한글 CSV 읽기 — 바이트는 1번만 읽고 인코딩은 디코딩으로만 판별 (pandas 파싱 1회)"""
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다: {path}")
+    raw = path.read_bytes()
     encodings = ["utf-8", "utf-8-sig", "cp949", "euc-kr", "latin1"]
-    last_err = None
+    text = None
     for enc in encodings:
         try:
-            return pd.read_csv(path, encoding=enc).fillna("")
-        except Exception as e:
-            last_err = e
+            text = raw.decode(enc)
+            break
+        except UnicodeDecodeError:
             continue
-    try:
-        return pd.read_csv(path, encoding="utf-8", errors="ignore").fillna("")
-    except Exception:
-        raise last_err
+    if text is None:
+        text = raw.decode("utf-8", errors="ignore")
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    return pd.read_csv(io.StringIO(text)).fillna("")
 
 # =========================
 # 레거시 케이스 → 새 스키마 변환기
@@ -155,27 +152,35 @@ def migrate_legacy_case_to_new_schema(legacy_case: dict) -> dict:
 class ClinicalContextBuilder:
     """
     category_data.csv(증상/진료/치료/카테고리) 기반
-    - 카테고리별 키워드 KB
-    - 행 인덱스(원문+토큰) 캐시
+    - 카테고리별 키워드 KB / 행 인덱스(원문+토큰) → cache/tables 바이너리 캐시 (CSV 내용이 바뀌면 재생성)
+    - 역색인: 용어→카테고리, 부분문자열(n-gram)→카테고리, 토큰→행 (전수 비교 없이 스코어링/매칭)
     - 스코어링/매칭/임상 흐름 빌더
     """
 
     NONWORD_RE = re.compile(r"[^가-힣A-Za-z0-9\s]")
+    CACHE_VERSION = 1  # KB/트리/역색인 빌드 로직이 바뀌면 올릴 것
+    INDEX_ATTRS = ("_term_cats", "_long_cats", "_gram_cats", "_max_term_len", "_row_sets", "_row_postings")
+    FIELDS = ("symptoms", "procedures", "treatments")
+    ROW_TOKEN_KEYS = ("sym_tokens", "proc_tokens", "tx_tokens")
 
     def __init__(self, category_csv_path: str, cache_dir: str = "cache"):
         self.category_csv_path = Path(category_csv_path)
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.table_cache_dir = self.cache_dir / "tables"
+        table_cache.remove_legacy(self.cache_dir, "*.tree.pkl")  # 구형 {md5}.tree.pkl
 
-        self.file_sig = self._file_signature(self.category_csv_path)
-        self.category_kb = self._build_kb_from_csv()
+        self._df = None  # 캐시 미스일 때만 CSV를 1번 파싱해서 KB/트리가 공유
+        self.category_kb = table_cache.cached_object(
+            self.category_csv_path, "kb", lambda _: self._build_kb_from_csv(),
+            version=self.CACHE_VERSION, cache_dir=self.table_cache_dir)
         self.tree = self._load_or_build_tree_cache()
-
-    @staticmethod
-    def _file_signature(path: Path) -> str:
-        st = os.stat(path)
-        base = f"{path}|{st.st_mtime}|{st.st_size}"
-        return hashlib.md5(base.encode()).hexdigest()
+        self._df = None
+        indexes = table_cache.cached_object(
+            self.category_csv_path, "index", lambda _: self._build_indexes(),
+            version=self.CACHE_VERSION, cache_dir=self.table_cache_dir)
+        for name, value in indexes.items():
+            setattr(self, name, value)
 
     @staticmethod
     def _clean_text(s: str) -> str:
@@ -203,14 +208,20 @@ class ClinicalContextBuilder:
                 out.append(x)
         return out
 
+    def _frame(self) -> pd.DataFrame:
+        if self._df is None:
+            df = table_cache.cached_table(self.category_csv_path, read_csv_kr, cache_dir=self.table_cache_dir)
+            for col in ["증상", "진료", "치료", "카테고리"]:
+                if col not in df.columns:
+                    df[col] = ""
+            self._df = df
+        return self._df
+
     def _build_kb_from_csv(self) -> Dict[str, Dict[str, List[str]]]:
         kb: Dict[str, Dict[str, List[str]]] = {}
         if not self.category_csv_path.exists():
             return kb
-        df = read_csv_kr(self.category_csv_path)
-        for col in ["증상", "진료", "치료", "카테고리"]:
-            if col not in df.columns:
-                df[col] = ""
+        df = self._frame()
         for _, row in df.iterrows():
             cat = self._clean_text(str(row.get("카테고리", "")))
             if not cat:
@@ -228,10 +239,7 @@ class ClinicalContextBuilder:
         tree: Dict[str, List[Dict]] = {}
         if not self.category_csv_path.exists():
             return tree
-        df = read_csv_kr(self.category_csv_path)
-        for col in ["증상", "진료", "치료", "카테고리"]:
-            if col not in df.columns:
-                df[col] = ""
+        df = self._frame()
         for _, row in df.iterrows():
             cat = self._clean_text(str(row.get("카테고리", "")))
             if not cat:
@@ -251,17 +259,62 @@ class ClinicalContextBuilder:
         return tree
 
     def _load_or_build_tree_cache(self) -> Dict[str, List[Dict]]:
-        cache_path = self.cache_dir / f"{self.file_sig}.tree.pkl"
-        if cache_path.exists():
-            try:
-                with open(cache_path, "rb") as f:
-                    return pickle.load(f)
-            except Exception:
-                pass
-        tree = self._build_tree_index()
-        with open(cache_path, "wb") as f:
-            pickle.dump(tree, f)
-        return tree
+        return table_cache.cached_object(
+            self.category_csv_path, "tree", lambda _: self._build_tree_index(),
+            version=self.CACHE_VERSION, cache_dir=self.table_cache_dir)
+
+    # ---------- 역색인 ----------
+    def _build_indexes(self) -> Dict[str, Any]:
+        self._build_term_index()
+        self._build_row_index()
+        return {name: getattr(self, name) for name in self.INDEX_ATTRS}
+
+    @staticmethod
+    def _substrings(s: str, min_len: int = 1, max_len: Optional[int] = None):
+        n = len(s)
+        max_len = n if max_len is None else min(max_len, n)
+        for i in range(n):
+            for j in range(i + min_len, min(n, i + max_len) + 1):
+                yield s[i:j]
+
+    def _build_term_index(self):
+        """
+        필드별 카테고리 KB 역색인
+        - _term_cats:  용어 → 카테고리 (정확 일치)
+        - _long_cats:  길이 2 이상 용어 → 카테고리 (입력 안에 용어가 포함되는 경우)
+        - _gram_cats:  길이 2 이상 용어의 모든 부분문자열 → 카테고리 (용어 안에 입력이 포함되는 경우)
+        """
+        self._term_cats: Dict[str, Dict[str, set]] = {f: {} for f in self.FIELDS}
+        self._long_cats: Dict[str, Dict[str, set]] = {f: {} for f in self.FIELDS}
+        self._gram_cats: Dict[str, Dict[str, set]] = {f: {} for f in self.FIELDS}
+        self._max_term_len: Dict[str, int] = {f: 0 for f in self.FIELDS}
+        for cat, keys in self.category_kb.items():
+            for field, terms in keys.items():
+                for t in terms:
+                    self._term_cats.setdefault(field, {}).setdefault(t, set()).add(cat)
+                    if len(t) < 2:
+                        continue
+                    self._long_cats.setdefault(field, {}).setdefault(t, set()).add(cat)
+                    self._max_term_len[field] = max(self._max_term_len.get(field, 0), len(t))
+                    grams = self._gram_cats.setdefault(field, {})
+                    for g in self._substrings(t):
+                        grams.setdefault(g, set()).add(cat)
+
+    def _build_row_index(self):
+        """카테고리별 행 토큰 집합 + 필드별 토큰 → 행 번호 역색인"""
+        self._row_sets: Dict[str, List[Tuple[set, set, set]]] = {}
+        self._row_postings: Dict[str, Tuple[Dict[str, List[int]], ...]] = {}
+        for cat, rows in self.tree.items():
+            sets = []
+            postings: Tuple[Dict[str, List[int]], ...] = tuple({} for _ in self.ROW_TOKEN_KEYS)
+            for idx, e in enumerate(rows):
+                row_sets = tuple(set(e[k]) for k in self.ROW_TOKEN_KEYS)
+                sets.append(row_sets)
+                for field_i, toks in enumerate(row_sets):
+                    for tok in toks:
+                        postings[field_i].setdefault(tok, []).append(idx)
+            self._row_sets[cat] = sets
+            self._row_postings[cat] = postings
 
     def normalize(self, symptoms=None, procedures=None, treatments=None, fdi_teeth=None):
         def _norm_list(items: List[str]) -> List[str]:
@@ -275,19 +328,27 @@ class ClinicalContextBuilder:
         }
 
     def score_categories(self, normalized: Dict, category_hint: Optional[str] = None) -> Dict[str, float]:
+        """
+        카테고리 점수: 정확 일치 1.0, 부분 일치(입력⊂용어 또는 용어⊂입력) 0.5 × 필드 가중치
+        - 카테고리 수와 무관하게 입력 키워드의 부분문자열만 역색인에서 조회
+        """
         weights = {"symptoms": 1.0, "procedures": 0.8, "treatments": 1.2}
         scores = {cat: 0.0 for cat in self.category_kb.keys()}
-        for cat, keys in self.category_kb.items():
-            s = 0.0
-            for field, terms in keys.items():
-                base = normalized.get(field, [])
-                for b in base:
-                    if b in terms:
-                        s += 1.0 * weights.get(field, 1.0)
-                    else:
-                        if any((b in t) or (t in b) for t in terms if len(t) >= 2):
-                            s += 0.5 * weights.get(field, 1.0)
-            scores[cat] = s
+        for field in self.FIELDS:
+            w = weights.get(field, 1.0)
+            term_cats = self._term_cats.get(field, {})
+            long_cats = self._long_cats.get(field, {})
+            gram_cats = self._gram_cats.get(field, {})
+            max_len = self._max_term_len.get(field, 0)
+            for b in normalized.get(field, []):
+                exact = term_cats.get(b, set())
+                partial = set(gram_cats.get(b, ()))
+                for sub in self._substrings(b, 2, max_len):
+                    partial |= long_cats.get(sub, set())
+                for cat in exact:
+                    scores[cat] += 1.0 * w
+                for cat in partial - exact:
+                    scores[cat] += 0.5 * w
         if category_hint and category_hint in scores:
             scores[category_hint] *= 1.15
         maxv = max(scores.values()) if scores else 1.0
@@ -296,14 +357,17 @@ class ClinicalContextBuilder:
         return scores
 
     @staticmethod
-    def _jaccard(a: List[str], b: List[str]) -> float:
-        sa, sb = set(a), set(b)
+    def _jaccard_sets(sa: set, sb: set) -> float:
         if not sa and not sb:
             return 0.0
         inter = len(sa & sb)
         union = len(sa | sb) or 1
         return inter / union
 
+    @classmethod
+    def _jaccard(cls, a: List[str], b: List[str]) -> float:
+        return cls._jaccard_sets(set(a), set(b))
+
     def _row_similarity(self, norm: Dict, entry: Dict) -> float:
         w_sym, w_prc, w_tx = 1.0, 0.8, 1.2
         s1 = self._jaccard(norm.get("symptoms", []), entry["sym_tokens"])
@@ -312,17 +376,43 @@ class ClinicalContextBuilder:
         return w_sym * s1 + w_prc * s2 + w_tx * s3
 
     def match_topk(self, normalized: Dict, primary_cat: str, topk: int = 5) -> Dict:
+        """
+        토큰 역색인으로 겹치는 행만 Jaccard 계산 (겹치지 않는 행은 0점)
+        - 동점은 CSV 행 순서 유지, 양수 점수 행이 topk보다 적으면 0점 행을 행 순서대로 채움
+        """
         candidates = self.tree.get(primary_cat, [])
         if not candidates:
             return {"matches": [], "treatments": []}
-        scored: List[Tuple[float, Dict]] = []
-        for e in candidates:
-            scored.append((self._row_similarity(normalized, e), e))
-        scored.sort(key=lambda x: x[0], reverse=True)
+        w_sym, w_prc, w_tx = 1.0, 0.8, 1.2
+        norm_sets = tuple(set(normalized.get(f, [])) for f in self.FIELDS)
+        row_sets = self._row_sets.get(primary_cat, [])
+        postings = self._row_postings.get(primary_cat, ())
+
+        hit_rows = set()
+        for field_i, toks in enumerate(norm_sets):
+            for tok in toks:
+                hit_rows.update(postings[field_i].get(tok, ()))
+
+        scored: List[Tuple[float, int]] = []
+        for idx in hit_rows:
+            rs = row_sets[idx]
+            score = (w_sym * self._jaccard_sets(norm_sets[0], rs[0])
+                     + w_prc * self._jaccard_sets(norm_sets[1], rs[1])
+                     + w_tx * self._jaccard_sets(norm_sets[2], rs[2]))
+            scored.append((score, idx))
+        scored.sort(key=lambda x: (-x[0], x[1]))
         top = scored[:topk]
+        if len(top) < topk:
+            for idx in range(len(candidates)):
+                if len(top) >= topk:
+                    break
+                if idx not in hit_rows:
+                    top.append((0.0, idx))
+
         tx_scores: Dict[str, float] = {}
         matches = []
-        for score, e in top:
+        for score, idx in top:
+            e = candidates[idx]
             tx_text = e["treatment_text"] or ""
             matches.append(
                 {
@@ -387,6 +477,31 @@ class ClinicalContextBuilder:
             "recommended_treatments": topk_pack["treatments"],
         }
 
+# ==============
+# 참조 데이터 로더 (reference_registry용)
+# ==============
+def _load_persona_table(path: Path) -> Tuple[pd.DataFrame, Tuple[str, ...]]:
+    df = table_cache.cached_table(path, read_csv_kr)
+    return df, tuple(df["카테고리"].unique().tolist())
+
+def _load_select_table(path: Path) -> Optional[pd.DataFrame]:
+    if not path.exists():
+        return None
+    df = table_cache.cached_table(path, read_csv_kr)
+    for col in ["카테고리", "증상_선택", "진료_선택", "치료_선택"]:
+        if col not in df.columns:
+            df[col] = ""
+    return df
+
+def _load_hospital_list(path: Path) -> Tuple[Dict[str, Any], ...]:
+    if not path.exists():
+        return ()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return tuple(json.load(f) or [])
+    except Exception:
+        return ()
+
 # ==============
 # InputAgent
 # ==============
@@ -407,29 +522,22 @@ class InputAgent:
         self.test_data_path = Path(test_data_path)
         self.input_data = input_data
 
-        self.persona_df = read_csv_kr(persona_csv_path)
-        self.valid_categories = self.persona_df["카테고리"].unique().tolist()
+        # 참조 데이터는 프로세스 공용 레지스트리에서 공유 (파일이 바뀔 때만 다시 로드, 읽기 전용)
+        self.persona_df, self.valid_categories = reference_registry.get(
+            "persona_table", persona_csv_path, _load_persona_table)
 
         self.hospital_info_path = Path(hospital_info_path)
         self.hospital_image_path = Path(hospital_image_path)
 
-        self.hospital_list: List[Dict[str, Any]] = []
-        if self.hospital_info_path.exists():
-            try:
-                with open(self.hospital_info_path, encoding="utf-8") as f:
-                    self.hospital_list = json.load(f) or []
-            except Exception:
-                self.hospital_list = []
+        self.hospital_list: Tuple[Dict[str, Any], ...] = reference_registry.get(
+            "hospital_info", self.hospital_info_path, _load_hospital_list)
 
-        self.select_df = None
         self.select_csv_path = Path(select_csv_path)
-        if self.select_csv_path.exists():
-            self.select_df = read_csv_kr(self.select_csv_path)
-            for col in ["카테고리", "증상_선택", "진료_선택", "치료_선택"]:
-                if col not in self.select_df.columns:
-                    self.select_df[col] = ""
+        self.select_df = reference_registry.get("select_data", self.select_csv_path, _load_select_table)
 
-        self.context_builder = ClinicalContextBuilder(category_csv_path, cache_dir=cache_dir)
+        self.context_builder = reference_registry.get(
+            "clinical_context", category_csv_path,
+            lambda p: ClinicalContextBuilder(p, cache_dir=cache_dir), str(cache_dir))
 
     # ---------- 업서트 & 로그 ----------
     def upsert_test_input_result(self, payload: dict) -> None:
@@ -446,8 +554,8 @@ class InputAgent:
 
     def save_log(self, result: dict, mode: str = "use") -> None:
         date_dir = _ensure_date_log_dir(mode)
-        # 파일명: 오늘날짜_타임스탬프_input_logs.json  (예: 20250812_114416_input_logs.json)
-        filename = f"{_now_compact()}_input_logs.json"
+        # 파일명: 오늘날짜_타임스탬프_input_logs.jsonl  (예: 20250812_114416_input_logs.jsonl)
+        filename = f"{_now_compact()}{log_store.INPUT_LOG_SUFFIX}"
         log_path = date_dir / filename
 
         log_item = dict(result)
@@ -458,7 +566,8 @@ class InputAgent:
         log_item["mode"] = mode
         log_item["status"] = "temp"  # 기본적으로 임시 저장
 
-        _append_json_array(log_path, log_item)
+        log_store.append_entry(log_path, log_item)
+        log_index.index_file(log_path)
         print(f"📝 로그 저장 → {log_path}")
 
     def find_case_id_by_post_id(self, post_id: str, mode: str = "use") -> str:
@@ -466,12 +575,23 @@ class InputAgent:
         if not post_id:
             return None
             
+        # 인덱스 조회 (미색인 파일은 find_latest가 디스크와 대조해 보정, 조회 실패 시 아래 파일 스캔으로 대체)
+        try:
+            hit = log_index.find_latest(mode, post_id=post_id, date=_today_str())
+            if hit:
+                print(f"🔍 기존 case_id 발견: {hit[0].get('case_id')} (postId: {post_id})")
+                return hit[0].get("case_id")
+            print(f"⚠️ postId {post_id}에 해당하는 기존 case_id를 찾을 수 없음")
+            return None
+        except Exception as e:
+            print(f"⚠️ 로그 인덱스 조회 실패, 파일 스캔으로 대체: {e}")
+
         date_dir = _ensure_date_log_dir(mode)
         
         # 오늘 날짜의 모든 로그 파일에서 postId로 검색
-        for log_file in sorted(date_dir.glob("*_input_logs.json"), reverse=True):  # 최신 파일부터
+        for log_file in sorted(log_store.glob_input_logs(date_dir), key=lambda p: p.name, reverse=True):  # 최신 파일부터
             try:
-                logs = _read_json(log_file)
+                logs = log_store.load_log(log_file)
                 if isinstance(logs, list):
                     for log in reversed(logs):  # 최신 로그부터
                         # 단순화된 구조에서는 모든 ID 필드가 동일하므로 하나만 확인
@@ -491,26 +611,39 @@ class InputAgent:
     def update_log(self, case_id: str, updated_data: dict, mode: str = "use") -> bool:
         """기존 로그를 case_id로 찾아서 업데이트"""
         date_dir = _ensure_date_log_dir(mode)
+
+        # 인덱스가 가리키는 파일부터 열기 (거기서 못 찾거나 인덱스 조회 실패 시 오늘 날짜 나머지 파일 검색)
+        log_files = log_store.glob_input_logs(date_dir)
+        try:
+            hit = log_index.find_latest(mode, case_id=case_id, date=_today_str())
+            if hit:
+                first = Path(hit[1])
+                log_files = [first] + [f for f in log_files if f.resolve() != first.resolve()]
+        except Exception as e:
+            print(f"⚠️ 로그 인덱스 조회 실패, 파일 스캔으로 대체: {e}")
         
-        # 오늘 날짜의 모든 로그 파일 검색
-        for log_file in date_dir.glob("*_input_logs.json"):
+        def _apply(logs: List[dict]) -> bool:
+            for i, log in enumerate(logs):
+                if log.get("case_id") == case_id:
+                    # 기존 로그 업데이트
+                    logs[i] = {**log, **updated_data}
+                    logs[i]["timestamp"] = _now_str()
+                    logs[i]["updated_at"] = _now_str()    # ← updated_at만 갱신
+                    # created_at이 없으면 현재 시간으로 설정 (누락 방지)
+                    if "created_at" not in logs[i] or not logs[i]["created_at"]:
+                        logs[i]["created_at"] = _now_str()
+                    logs[i]["status"] = "final"  # 최종 저장 표시
+                    logs[i]["mode"] = mode
+                    return True
+            return False
+
+        # 오늘 날짜의 로그 파일 검색 (파일 잠금 안에서 읽기→수정→원자적 교체)
+        for log_file in log_files:
             try:
-                logs = _read_json(log_file)
-                if isinstance(logs, list):
-                    for i, log in enumerate(logs):
-                        if log.get("case_id") == case_id:
-                            # 기존 로그 업데이트
-                            logs[i] = {**log, **updated_data}
-                            logs[i]["timestamp"] = _now_str()
-                            logs[i]["updated_at"] = _now_str()    # ← updated_at만 갱신
-                            # created_at이 없으면 현재 시간으로 설정 (누락 방지)
-                            if "created_at" not in logs[i] or not logs[i]["created_at"]:
-                                logs[i]["created_at"] = _now_str()
-                            logs[i]["status"] = "final"  # 최종 저장 표시
-                            logs[i]["mode"] = mode
-                            _write_json(log_file, logs)
-                            print(f"📝 로그 업데이트 → {log_file} (case_id: {case_id})")
-                            return True
+                if log_store.update_entries(log_file, _apply):
+                    log_index.index_file(log_file)
+                    print(f"📝 로그 업데이트 → {log_file} (case_id: {case_id})")
+                    return True
             except Exception as e:
                 print(f"⚠️ 로그 파일 읽기 실패: {log_file} - {e}")
                 continue
@@ -611,8 +744,9 @@ class InputAgent:
 
     # ---------- 병원 이미지 파일 찾기 ----------
     def find_image_file(self, name: str, keyword: str) -> Optional[str]:
+        index = file_index.get_index([self.hospital_image_path])
         for ext in ["png", "jpg", "jpeg", "webp"]:
-            for file in self.hospital_image_path.glob(f"{name}_*{keyword}.{ext}"):
+            for file in index.match(f"{name}_*{keyword}.{ext}", directory=self.hospital_image_path):
                 return file.name
         return None
 
@@ -677,21 +811,24 @@ class InputAgent:
         }
 
     def _upsert_hospital_list(self, hospital: dict):
-        # name/save_name 기준 업서트
+        # name/save_name 기준 업서트 (공유 목록은 건드리지 않고 복사본 수정 후 교체)
         key = (hospital.get("save_name") or hospital.get("name") or "").strip()
         if not key:
             return
+        hospitals = list(self.hospital_list)
         existed = False
-        for i, h in enumerate(self.hospital_list):
+        for i, h in enumerate(hospitals):
             if h.get("save_name") == hospital.get("save_name") or h.get("name") == hospital.get("name"):
-                self.hospital_list[i] = {**h, **hospital}
+                hospitals[i] = {**h, **hospital}
                 existed = True
                 break
         if not existed:
-            self.hospital_list.append(hospital)
+            hospitals.append(hospital)
+        self.hospital_list = tuple(hospitals)
         try:
             with open(self.hospital_info_path, "w", encoding="utf-8") as f:
-                json.dump(self.hospital_list, f, ensure_ascii=False, indent=2)
+                json.dump(hospitals, f, ensure_ascii=False, indent=2)
+            reference_registry.put("hospital_info", self.hospital_info_path, self.hospital_list)
             print(f"✅ 병원 정보 업서트 완료 → {self.hospital_info_path.name}")
         except Exception as e:
             print(f"⚠️ 병원 정보 저장 실패: {e}")
@@ -842,21 +979,11 @@ class InputAgent:
 
     # ---------- 이미지 입력(Q3/Q5/Q7: 배열) ----------
     def _find_source_image(self, filename: str, search_dirs: Optional[List[Path]] = None) -> Optional[Path]:
+        """파일명(대소문자 무시)이 같은 파일 중 최신 파일 — 공용 파일명 인덱스 조회 (매번 rglob 안 함)"""
         if not filename:
             return None
-        filename = Path(filename).name
         search_dirs = search_dirs or [Path("test_data/test_image"), Path("images"), Path(".")]
-        hits: List[Path] = []
-        for root in search_dirs:
-            if not Path(root).exists():
-                continue
-            for p in Path(root).rglob("*"):
-                if p.is_file() and p.name.lower() == filename.lower():
-                    hits.append(p)
-        if not hits:
-            return None
-        hits.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-        return hits[0]
+        return file_index.get_index(search_dirs).find(filename)
 
     def _normalize_and_copy_image(self, filename: str, save_name: str, dest_dir: Path = Path("test_data/test_image"), suffix: str = "") -> str:
         src = self._find_source_image(filename)
@@ -971,19 +1098,25 @@ class InputAgent:
 
     # ---------- Clinical context wrapper ----------
     def _build_clinical_context(self, raw: Dict) -> Dict:
-        ctx = self.context_builder.build(
-            {
-                "question1_concept": raw.get("question1_concept", ""),
-                "question2_condition": raw.get("question2_condition", ""),
-                "question4_treatment": raw.get("question4_treatment", ""),
-                "question6_result": raw.get("question6_result", ""),
-                "question8_extra": raw.get("question8_extra", ""),
-                "include_tooth_numbers": raw.get("include_tooth_numbers", False),
-                "tooth_numbers": raw.get("tooth_numbers", []),
-                "category": raw.get("category"),
-            },
-            topk=5,
-        )
+        if not CLINICAL_CONTEXT_ENABLED:
+            return {}
+        try:
+            ctx = self.context_builder.build(
+                {
+                    "question1_concept": raw.get("question1_concept", ""),
+                    "question2_condition": raw.get("question2_condition", ""),
+                    "question4_treatment": raw.get("question4_treatment", ""),
+                    "question6_result": raw.get("question6_result", ""),
+                    "question8_extra": raw.get("question8_extra", ""),
+                    "include_tooth_numbers": raw.get("include_tooth_numbers", False),
+                    "tooth_numbers": raw.get("tooth_numbers", []),
+                    "category": raw.get("category"),
+                },
+                topk=5,
+            )
+        except Exception as e:
+            print(f"⚠️ 임상 컨텍스트 생성 실패 (생략): {e}")
+            return {}
         return ctx
 
     # ---------- UI에서 받은 데이터 처리 (DB 조회 없음) ----------
@@ -1089,7 +1222,7 @@ class InputAgent:
             # postId 관련 필드 표준화 (UI에서 받은 데이터 사용)
             self._ensure_post_id_fields_from_ui(self.input_data)
             
-            # self.input_data["clinical_context"] = self._build_clinical_context(self.input_data)  # 임시 주석 처리 - 성능 개선
+            self.input_data["clinical_context"] = self._build_clinical_context(self.input_data)
             return self._finalize_and_save(self.input_data, mode=mode)
     
         # ========== 터미널 입력 모드 ==========
@@ -1151,7 +1284,7 @@ class InputAgent:
             "persona_candidates": selected_personas or rep_personas,
             "representative_persona": (selected_personas[0] if selected_personas else (rep_personas[0] if rep_personas else "")),
         }
-        # data["clinical_context"] = self._build_clinical_context(data)  # 임시 주석 처리 - 성능 개선
+        data["clinical_context"] = self._build_clinical_context(data)
         return self._finalize_and_save(data, mode=mode)
 
 # ------------------------------
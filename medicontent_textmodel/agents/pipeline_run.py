@@ -0,0 +1,273 @@
+# agents/pipeline_run.py
+# -*- coding: utf-8 -*-
+"""
+PipelineRun (단계 간 인메모리 전달)
+- plan → title → content → evaluation 결과를 run 객체로 직접 넘김
+- run_id 기준으로 실행 중인 run을 보관 → 동시 실행되는 게시글끼리 서로의 파일을 집어가지 않음
+- 각 단계의 JSON/TXT 파일 저장은 그대로 유지하되, 다음 단계는 파일을 다시 탐색/로드하지 않음
+  (artifacts에 저장 경로만 기록)
+- 데드라인: run 전체 데드라인(PIPELINE_DEADLINE_SEC) + 단계별 예산(PIPELINE_BUDGET_{STAGE}_SEC)
+  예산을 넘긴 단계는 오래 붙잡지 않고 축소 실행(degrade) → 단계별 소요시간/축소 내역은 summary()에 포함
+- 진행 이벤트: subscribe(fn)로 등록한 구독자(예: job.emit)에게 섹션 생성/평가 결과/축소 실행을 전달
+"""
+
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ===== 시간 예산 =====
+PIPELINE_DEADLINE_SEC = float(os.getenv("PIPELINE_DEADLINE_SEC", "600"))
+STAGE_BUDGETS: Dict[str, float] = {
+    stage: float(os.getenv(f"PIPELINE_BUDGET_{stage.upper()}_SEC", default))
+    for stage, default in (("plan", "60"), ("title", "45"), ("content", "180"), ("evaluation", "240"))
+}
+
+
+class PipelineRun:
+    def __init__(self, mode: str = "use", input_row: Optional[dict] = None,
+                 input_source: str = "(provided dict)", run_id: Optional[str] = None,
+                 deadline_sec: Optional[float] = None, budgets: Optional[Dict[str, float]] = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.input_row: Optional[dict] = input_row
+        self.input_source = input_source
+        self.plan: Optional[dict] = None
+        self.title: Optional[dict] = None
+        self.content: Optional[dict] = None
+        self.evaluation: Any = None
+        self.artifacts: Dict[str, str] = {}
+        self.created_at = datetime.now().isoformat()
+
+        # 시간 예산 (0 이하면 제한 없음)
+        deadline_sec = PIPELINE_DEADLINE_SEC if deadline_sec is None else deadline_sec
+        self._started = time.monotonic()
+        self.deadline: Optional[float] = self._started + deadline_sec if deadline_sec > 0 else None
+        self.budgets: Dict[str, float] = {**STAGE_BUDGETS, **(budgets or {})}
+        self.timings: Dict[str, float] = {}
+        self.degradations: List[Dict[str, Any]] = []
+        self.waits: Dict[str, Dict[str, Any]] = {}  # 단계 밖 대기(첨부 준비 등) 내역
+        self._listeners: List[Callable[..., Any]] = []
+
+    # ----- 진행 이벤트 -----
+    def subscribe(self, listener: Callable[..., Any]) -> None:
+        """listener(event, **data) 형태의 구독자 등록"""
+        self._listeners.append(listener)
+
+    @property
+    def has_listeners(self) -> bool:
+        return bool(self._listeners)
+
+    def emit(self, event: str, **data) -> None:
+        """구독자 오류가 파이프라인을 멈추지 않도록 경고만 출력"""
+        for listener in self._listeners:
+            try:
+                listener(event, run_id=self.run_id, **data)
+            except Exception as e:
+                print(f"⚠️ 진행 이벤트 전달 실패 ({event}): {e}")
+
+    # ----- 시간 예산 -----
+    def remaining(self) -> Optional[float]:
+        """run 전체 데드라인까지 남은 시간(초)"""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def stage_deadline(self, name: str) -> Optional[float]:
+        """지금 시작하는 단계의 데드라인 = min(지금 + 단계 예산, run 데드라인)"""
+        budget = self.budgets.get(name) or 0
+        candidates = [d for d in (time.monotonic() + budget if budget > 0 else None, self.deadline) if d is not None]
+        return min(candidates) if candidates else None
+
+    @contextmanager
+    def timed_stage(self, name: str):
+        """단계 소요시간 기록 + 블록 안의 LLM 호출에 단계 데드라인 적용"""
+        from llm import deadline_scope
+
+        t0 = time.monotonic()
+        try:
+            with deadline_scope(self.stage_deadline(name)):
+                yield
+        finally:
+            self.timings[name] = round(time.monotonic() - t0, 3)
+            budget = self.budgets.get(name) or 0
+            print(f"⏱️ [{name}] {self.timings[name]:.1f}s" + (f" / 예산 {budget:g}s" if budget > 0 else ""))
+
+    def degrade(self, stage: str, action: str, reason: str = "") -> None:
+        """예산 초과 등으로 단계를 축소 실행했음을 기록"""
+        item = {
+            "stage": stage,
+            "action": action,
+            "reason": reason,
+            "at_sec": round(time.monotonic() - self._started, 3),
+        }
+        self.degradations.append(item)
+        self.emit("degraded", **item)
+        print(f"⚠️ [{stage}] 시간 예산 초과 → {action}" + (f" ({reason})" if reason else ""))
+
+    def record_wait(self, name: str, timing: Dict[str, Any]) -> None:
+        """단계 시작 전 대기 내역 기록 (소요시간은 timings에도 같이 기록)"""
+        self.waits[name] = dict(timing)
+        if "waited_sec" in timing:
+            self.timings[f"{name}_wait"] = timing["waited_sec"]
+
+    def set_artifact(self, name: str, path) -> None:
+        self.artifacts[name] = str(path)
+
+    def title_and_body(self) -> Tuple[str, str]:
+        """content 결과(assembled_markdown)를 TXT와 같은 규칙으로 제목/본문 분리"""
+        text = (self.content or {}).get("assembled_markdown", "") or ""
+        lines = text.split("\n")
+        title = lines[0].strip() if lines else ""
+        body = "\n".join(lines[2:]).strip() if len(lines) > 2 else ""
+        return title, body
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "case_id": (self.input_row or {}).get("case_id", ""),
+            "postId": (self.input_row or {}).get("postId", ""),
+            "artifacts": dict(self.artifacts),
+            "created_at": self.created_at,
+            "timings": dict(self.timings),
+            "degradations": list(self.degradations),
+            "waits": dict(self.waits),
+        }
+
+
+# ===== run 레지스트리 =====
+_RUNS: Dict[str, PipelineRun] = {}
+_RUNS_LOCK = threading.Lock()
+
+
+def start_run(mode: str = "use", input_row: Optional[dict] = None,
+              input_source: str = "(provided dict)") -> PipelineRun:
+    run = PipelineRun(mode=mode, input_row=input_row, input_source=input_source)
+    with _RUNS_LOCK:
+        _RUNS[run.run_id] = run
+    return run
+
+
+def get_run(run_id: str) -> Optional[PipelineRun]:
+    with _RUNS_LOCK:
+        return _RUNS.get(run_id)
+
+
+def finish_run(run_id: str) -> Optional[PipelineRun]:
+    with _RUNS_LOCK:
+        return _RUNS.pop(run_id, None)
+
+
+@contextmanager
+def _no_stage(name: str):
+    yield
+
+
+def run_pipeline(run: PipelineRun,
+                 include_evaluation: bool = True,
+                 stage: Optional[Callable[[str], Any]] = None,
+                 criteria_mode: str = "표준",
+                 max_loops: int = 2,
+                 evaluation_mode: str = "both") -> PipelineRun:
+    """
+    Plan → Title → Content → (Evaluation)을 하나의 run 위에서 실행
+    stage: 단계 이름을 받는 context manager 팩토리 (예: 작업 진행 기록용 job.stage)
+    각 단계는 run.timed_stage로 감싸 단계 데드라인 안에서 실행 (초과 시 각 에이전트가 축소 실행)
+    """
+    try:
+        return _run_stages(run, include_evaluation, stage or _no_stage, criteria_mode, max_loops, evaluation_mode)
+    finally:
+        save_run_log(run)
+
+
+def save_run_log(run: PipelineRun) -> None:
+    """단계별 소요시간/축소 내역 로그: test_logs/{mode}/{YYYYMMDD}/{run_id}_pipeline_run.json"""
+    import json
+    from pathlib import Path
+    try:
+        out_dir = Path(f"test_logs/{run.mode}/{datetime.now().strftime('%Y%m%d')}")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{run.run_id}_pipeline_run.json"
+        path.write_text(json.dumps({**run.summary(), "budgets": run.budgets},
+                                   ensure_ascii=False, indent=2), encoding="utf-8")
+    except Exception as e:
+        print(f"⚠️ 파이프라인 실행 로그 저장 실패: {e}")
+        return
+    if run.degradations:
+        print(f"⚠️ 축소 실행 {len(run.degradations)}건 → {path}")
+
+
+def _run_stages(run: PipelineRun, include_evaluation: bool, stage: Callable[[str], Any],
+                criteria_mode: str, max_loops: int, evaluation_mode: str) -> PipelineRun:
+    # 에이전트들 import (함수 기반 · GEMINI_API_KEY 검사가 import 시점에 있으므로 지연 import)
+    from plan_agent import main as plan_main
+    from title_agent import run as title_run
+    from content_agent import run as content_run
+    from llm import DeadlineExceeded
+
+    print(f"🚀 PlanAgent 실행... (run_id={run.run_id})")
+    with stage("plan"), run.timed_stage("plan"):
+        plan = plan_main(mode=run.mode, pipeline_run=run)
+    if not plan:
+        raise Exception("Plan 생성 실패")
+
+    print("🚀 TitleAgent 실행...")
+    with stage("title"), run.timed_stage("title"):
+        title = title_run(mode=run.mode, pipeline_run=run)
+    if not title:
+        raise Exception("Title 생성 실패")
+
+    run.emit("title", title=((title.get("selected") or {}).get("title", "")))
+
+    print("🚀 ContentAgent 실행...")
+    with stage("content"), run.timed_stage("content"):
+        content = content_run(mode=run.mode, pipeline_run=run)
+    if not content:
+        raise Exception("Content 생성 실패")
+    run.emit("content", title=content.get("title", ""), assembled_markdown=content.get("assembled_markdown", ""))
+
+    if include_evaluation:
+        remaining = run.remaining()
+        if remaining is not None and remaining <= 0:
+            # 콘텐츠는 이미 저장됨 → 평가만 건너뛰고 결과 반환
+            run.degrade("evaluation", "skip_evaluation", "파이프라인 데드라인 소진")
+            return run
+
+        from evaluation_agent import run as evaluation_run
+        print("🚀 EvaluationAgent 실행...")
+        with stage("evaluation"), run.timed_stage("evaluation"):
+            try:
+                run.evaluation = evaluation_run(
+                    criteria_mode=criteria_mode,
+                    max_loops=max_loops,
+                    auto_yes=True,
+                    log_dir=f"test_logs/{run.mode}",
+                    evaluation_mode=evaluation_mode,
+                    pipeline_run=run,
+                )
+            except DeadlineExceeded as e:
+                run.degrade("evaluation", "skip_evaluation", str(e))
+        if run.evaluation:
+            run.emit("evaluation", results=_evaluation_digest(run.evaluation))
+    return run
+
+
+def _evaluation_digest(evaluation: Any) -> Dict[str, Any]:
+    """진행 이벤트용 평가 요약 (모드별 총점/기준 초과 항목/결과 파일)"""
+    results = evaluation if "mode" not in evaluation else {evaluation["mode"]: evaluation}
+    digest: Dict[str, Any] = {}
+    for name, result in results.items():
+        if not result:
+            digest[name] = None
+            continue
+        out = result.get("evaluation") or {}
+        digest[name] = {
+            "criteria": result.get("criteria"),
+            "weighted_total": (out.get("scores") or {}).get("weighted_total"),
+            "violations": (out.get("violations") or {}).get("names", []),
+            "regen_applied": (out.get("regen_fit") or {}).get("applied", False),
+            "evaluation_path": result.get("evaluation_path"),
+        }
+    return digest
@@ -2,18 +2,18 @@
 # -*- coding: utf-8 -*-
 """
 PlanAgent (프롬프트 기반 · 7섹션 · 이미지 바인딩 · 스키마 리페어)
-- 입력: input_agent 로그 최신 1건 또는 외부 dict
+- 입력: input_agent 로그 최신 1건 또는 외부 dict (PipelineRun이 주어지면 run.input_row)
 - 프롬프트: test_prompt/plan_generation_prompt.txt
 - 모델: Gemini (GEMINI_API_KEY 필수 · 항상 호출) — JSON 파싱 실패 시 코드 기반 fallback
 - 출력:
     - 본문: test_logs/{mode}/{YYYYMMDD}/{timestamp}_plan.json
     - 로그: test_logs/{mode}/{YYYYMMDD}/{timestamp}_plan_logs.json
 - 호환:
-    - Input 로그 파일명: *신규* {YYYYMMDD}_{HHMMSS}_input_logs.json (권장)
+    - Input 로그 파일명: *신규* {YYYYMMDD}_{HHMMSS}_input_logs.jsonl (권장, 배열형 .json도 인식)
                          *구형* {YYYYMMDD}_input_log.json 도 자동 인식
 """
 
-import os, json, re, ast, time
+import os, json, re, ast
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
@@ -22,55 +22,22 @@ from typing import Any, Dict, List, Optional, Tuple
 # 환경 & Gemini 클라이언트
 # =======================
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 if not API_KEY:
     raise RuntimeError("GEMINI_API_KEY가 필요합니다(.env)")
-genai.configure(api_key=API_KEY)
 
+# 프로젝트 루트 (공용 llm 패키지 import용)
+import sys
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
 
-class GeminiClient:
-    def __init__(self, model="models/gemini-1.5-flash", temperature=0.7, max_output_tokens=8192):
-        self.model = model
-        self.temperature = temperature
-        self.max_output_tokens = max_output_tokens
-        self.max_retries = 3
-        self.retry_delay = 1.0
+from llm import DeadlineExceeded, LLMClient
+from utils.log_store import INPUT_LOG_PATTERNS, glob_input_logs, latest_entry
 
-    def generate_text(self, prompt: str, temperature: Optional[float] = None) -> str:
-        """Gemini 텍스트 생성(재시도 포함)"""
-        for attempt in range(self.max_retries):
-            try:
-                m = genai.GenerativeModel(self.model)
-                resp = m.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=self.temperature if temperature is None else temperature,
-                        max_output_tokens=self.max_output_tokens,
-                        candidate_count=1,
-                        top_p=0.95,
-                        top_k=40,
-                    )
-                )
-                if getattr(resp, "text", None):
-                    return resp.text
-                if getattr(resp, "candidates", None):
-                    parts = getattr(resp.candidates[0].content, "parts", [])
-                    if parts and getattr(parts[0], "text", ""):
-                        return parts[0].text
-                raise ValueError("응답에 text 없음")
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                print(f"⚠️ Gemini 호출 실패 (시도 {attempt+1}/{self.max_retries}): {e}")
-                time.sleep(self.retry_delay * (2 ** attempt))
-
-        raise RuntimeError("모든 재시도 실패")
-
-
-gemini_client = GeminiClient()
+gemini_client = LLMClient("plan")
 
 # ===============
 # 경로/시간 유틸
@@ -107,23 +74,21 @@ def _mtime(p: Path) -> float:
 def _latest_input_log(mode: str) -> Tuple[Optional[Path], Optional[dict]]:
     """
     우선순위:
-      1) test_logs/{mode}/{YYYYMMDD}/*_input_logs.json (신규 규격)
-      2) test_logs/{mode}/{YYYYMMDD}/*_input_log.json  (구형 규격)
-      3) 상위 폴더 전체에서 위 두 패턴 중 최신 파일
+      1) test_logs/{mode}/{YYYYMMDD}/*_input_logs.jsonl (신규 규격)
+      2) test_logs/{mode}/{YYYYMMDD}/*_input_logs.json  (배열 규격)
+      3) test_logs/{mode}/{YYYYMMDD}/*_input_log.json   (구형 규격)
+      4) 상위 폴더 전체에서 위 패턴 중 최신 파일
     파일 내용이 배열이면 마지막 원소, dict면 그대로 반환
     """
     day_dir = Path(f"test_logs/{mode}/{_today()}")
-    patterns_today = ["*_input_logs.json", "*_input_log.json"]
-    for pat in patterns_today:
+    for pat in INPUT_LOG_PATTERNS:
         hits = sorted(day_dir.glob(pat), key=_mtime, reverse=True)
         if hits:
             p = hits[0]
             try:
-                data = json.loads(p.read_text(encoding="utf-8"))
-                if isinstance(data, list) and data:
-                    return p, data[-1]
-                if isinstance(data, dict):
-                    return p, data
+                row = latest_entry(p)
+                if row is not None:
+                    return p, row
             except Exception:
                 pass
 
@@ -131,20 +96,15 @@ def _latest_input_log(mode: str) -> Tuple[Optional[Path], Optional[dict]]:
     root = Path(f"test_logs/{mode}")
     if not root.exists():
         return None, None
-    hits = sorted(list(root.rglob("*_input_logs.json")) + list(root.rglob("*_input_log.json")),
-                  key=_mtime, reverse=True)
+    hits = sorted(glob_input_logs(root, recursive=True), key=_mtime, reverse=True)
     if not hits:
         return None, None
     p = hits[0]
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
-        if isinstance(data, list) and data:
-            return p, data[-1]
-        if isinstance(data, dict):
-            return p, data
+        row = latest_entry(p)
     except Exception:
         return None, None
-    return None, None
+    return (p, row) if row is not None else (None, None)
 
 # ==================
 # 텍스트 유틸
@@ -580,17 +540,26 @@ def save_plan_log(log_payload: dict, mode: str) -> Path:
     _save_json(path, log_payload)
     return path
 
-def main(mode: str = "use", input_data: Optional[dict] = None):
+def main(mode: str = "use", input_data: Optional[dict] = None, pipeline_run=None):
+    """
+    pipeline_run(PipelineRun)이 주어지면 run.input_row를 입력으로 사용하고,
+    생성된 plan을 run.plan에 넣어 다음 단계(title/content)로 직접 전달
+    """
+    if input_data is None and pipeline_run is not None and pipeline_run.input_row is not None:
+        input_data = pipeline_run.input_row
+
     # 입력 확보
     if input_data is None:
         src_path, row = _latest_input_log(mode)
         if row is None:
             print("⚠️ 최신 input_log를 찾지 못했습니다. 먼저 input_agent를 실행하세요.")
             return None
+        if pipeline_run is not None:
+            pipeline_run.input_row, pipeline_run.input_source = dict(row), str(src_path)
         row["source_log"] = str(src_path)
     else:
         row = dict(input_data)
-        row["source_log"] = "(provided dict)"
+        row["source_log"] = pipeline_run.input_source if pipeline_run is not None else "(provided dict)"
 
     # 프롬프트 호출 → JSON 파싱 → 리페어
     plan_obj: dict
@@ -614,6 +583,8 @@ def main(mode: str = "use", input_data: Optional[dict] = None):
         error_msg = str(e)
         print(f"⚠️ LLM 생성 또는 파싱 실패, fallback 사용: {e}")
         plan_obj = _fallback_plan(row, mode)
+        if isinstance(e, DeadlineExceeded) and pipeline_run is not None:
+            pipeline_run.degrade("plan", "fallback_plan", error_msg)
 
     # 저장
     plan_path = save_plan(plan_obj, mode)
@@ -645,6 +616,10 @@ def main(mode: str = "use", input_data: Optional[dict] = None):
     }
     log_path = save_plan_log(log_payload, mode)
 
+    if pipeline_run is not None:
+        pipeline_run.plan = plan_obj
+        pipeline_run.set_artifact("plan", plan_path)
+
     print(f"✅ plan 저장: {plan_path}")
     print(f"📝 로그 저장: {log_path}")
     return plan_obj
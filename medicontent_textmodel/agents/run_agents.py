@@ -51,6 +51,9 @@ def main():
 
     print(f"🚀 에이전트 체인 실행 시작 (모드: {args.mode})")
 
+    # 단계 간 전달용 입력 (None이면 PlanAgent가 최신 input_log를 탐색)
+    input_data = None
+
     # 2. Input 데이터 준비(선택적)
     if not args.skip_input:
         print("\n" + "="*60)
@@ -91,16 +94,12 @@ def main():
     else:
         print("📂 InputAgent 건너뛰기 - 기존 input_log 사용")
 
-    # 2.5. 이미지 URL 업데이트 단계 (input 완료 후 30초 대기하면서 처리)
+    # 2.5. 이미지 URL 업데이트 단계 (Airtable 첨부 URL이 준비될 때까지 폴링)
     print("\n" + "="*60)
-    print("🔄 2.5단계: 이미지 URL 업데이트 (30초 대기)")
+    print("🔄 2.5단계: 이미지 URL 업데이트 (첨부 준비 대기)")
     print("="*60)
     
-    import time
-    print("⏳ Input 처리 완료 후 30초 대기 중... (Airtable 업데이트 시간 확보)")
-    time.sleep(30)
-    print("✅ 대기 완료, 이미지 URL 업데이트 시작")
-    
+    attachment_wait = None  # 대기 내역 → pipeline_run 로그에 기록
     try:
         # 최신 input_log 찾기
         import json
@@ -109,17 +108,18 @@ def main():
         
         log_dir = Path(f"test_logs/{args.mode}/{datetime.now().strftime('%Y%m%d')}")
         if log_dir.exists():
-            input_files = list(log_dir.glob("*_input_logs.json"))
+            from utils.log_store import glob_input_logs, load_log, update_entries
+            input_files = glob_input_logs(log_dir)
             if input_files:
                 latest_input_file = max(input_files, key=lambda p: p.stat().st_mtime)
                 print(f"📂 최신 input_log: {latest_input_file}")
                 
-                with open(latest_input_file, 'r', encoding='utf-8') as f:
-                    input_logs = json.load(f)
+                input_logs = load_log(latest_input_file)
                 
                 # 최신 로그 항목 가져오기
                 if isinstance(input_logs, list) and input_logs:
                     latest_input = input_logs[-1]
+                    input_data = latest_input
                     post_id = latest_input.get("postId")
                     
                     if post_id:
@@ -135,37 +135,57 @@ def main():
                         try:
                             import asyncio
                             from routes import get_input_data_from_db
+                            from utils.attachment_ready import expected_counts, wait_for_attachments
                             
-                            # Airtable에서 최신 데이터 가져오기
-                            fresh_data = asyncio.run(get_input_data_from_db(post_id))
+                            # 기대한 이미지 URL이 모두 생길 때까지 백오프 재조회 (최대 ATTACHMENT_WAIT_MAX_SEC)
+                            expected = expected_counts(latest_input)
+                            fresh_data, attachment_wait = wait_for_attachments(
+                                lambda: asyncio.run(get_input_data_from_db(post_id, use_cache=False)),
+                                expected,
+                                max_wait=None if expected else 0,
+                            )
+                            status = "준비 완료" if attachment_wait["ready"] else "최대 대기 초과 → 현재 URL로 진행"
+                            print(f"⏱️ 첨부 대기 {attachment_wait['waited_sec']:.1f}s "
+                                  f"(시도 {attachment_wait['attempts']}회, {status})")
                             
                             if fresh_data:
                                 print("✅ Airtable에서 최신 이미지 URL 데이터 받아옴")
                                 
                                 # 이미지 필드별로 URL 업데이트
                                 img_fields = ["question3_visit_images", "question5_therapy_images", "question7_result_images"]
-                                updated_count = 0
-                                
-                                for field in img_fields:
-                                    if fresh_data.get(field) and latest_input.get(field):
-                                        fresh_imgs = fresh_data[field]
-                                        old_imgs = latest_input[field]
-                                        
-                                        # 기존 이미지들의 URL을 fresh 데이터의 URL로 업데이트
-                                        for i, old_img in enumerate(old_imgs):
-                                            if i < len(fresh_imgs):
-                                                fresh_img = fresh_imgs[i]
-                                                if fresh_img.get("url"):
-                                                    old_img["url"] = fresh_img["url"]
-                                                    old_img["path"] = fresh_img["url"]
-                                                    updated_count += 1
-                                                    print(f"  ✅ {field}[{i}]: URL 업데이트됨")
-                                
-                                if updated_count > 0:
-                                    # 업데이트된 로그를 파일에 저장
-                                    with open(latest_input_file, 'w', encoding='utf-8') as f:
-                                        json.dump(input_logs, f, ensure_ascii=False, indent=2)
+
+                                def _apply_fresh_urls(entry: dict, verbose: bool = False) -> int:
+                                    updated = 0
+                                    for field in img_fields:
+                                        if fresh_data.get(field) and entry.get(field):
+                                            fresh_imgs = fresh_data[field]
+                                            # 기존 이미지들의 URL을 fresh 데이터의 URL로 업데이트
+                                            for i, old_img in enumerate(entry[field]):
+                                                if i < len(fresh_imgs) and fresh_imgs[i].get("url"):
+                                                    old_img["url"] = fresh_imgs[i]["url"]
+                                                    old_img["path"] = fresh_imgs[i]["url"]
+                                                    updated += 1
+                                                    if verbose:
+                                                        print(f"  ✅ {field}[{i}]: URL 업데이트됨")
+                                    return updated
+
+                                updated_count = _apply_fresh_urls(latest_input, verbose=True)
+                                case_id = latest_input.get("case_id")
+
+                                def _patch(entries: list) -> bool:
+                                    # Airtable 대기 중에 다른 요청이 쓴 엔트리를 덮어쓰지 않도록 잠금 안에서 다시 읽은 목록을 수정
+                                    for entry in reversed(entries):
+                                        if isinstance(entry, dict) and (
+                                                entry.get("case_id") == case_id if case_id else entry.get("postId") == post_id):
+                                            return _apply_fresh_urls(entry) > 0
+                                    return False
+
+                                if updated_count > 0 and update_entries(latest_input_file, _patch):
+                                    from utils import log_index
+                                    log_index.index_file(latest_input_file)
                                     print(f"💾 input_log 파일 업데이트 완료 ({updated_count}개 이미지)")
+                                elif updated_count > 0:
+                                    print("⚠️ input_log에서 해당 엔트리를 찾지 못해 파일은 그대로 둠")
                                 else:
                                     print("⚠️ 업데이트할 URL이 없음")
                             else:
@@ -192,14 +212,28 @@ def main():
     
     print("✅ 이미지 URL 업데이트 단계 완료")
 
-    # 3. PlanAgent 실행 (최신 input_logs.json 자동 탐지)
+    # 3. PlanAgent 실행 (input을 run 객체에 담아 이후 단계로 직접 전달)
     print("\n" + "="*60)
     print("🎯 2단계: PlanAgent 실행")
     print("="*60)
     
+    from pipeline_run import start_run, save_run_log
+    pipeline_run = start_run(mode=args.mode, input_row=input_data,
+                             input_source="(run_agents)" if input_data else "")
+    if attachment_wait is not None:
+        pipeline_run.record_wait("attachments", attachment_wait)
+    
+    try:
+        _run_agent_chain(args, pipeline_run)
+    finally:
+        save_run_log(pipeline_run)
+
+
+def _run_agent_chain(args, pipeline_run):
+    """Plan → Title → Content → Evaluation (실패한 단계에서 중단)"""
     try:
         from plan_agent import main as plan_main
-        plan_result = plan_main(mode=args.mode)  # input_data=None으로 최신 로그 자동 탐지
+        plan_result = plan_main(mode=args.mode, pipeline_run=pipeline_run)  # input 없으면 최신 로그 자동 탐지
         
         if plan_result is None:
             print("❌ PlanAgent 실행 실패")
@@ -210,14 +244,14 @@ def main():
         print(f"❌ PlanAgent 실행 실패: {e}")
         return
 
-    # 4. TitleAgent 실행 (최신 plan.json 자동 탐지)
+    # 4. TitleAgent 실행 (run.plan 사용)
     print("\n" + "="*60)
     print("📰 3단계: TitleAgent 실행")
     print("="*60)
     
     try:
         from title_agent import run as title_run
-        title_result = title_run(mode=args.mode)  # 최신 plan.json 자동 탐지
+        title_result = title_run(mode=args.mode, pipeline_run=pipeline_run)
         
         if title_result is None:
             print("❌ TitleAgent 실행 실패")
@@ -228,7 +262,7 @@ def main():
         print(f"❌ TitleAgent 실행 실패: {e}")
         return
 
-    # 5. ContentAgent 실행 (최신 title.json 자동 탐지)
+    # 5. ContentAgent 실행 (run의 input/plan/title 사용)
     print("\n" + "="*60)
     print("📄 4단계: ContentAgent 실행")
     print("="*60)
@@ -237,7 +271,7 @@ def main():
         from content_agent import run as content_run
         # UI 모드 결정: input_file이 있으면 UI 모드로 간주
         ui_mode = bool(args.input_file and not args.terminal_mode)
-        content_result = content_run(mode=args.mode, ui_mode=ui_mode)  # ui_mode 전달
+        content_result = content_run(mode=args.mode, ui_mode=ui_mode, pipeline_run=pipeline_run)  # ui_mode 전달
         
         if content_result is None:
             print("❌ ContentAgent 실행 실패")
@@ -249,7 +283,7 @@ def main():
         print(f"❌ ContentAgent 실행 실패: {e}")
         return
 
-    # 6. EvaluationAgent 실행 (최신 content TXT 자동 탐지)
+    # 6. EvaluationAgent 실행 (run.content 사용)
     print("\n" + "="*60)
     print("⚖️ 5단계: EvaluationAgent 실행")
     print("="*60)
@@ -262,7 +296,8 @@ def main():
             max_loops=2,
             auto_yes=True,  # 자동 실행
             log_dir=f"test_logs/{args.mode}",
-            evaluation_mode="medical"
+            evaluation_mode="medical",
+            pipeline_run=pipeline_run
         )
         
         print("✅ EvaluationAgent 완료")
@@ -278,7 +313,7 @@ def main():
     
     print("📁 생성된 로그 파일 확인:")
     print(f"   test_logs/{args.mode}/[날짜]/")
-    print("   - *_input_logs.json (InputAgent)")
+    print("   - *_input_logs.jsonl (InputAgent)")
     print("   - *_plan.json (PlanAgent)")
     print("   - *_title.json (TitleAgent)")
     print("   - *_content*.json + *.txt (ContentAgent)")
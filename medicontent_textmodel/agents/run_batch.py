@@ -0,0 +1,263 @@
+# agents/run_batch.py
+# -*- coding: utf-8 -*-
+"""
+배치 생성 실행기
+- postId 목록 또는 입력 payload(dict) 목록을 받아 워커 풀에서 Plan → Title → Content → (Evaluation) 실행
+    postId           → 해당 postId의 최신 input_log 엔트리 사용
+    input_log 엔트리  → (case_id / question1_concept 포함) 그대로 사용
+    UI payload       → InputAgent.collect로 input_log를 만든 뒤 사용
+- 동시 실행 수: --workers / BATCH_MAX_WORKERS (기본 4)
+  LLM 호출 수는 LLM_MAX_CONCURRENCY(llm/client.py)로 프로세스 전역 제한
+- 시작 전에 공용 캐시(GIF 풀, 참조 테이블, Kiwi, 체크리스트 패턴)를 한 번 워밍업 → 항목마다 재초기화 없음
+- 결과: 항목별 성공/실패 + 처리량 통계 → test_logs/{mode}/{YYYYMMDD}/{batch_id}_batch.json
+
+사용:
+  python agents/run_batch.py use --posts P1 P2 P3
+  python agents/run_batch.py test --file batch_items.json --workers 4 --no-eval
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
+BatchItem = Union[str, Dict[str, Any]]
+Runner = Callable[[int, BatchItem], Dict[str, Any]]
+
+# 항목 결과 상태
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+# ===== 워밍업 =====
+def warmup(include_evaluation: bool = True) -> Dict[str, bool]:
+    """공용 캐시 미리 로딩 (실패해도 배치는 진행 — 해당 캐시는 첫 사용 시 로딩)"""
+    done: Dict[str, bool] = {}
+
+    def _step(name: str, fn: Callable[[], Any]):
+        t0 = time.time()
+        try:
+            result = fn()
+            done[name] = result is not False
+            print(f"🔥 워밍업 {name}: {time.time() - t0:.2f}s")
+        except Exception as e:
+            done[name] = False
+            print(f"⚠️ 워밍업 실패 ({name}): {e}")
+
+    from input_agent import InputAgent
+    from content_agent import warmup_gif_pool
+    _step("reference_data", InputAgent)
+    _step("gif_pool", warmup_gif_pool)
+    if include_evaluation:
+        from evaluation_agent import warmup_checklists, warmup_kiwi
+        _step("kiwi", warmup_kiwi)
+        _step("checklists", warmup_checklists)
+    return done
+
+
+# ===== 항목 실행 =====
+def _item_post_id(item: BatchItem) -> str:
+    return item if isinstance(item, str) else str(item.get("postId", "") or "")
+
+
+def resolve_item(item: BatchItem, mode: str) -> Tuple[dict, str]:
+    """배치 항목 → (input_row, input_source)"""
+    if isinstance(item, dict) and ("case_id" in item or "question1_concept" in item):
+        return dict(item), "(batch payload)"
+
+    if isinstance(item, dict) and set(item) - {"postId"}:
+        from input_agent import InputAgent
+        row = InputAgent(input_data=dict(item)).collect(mode=mode)
+        if not row:
+            raise ValueError("InputAgent 입력 처리 실패")
+        return row, "(batch payload → input_agent)"
+
+    post_id = _item_post_id(item)
+    if not post_id:
+        raise ValueError("postId 또는 입력 payload가 필요합니다")
+    from utils import log_index
+    hit = log_index.find_latest(mode, post_id=post_id)  # 미색인 엔트리는 find_latest가 디스크와 대조해 보정
+    if not hit:
+        raise LookupError(f"Post ID {post_id}에 대한 입력 로그를 찾을 수 없습니다")
+    entry, file_path, _ = hit
+    return entry, file_path
+
+
+def run_item(item: BatchItem, mode: str = "use", include_evaluation: bool = True,
+             evaluation_mode: str = "both", listener: Optional[Callable[..., Any]] = None,
+             stage: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+    """
+    항목 1개를 PipelineRun으로 실행 → 결과 요약
+    listener: 진행 이벤트 구독자, stage: 단계 기록용 context manager 팩토리 (예: job.stage)
+    """
+    from pipeline_run import start_run, run_pipeline, finish_run
+
+    input_row, source = resolve_item(item, mode)
+    run = start_run(mode=mode, input_row=input_row, input_source=source)
+    if listener is not None:
+        run.subscribe(listener)
+    try:
+        run_pipeline(run, include_evaluation=include_evaluation, stage=stage, evaluation_mode=evaluation_mode)
+    finally:
+        finish_run(run.run_id)
+    return {
+        "run_id": run.run_id,
+        "case_id": input_row.get("case_id", ""),
+        "title": run.title_and_body()[0],
+        "timings": dict(run.timings),
+        "degradations": list(run.degradations),
+    }
+
+
+# ===== 배치 =====
+def _throughput(results: List[Dict[str, Any]], wall_sec: float) -> Dict[str, Any]:
+    done = [r for r in results if r["status"] == SUCCEEDED]
+    item_secs = [r["elapsed_sec"] for r in results if r["status"] != SKIPPED]
+    stage_secs: Dict[str, List[float]] = {}
+    for r in done:
+        for name, sec in (r.get("timings") or {}).items():
+            stage_secs.setdefault(name, []).append(sec)
+    return {
+        "total": len(results),
+        "succeeded": len(done),
+        "failed": sum(1 for r in results if r["status"] == FAILED),
+        "skipped": sum(1 for r in results if r["status"] == SKIPPED),
+        "wall_sec": round(wall_sec, 2),
+        "items_per_min": round(len(done) / wall_sec * 60, 2) if wall_sec > 0 else 0.0,
+        "item_sec_avg": round(sum(item_secs) / len(item_secs), 2) if item_secs else 0.0,
+        "item_sec_max": round(max(item_secs), 2) if item_secs else 0.0,
+        "stage_sec_avg": {k: round(sum(v) / len(v), 2) for k, v in stage_secs.items()},
+        "degraded_items": sum(1 for r in done if r.get("degradations")),
+    }
+
+
+def run_batch(items: List[BatchItem],
+              mode: str = "use",
+              include_evaluation: bool = True,
+              evaluation_mode: str = "both",
+              max_workers: Optional[int] = None,
+              runner: Optional[Runner] = None,
+              on_item: Optional[Callable[[Dict[str, Any]], Any]] = None,
+              should_stop: Optional[Callable[[], bool]] = None,
+              batch_id: Optional[str] = None,
+              warm: bool = True) -> Dict[str, Any]:
+    """
+    항목들을 워커 풀에서 실행하고 항목별 결과 + 처리량 통계 반환
+    - runner(index, item): 항목 실행 함수 (기본: run_item) — 예외는 해당 항목 실패로 기록
+    - on_item(result): 항목이 끝날 때마다 호출 (완료 순서)
+    - should_stop(): True면 아직 시작 안 한 항목은 skipped 처리
+    """
+    batch_id = batch_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    workers = max(1, min(max_workers or BATCH_MAX_WORKERS, len(items) or 1))
+    runner = runner or (lambda index, item: run_item(item, mode, include_evaluation, evaluation_mode))
+
+    print(f"🚀 배치 시작: {len(items)}건 (batch_id={batch_id}, 동시 {workers}개)")
+    warmed = warmup(include_evaluation) if warm and items else {}
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    lock = threading.Lock()
+
+    def _one(index: int, item: BatchItem) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"index": index, "postId": _item_post_id(item)}
+        if should_stop and should_stop():
+            result.update(status=SKIPPED, elapsed_sec=0.0, error="배치 중단됨")
+        else:
+            t0 = time.time()
+            try:
+                result.update(runner(index, item) or {})
+                result["status"] = SUCCEEDED
+            except Exception as e:
+                result.update(status=FAILED, error=getattr(e, "detail", None) or str(e))
+                print(f"❌ 배치 항목 실패 [{index}] {result['postId']}: {result['error']}")
+            result["elapsed_sec"] = round(time.time() - t0, 2)
+        with lock:
+            results[index] = result
+        if on_item:
+            try:
+                on_item(result)
+            except Exception as e:
+                print(f"⚠️ 배치 진행 콜백 실패: {e}")
+        return result
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-item") as ex:
+        for fut in [ex.submit(_one, i, item) for i, item in enumerate(items)]:
+            fut.result()
+    wall_sec = time.time() - t0
+
+    from llm import metrics_snapshot
+    done = [r for r in results if r is not None]
+    summary = {
+        "batch_id": batch_id,
+        "mode": mode,
+        "include_evaluation": include_evaluation,
+        "workers": workers,
+        "warmup": warmed,
+        "stats": _throughput(done, wall_sec),
+        "llm": metrics_snapshot(),
+        "items": done,
+    }
+    _save_batch_log(summary)
+    stats = summary["stats"]
+    print(f"✅ 배치 완료: 성공 {stats['succeeded']} / 실패 {stats['failed']} / 건너뜀 {stats['skipped']} "
+          f"({stats['wall_sec']}s, {stats['items_per_min']}건/분)")
+    return summary
+
+
+def _save_batch_log(summary: Dict[str, Any]) -> Optional[Path]:
+    try:
+        out_dir = Path(f"test_logs/{summary['mode']}/{datetime.now().strftime('%Y%m%d')}")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{summary['batch_id']}_batch.json"
+        path.write_text(json.dumps(summary, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        print(f"🧾 배치 로그 저장: {path}")
+        return path
+    except Exception as e:
+        print(f"⚠️ 배치 로그 저장 실패: {e}")
+        return None
+
+
+def _load_items(path: str) -> List[BatchItem]:
+    """JSON 배열(postId 문자열 또는 payload) 또는 {"items": [...]} / {"postIds": [...]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return list(data.get("postIds", [])) + list(data.get("items", []))
+    return list(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="배치 생성 실행기 (postId/입력 payload 여러 개)")
+    parser.add_argument("mode", nargs="?", choices=["test", "use"], default="use", help="로그 모드 (기본: use)")
+    parser.add_argument("--posts", nargs="*", default=[], help="postId 목록")
+    parser.add_argument("--file", default="", help="항목 JSON 파일 경로")
+    parser.add_argument("--workers", type=int, default=None, help=f"동시 실행 수 (기본: {BATCH_MAX_WORKERS})")
+    parser.add_argument("--no-eval", action="store_true", help="Evaluation 건너뛰기")
+    parser.add_argument("--evaluation-mode", default="both", choices=["both", "medical", "seo"])
+    parser.add_argument("--env", default=".env", help="환경변수 파일 경로")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=args.env)
+
+    batch_items: List[BatchItem] = list(args.posts) + (_load_items(args.file) if args.file else [])
+    if not batch_items:
+        parser.error("--posts 또는 --file로 항목을 지정하세요")
+
+    result = run_batch(batch_items, mode=args.mode, include_evaluation=not args.no_eval,
+                       evaluation_mode=args.evaluation_mode, max_workers=args.workers)
+    print(json.dumps(result["stats"], ensure_ascii=False, indent=2))
@@ -15,24 +15,28 @@ TitleAgent (카테고리/지역/페르소나 반영 · 의료광고 준수 · 
 
 from __future__ import annotations
 
-import os, json, re, ast
+import os, sys, json, re, ast
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
-import time
 
 # -----------------------
 # 환경 & 모델
 # -----------------------
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("GEMINI_API_KEY가 필요합니다(.env)")
 
-genai.configure(api_key=GEMINI_API_KEY)
+# 프로젝트 루트 (공용 llm 패키지 import용)
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from llm import DeadlineExceeded, LLMClient
+from utils import phrase_lexicon
 
 # -----------------------
 # 경로 유틸
@@ -58,45 +62,9 @@ def _ensure_dir(p: Path):
 # -----------------------
 # 모델 클라이언트
 # -----------------------
-class GeminiClient:
-    def __init__(self, model: str = "models/gemini-1.5-flash", temperature: float = 0.7, max_output_tokens: int = 2048):
-        self.model_name = model
-        self.temperature = temperature
-        self.max_output_tokens = max_output_tokens
-        self.max_retries = 3
-        self.retry_delay = 1.0
-
-    def generate(self, prompt: str, temperature: Optional[float] = None) -> str:
-        for attempt in range(self.max_retries):
-            try:
-                m = genai.GenerativeModel(self.model_name)
-                resp = m.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=self.temperature if temperature is None else temperature,
-                        max_output_tokens=self.max_output_tokens,
-                        candidate_count=1,
-                        top_p=0.95,
-                        top_k=40,
-                    ),
-                )
-                # 일반 텍스트 경로
-                if getattr(resp, "text", None):
-                    return resp.text
-                # 후보 파츠 경로(보수용)
-                if getattr(resp, "candidates", None):
-                    parts = getattr(resp.candidates[0].content, "parts", [])
-                    if parts and getattr(parts[0], "text", ""):
-                        return parts[0].text
-                raise ValueError("응답에 text 없음")
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise e
-                print(f"⚠️ Gemini 호출 실패 (시도 {attempt + 1}/{self.max_retries}): {e}")
-                time.sleep(self.retry_delay * (2 ** attempt))
-
-
-gem = GeminiClient()
+# 후보 생성 / 최종 선택은 단계 설정을 분리 (선택 단계는 결정적으로 돌리기 쉽도록)
+gem = LLMClient("title")
+gem_select = LLMClient("title_select")
 
 
 # -----------------------
@@ -183,6 +151,7 @@ FORBIDDEN_PATTERNS = [
     r"\b100%\b", r"무통증", r"완치", r"유일", r"최고", r"즉시\s*효과", r"파격", r"이벤트", r"특가",
     r"\d+\s*원", r"\d+\s*만원", r"가격", r"전화", r"\bTEL\b", r"http[s]?://", r"www\.",
 ]
+phrase_lexicon.register("title_forbidden", FORBIDDEN_PATTERNS)
 
 
 def _clean(s: str) -> str:
@@ -198,11 +167,7 @@ def _len_ok(title: str) -> bool:
 
 
 def _violates_forbidden(title: str) -> bool:
-    t = title or ""
-    for pat in FORBIDDEN_PATTERNS:
-        if re.search(pat, t):
-            return True
-    return False
+    return phrase_lexicon.contains("title_forbidden", title or "")
 
 
 def _contains_hospital(title: str, hospital_name: str) -> bool:
@@ -367,7 +332,7 @@ def generate_candidates(plan: Dict[str, Any], N: int = 5) -> Dict[str, Any]:
     return obj
 
 
-def select_best(plan: Dict[str, Any], candidates_obj: Dict[str, Any]) -> Dict[str, Any]:
+def _filter_candidates(plan: Dict[str, Any], candidates_obj: Dict[str, Any]) -> Dict[str, Any]:
     # 길이/금지어 1차 필터링 + 너무 짧거나 긴 것은 제외
     hospital = _get(plan, "context_vars.hospital_name", "")
     filt = []
@@ -380,8 +345,24 @@ def select_best(plan: Dict[str, Any], candidates_obj: Dict[str, Any]) -> Dict[st
         if _violates_forbidden(t):
             continue
         filt.append(c)
+    return {"candidates": filt or candidates_obj.get("candidates", [])}
+
+
+def _first_candidate(cand_obj: Dict[str, Any]) -> Dict[str, str]:
+    if cand_obj.get("candidates"):
+        return {"title": cand_obj["candidates"][0]["title"], "why_best": "최소 규칙 충족 및 명확성"}
+    return {"title": "", "why_best": ""}
+
 
-    cand_obj = {"candidates": filt or candidates_obj.get("candidates", [])}
+def _template_candidates(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """후보 생성 LLM을 못 쓸 때(시간 예산 초과) plan 카테고리로 만드는 기본 제목"""
+    category = _get(plan, "context_vars.category", "") or "치과"
+    title = f"{category} 치료 과정과 치료 후 관리 포인트 정리"
+    return {"candidates": [{"title": title, "angle": "template"}], "selected": {"title": "", "why_best": ""}}
+
+
+def select_best(plan: Dict[str, Any], candidates_obj: Dict[str, Any], mode: Optional[str] = None) -> Dict[str, Any]:
+    cand_obj = _filter_candidates(plan, candidates_obj)
 
     prompt = build_evaluation_prompt(cand_obj)
     sys_dir = (
@@ -389,14 +370,14 @@ def select_best(plan: Dict[str, Any], candidates_obj: Dict[str, Any]) -> Dict[st
         "Return ONLY the JSON object per schema."
     )
     full = f"{sys_dir}\n\n{prompt}"
-    raw = gem.generate(full)
+    raw = gem_select.generate(full, mode=mode)  # test 모드에서는 응답 캐시 사용
     sel = _parse_json(raw) or {"selected": {"title": "", "why_best": ""}}
 
     # 보정: selected 누락 시 첫 후보 사용
     if not isinstance(sel.get("selected"), dict):
         sel["selected"] = {"title": "", "why_best": ""}
     if not sel["selected"].get("title") and cand_obj.get("candidates"):
-        sel["selected"] = {"title": cand_obj["candidates"][0]["title"], "why_best": "최소 규칙 충족 및 명확성"}
+        sel["selected"] = _first_candidate(cand_obj)
 
     return sel
 
@@ -420,42 +401,33 @@ def save_outputs(mode: str, result: Dict[str, Any], meta: Dict[str, Any]) -> Tup
 # 메인 파이프라인
 # -----------------------
 
-def run(plan: Optional[Dict[str, Any]] = None, plan_path: Optional[str | Path] = None, mode: str = DEF_MODE, N: int = 5) -> Dict[str, Any]:
-    plan_obj = load_plan(plan=plan, plan_path=plan_path, mode=mode)
-
-    # 후보 생성
-    cand_obj = generate_candidates(plan_obj, N=N)
-
-    # 모델 선택
-    sel_obj = select_best(plan_obj, cand_obj)
-
-    # 최종 결과 스키마 조립
-    final = {
-        "candidates": cand_obj.get("candidates", []),
-        "selected": sel_obj.get("selected", {"title": "", "why_best": ""}),
-    }
-
-    # 저장 메타
-    meta = {
-        "mode": mode,
-        "timestamp": _now(),
-        "plan_source": plan_obj.get("meta", {}).get("source_log", ""),
-        "plan_snapshot": plan_obj,  # 추후 디버깅용
-    }
-
-    out, log = save_outputs(mode, final, meta)
-    print(f"✅ Title 저장: {out}")
-    print(f"🧾 로그 저장: {log}")
-    return final
-
-def run(plan: Optional[Dict[str, Any]] = None, plan_path: Optional[str | Path] = None, mode: str = DEF_MODE, N: int = 5) -> Dict[str, Any]:
+def run(plan: Optional[Dict[str, Any]] = None, plan_path: Optional[str | Path] = None, mode: str = DEF_MODE, N: int = 5,
+        pipeline_run=None) -> Dict[str, Any]:
+    # PipelineRun이 주어지면 최신 plan 파일 탐색 없이 run.plan을 그대로 사용
+    if plan is None and plan_path is None and pipeline_run is not None and pipeline_run.plan is not None:
+        plan = pipeline_run.plan
     plan_obj = load_plan(plan=plan, plan_path=plan_path, mode=mode)
 
-    # 후보 생성
-    cand_obj = generate_candidates(plan_obj, N=N)
-
-    # 모델 선택
-    sel_obj = select_best(plan_obj, cand_obj)
+    # 후보 생성 (시간 예산 초과 시 템플릿 제목)
+    degraded = False
+    try:
+        cand_obj = generate_candidates(plan_obj, N=N)
+    except DeadlineExceeded as e:
+        cand_obj = _template_candidates(plan_obj)
+        degraded = True
+        if pipeline_run is not None:
+            pipeline_run.degrade("title", "template_title", str(e))
+
+    # 모델 선택 (시간 예산 초과 시 규칙 통과 첫 후보)
+    if degraded:
+        sel_obj = {"selected": _first_candidate(cand_obj)}
+    else:
+        try:
+            sel_obj = select_best(plan_obj, cand_obj, mode=mode)
+        except DeadlineExceeded as e:
+            sel_obj = {"selected": _first_candidate(_filter_candidates(plan_obj, cand_obj))}
+            if pipeline_run is not None:
+                pipeline_run.degrade("title", "first_candidate", str(e))
 
     # 최종 결과 스키마 조립
     final = {
@@ -487,6 +459,9 @@ def run(plan: Optional[Dict[str, Any]] = None, plan_path: Optional[str | Path] =
     }
 
     out, log = save_outputs(mode, final, meta)
+    if pipeline_run is not None:
+        pipeline_run.title = final
+        pipeline_run.set_artifact("title", out)
     print(f"✅ Title 저장: {out}")
     print(f"🧾 로그 저장: {log}")
     print(f"📌 사용 데이터: {json.dumps(used_data, ensure_ascii=False, indent=2)}")
@@ -0,0 +1,314 @@
+# medicontent_textmodel/api/jobs.py
+"""
+파이프라인 비동기 작업(Job) 관리
+
+- 제출 즉시 job_id 반환, 실제 실행은 워커 스레드 풀에서 진행 (이벤트 루프 차단 방지)
+- 단계별 진행 상황(stages), 결과(result), 에러(error) 조회
+- 취소: 대기 중인 작업은 즉시 취소, 실행 중인 작업은 다음 단계 경계에서 중단
+- 워커 수: 환경변수 PIPELINE_MAX_WORKERS (기본 2)
+- 중복 요청 합치기(single-flight): 같은 dedup_key(postId + 입력 해시)의 작업이 실행 중이면 새로 돌리지 않고
+  그 작업에 붙고, 완료 후 PIPELINE_DEDUP_WINDOW_SEC(기본 120초, 0이면 끔) 안이면 완료 결과를 그대로 반환
+- 진행 이벤트(events): 단계 시작/종료, 섹션 생성, 평가 결과 등을 순번(seq)과 함께 누적
+  → GET /api/jobs/{job_id}/events (SSE)가 순번 이후 이벤트를 흘려보냄 (재접속 시 Last-Event-ID부터 이어받기)
+  토큰 단위 이벤트(section_token)는 실시간 스트림용 → 섹션별 deque(최근 PIPELINE_JOB_MAX_TOKEN_EVENTS개, 기본 2000)에
+  따로 보관하고 섹션 완료(section) 시 그 섹션의 deque를 통째로 삭제, 배치 부모 작업으로는 전달하지 않음
+"""
+import os
+import time
+import bisect
+import heapq
+import uuid
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 작업 상태값
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# 섹션별 보관 토큰 이벤트 상한 (완료된 섹션의 토큰은 section 이벤트 하나로 대체)
+TOKEN_EVENT = "section_token"
+MAX_TOKEN_EVENTS = int(os.getenv("PIPELINE_JOB_MAX_TOKEN_EVENTS", "2000"))
+
+
+class JobCancelled(Exception):
+    """취소 요청된 작업이 단계 경계에서 중단될 때 발생"""
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class PipelineJob:
+    """단일 파이프라인 실행 작업 (상태/단계 진행/결과 보관)"""
+
+    def __init__(self, kind: str, meta: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.finished_mono: Optional[float] = None
+        self.dedup_key: Optional[str] = None
+        self.attached = 0  # 합쳐진 중복 요청 수
+        self.future: Optional[Future] = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self.events: List[Dict[str, Any]] = []
+        self._seq = 0
+        self._tokens: Dict[Any, deque] = {}  # 섹션 key → 진행 중인 토큰 이벤트 (seq 순)
+        self.closed = False
+        self._parent: Optional["PipelineJob"] = None
+        self._tag: Any = None
+
+    def child(self, kind: str, meta: Optional[Dict[str, Any]] = None, tag: Any = None) -> "PipelineJob":
+        """
+        하위 작업 (배치 항목용 · 워커 풀에 등록하지 않음)
+        - 부모와 취소 신호를 공유, 이벤트는 item=tag를 붙여 부모 스트림으로도 전달
+        """
+        sub = PipelineJob(kind, meta=meta)
+        sub._cancel_event = self._cancel_event
+        sub._parent, sub._tag = self, tag
+        sub.status = RUNNING
+        sub.started_at = _now()
+        return sub
+
+    # ===== 취소 =====
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def request_cancel(self):
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"작업이 취소되었습니다: {self.id}")
+
+    # ===== 진행 이벤트 =====
+    def emit(self, event: str, **data):
+        """
+        진행 이벤트 추가 (seq는 1부터 증가 → seq 이후 이벤트로 이어받기)
+        - section_token은 섹션별 deque에 따로 보관 (가득 차면 오래된 것부터 자동 삭제, O(1))
+        - section 이벤트가 오면 같은 섹션의 토큰 deque를 삭제 (seq는 건너뜀)
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self._seq += 1
+            record = {"seq": self._seq, "event": event, "at": _now(), "data": data}
+            if event == TOKEN_EVENT:
+                tokens = self._tokens.get(data.get("key"))
+                if tokens is None:
+                    tokens = self._tokens[data.get("key")] = deque(maxlen=MAX_TOKEN_EVENTS)
+                tokens.append(record)
+            else:
+                if event == "section":
+                    self._tokens.pop(data.get("key"), None)
+                self.events.append(record)
+        if self._parent is not None and event != TOKEN_EVENT:
+            self._parent.emit(event, item=self._tag, **data)
+
+    def events_after(self, after: int = 0) -> List[Dict[str, Any]]:
+        """seq 이후 이벤트 (일반 이벤트 + 진행 중 섹션의 토큰 이벤트를 seq 순으로 병합)"""
+        with self._lock:
+            events = self.events[bisect.bisect_right(self.events, after, key=lambda e: e["seq"]):]
+            if not self._tokens:
+                return events
+            tokens = [[e for e in q if e["seq"] > after] for q in self._tokens.values() if q[-1]["seq"] > after]
+        return list(heapq.merge(events, *tokens, key=lambda e: e["seq"]))
+
+    def close(self):
+        """종료 이벤트(done) 기록 — 이후 emit은 무시"""
+        self.emit("done", status=self.status, error=self.error)
+        with self._lock:
+            self.closed = True
+
+    # ===== 단계 진행 =====
+    @contextmanager
+    def stage(self, name: str):
+        """단계 시작/종료 시간과 상태를 기록 (시작 전에 취소 여부 확인)"""
+        self.check_cancelled()
+        t0 = time.time()
+        with self._lock:
+            self.stages[name] = {"status": RUNNING, "started_at": _now()}
+        self.emit("stage_start", stage=name)
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.stages[name].update({
+                    "status": CANCELLED if isinstance(e, JobCancelled) else FAILED,
+                    "finished_at": _now(),
+                    "elapsed_sec": round(time.time() - t0, 2),
+                })
+                info = dict(self.stages[name])
+            self.emit("stage_end", stage=name, **info)
+            raise
+        with self._lock:
+            self.stages[name].update({
+                "status": SUCCEEDED,
+                "finished_at": _now(),
+                "elapsed_sec": round(time.time() - t0, 2),
+            })
+            info = dict(self.stages[name])
+        self.emit("stage_end", stage=name, **info)
+
+    def skip_stage(self, name: str, reason: str = ""):
+        with self._lock:
+            self.stages[name] = {"status": "skipped", "reason": reason}
+        self.emit("stage_skipped", stage=name, reason=reason)
+
+    # ===== 직렬화 =====
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "meta": dict(self.meta),
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "attached": self.attached,
+            }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """고정 크기 워커 풀 위에서 PipelineJob을 실행/보관"""
+
+    def __init__(self, max_workers: int = 2, keep_finished: int = 200, dedup_window_sec: float = 120.0):
+        self.max_workers = max(1, int(max_workers))
+        self.keep_finished = keep_finished
+        self.dedup_window_sec = dedup_window_sec
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="pipeline-job")
+        self._jobs: Dict[str, PipelineJob] = {}
+        self._by_key: Dict[str, PipelineJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args,
+               meta: Optional[Dict[str, Any]] = None, dedup_key: Optional[str] = None,
+               **kwargs) -> PipelineJob:
+        """fn(job, *args, **kwargs)를 워커 풀에 제출하고 job을 즉시 반환 (중복이면 기존 job)"""
+        return self.submit_or_attach(kind, fn, *args, meta=meta, dedup_key=dedup_key, **kwargs)[0]
+
+    def submit_or_attach(self, kind: str, fn: Callable[..., Any], *args,
+                         meta: Optional[Dict[str, Any]] = None, dedup_key: Optional[str] = None,
+                         **kwargs) -> Tuple[PipelineJob, bool]:
+        """
+        (job, attached) 반환
+        - dedup_key가 같은 작업이 대기/실행 중이거나, 성공 후 dedup 창 안이면 그 작업에 붙음 (attached=True)
+        - 실패/취소된 작업, 창이 지난 작업은 재사용하지 않음
+        """
+        with self._lock:
+            existing = self._by_key.get(dedup_key) if dedup_key else None
+            if existing is not None and self._reusable(existing):
+                existing.attached += 1
+                attached = existing
+            else:
+                attached = None
+                job = PipelineJob(kind, meta=meta)
+                job.dedup_key = dedup_key
+                self._jobs[job.id] = job
+                if dedup_key:
+                    self._by_key[dedup_key] = job
+                self._prune_locked()
+
+        if attached is not None:
+            attached.emit("request_attached", attached=attached.attached)
+            print(f"🔁 중복 요청 합침: {attached.kind} (job_id={attached.id}, status={attached.status}, "
+                  f"attached={attached.attached})")
+            return attached, True
+
+        job.future = self._executor.submit(self._execute, job, fn, args, kwargs)
+        print(f"📥 작업 제출: {job.kind} (job_id={job.id}, workers={self.max_workers})")
+        return job, False
+
+    def _reusable(self, job: PipelineJob) -> bool:
+        if job.status in (QUEUED, RUNNING) and not job.cancel_requested:
+            return True
+        if job.status == SUCCEEDED and self.dedup_window_sec > 0 and job.finished_mono is not None:
+            return time.monotonic() - job.finished_mono < self.dedup_window_sec
+        return False
+
+    def _execute(self, job: PipelineJob, fn, args, kwargs):
+        if job.cancel_requested:
+            job.status = CANCELLED
+            job.finished_at = _now()
+            job.close()
+            raise JobCancelled(f"작업이 취소되었습니다: {job.id}")
+
+        job.status = RUNNING
+        job.started_at = _now()
+        job.emit("job_start", kind=job.kind)
+        try:
+            result = fn(job, *args, **kwargs)
+            job.result = result
+            job.status = SUCCEEDED
+            return result
+        except JobCancelled as e:
+            job.status = CANCELLED
+            job.error = str(e)
+            print(f"🛑 작업 취소됨: {job.id}")
+            raise
+        except Exception as e:
+            job.status = FAILED
+            job.error = getattr(e, "detail", None) or str(e)
+            print(f"❌ 작업 실패: {job.id} - {job.error}")
+            raise
+        finally:
+            job.finished_at = _now()
+            job.finished_mono = time.monotonic()
+            job.close()
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, limit: int = 50) -> List[PipelineJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return list(reversed(jobs))[:limit]
+
+    def cancel(self, job_id: str) -> Optional[PipelineJob]:
+        job = self.get(job_id)
+        if not job or job.status in FINISHED_STATES:
+            return job
+        job.request_cancel()
+        # 아직 워커에 배정되지 않은 작업은 바로 취소
+        if job.future and job.future.cancel():
+            job.status = CANCELLED
+            job.finished_at = _now()
+            job.close()
+        return job
+
+    def _prune_locked(self):
+        finished = [j for j in self._jobs.values() if j.status in FINISHED_STATES]
+        overflow = len(finished) - self.keep_finished
+        for j in finished[:max(0, overflow)]:
+            self._jobs.pop(j.id, None)
+            if j.dedup_key and self._by_key.get(j.dedup_key) is j:
+                self._by_key.pop(j.dedup_key, None)
+
+
+job_manager = JobManager(max_workers=int(os.getenv("PIPELINE_MAX_WORKERS", "2")),
+                         dedup_window_sec=float(os.getenv("PIPELINE_DEDUP_WINDOW_SEC", "120")))
@@ -1,9 +1,10 @@
 # medicontent_textmodel/api/routes.py - 수정된 버전
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, Union
 import sys
 import os
+import asyncio
 from pathlib import Path
 import json
 from datetime import datetime
@@ -11,6 +12,8 @@ import requests
 from dotenv import load_dotenv
 load_dotenv()
 
+from api.jobs import job_manager, JobCancelled
+
 # agents 폴더를 Python 경로에 추가
 current_dir = Path(__file__).parent.parent
 sys.path.append(str(current_dir / "agents"))
@@ -39,15 +42,25 @@ def find_specific_log(mode: str, target_case_id: str = None, target_post_id: str
         if target_log_path:
             log_path = Path(target_log_path)
             if log_path.exists():
-                with open(log_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list) and data:
-                        return data[-1]  # 배열이면 마지막 원소
-                    elif isinstance(data, dict):
-                        return data
+                from utils.log_store import latest_entry
+                return latest_entry(log_path)  # 배열/JSONL이면 마지막 원소, dict면 그대로
             return None
         
-        # 2. 날짜별 검색 범위 설정
+        if not (target_case_id or target_post_id):
+            return None
+
+        # 2. 로그 인덱스 조회 (실패 시 아래 파일 스캔으로 대체)
+        try:
+            from utils import log_index
+            hit = log_index.find_latest(mode, case_id=target_case_id, post_id=target_post_id, date=target_date)
+            if hit:
+                print(f"✅ 조건에 맞는 로그 발견: {hit[1]}")
+                return hit[0]
+            return None
+        except Exception as e:
+            print(f"⚠️ 로그 인덱스 조회 실패, 파일 스캔으로 대체: {e}")
+
+        # 3. 날짜별 검색 범위 설정
         search_dirs = []
         if target_date:
             # 특정 날짜 폴더만 검색
@@ -62,16 +75,15 @@ def find_specific_log(mode: str, target_case_id: str = None, target_post_id: str
                            if d.is_dir() and d.name.isdigit() and len(d.name) == 8]
                 search_dirs = sorted(date_dirs, reverse=True)  # 최신 날짜부터
         
-        # 3. 각 검색 디렉토리에서 로그 파일 찾기
+        # 4. 각 검색 디렉토리에서 로그 파일 찾기
         for search_dir in search_dirs:
-            log_files = sorted(list(search_dir.glob("*_input_logs.json")) + 
-                             list(search_dir.glob("*_input_log.json")),
+            from utils.log_store import glob_input_logs, load_log
+            log_files = sorted(glob_input_logs(search_dir),
                              key=lambda x: x.stat().st_mtime, reverse=True)
             
             for log_file in log_files:
                 try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        logs_data = json.load(f)
+                    logs_data = load_log(log_file)
                         
                     # 로그 데이터가 배열인 경우
                     if isinstance(logs_data, list):
@@ -136,11 +148,10 @@ async def save_to_post_data_requests(data: ContentGenerationRequest):
         from dotenv import load_dotenv
         load_dotenv()
         
-        # Python Airtable 라이브러리 사용
-        from pyairtable import Api
+        # 공용 Airtable 게이트웨이 (연결 재사용)
+        from utils.airtable_gateway import get_table, invalidate
         
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Post Data Requests')
+        table = get_table('Post Data Requests')
         
         # UI와 동일한 형태로 Post Data Requests 테이블에 저장
         current_time = datetime.now()
@@ -163,6 +174,7 @@ async def save_to_post_data_requests(data: ContentGenerationRequest):
         }
         
         result = table.create(record_data)
+        invalidate('Post Data Requests')  # Post ID별 조회 캐시 갱신
         return result['id']  # 생성된 레코드 ID 반환
         
     except Exception as e:
@@ -177,10 +189,9 @@ async def update_post_data_request_status(record_id: str, status: str, results:
         from dotenv import load_dotenv
         load_dotenv()
         
-        from pyairtable import Api
+        from utils.airtable_gateway import get_table
         
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Post Data Requests')
+        table = get_table('Post Data Requests')
         
         update_data = {
             'Status': status
@@ -220,10 +231,9 @@ async def update_medicontent_post_status(post_id: str, status: str):
         from dotenv import load_dotenv
         load_dotenv()
         
-        from pyairtable import Api
+        from utils.airtable_gateway import get_table
         
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Medicontent Posts')
+        table = get_table('Medicontent Posts')
         
         print(f"🔍 Post ID 필드로 레코드 검색: {post_id}")
         
@@ -295,6 +305,7 @@ async def root():
             "health": "/health",
             "main_pipeline": "/api/all-agents", 
             "test_pipeline": "/api/half-agents",
+            "jobs": "/api/jobs",
             "input_processing": "/api/input-agent",
             "logs": "/api/logs/list"
         },
@@ -320,7 +331,13 @@ async def half_agents_pipeline(request: dict):
     테스트용: Plan → Title → Content → Evaluation 파이프라인 실행
     - 최신 input_log를 읽어서 plan부터 evaluation까지 실행
     - 특정 로그 선택 지원: case_id, postId, 날짜 등으로 지정 가능
+    - 실행은 작업 워커 풀에서 진행되며, 완료될 때까지 기다렸다가 결과 반환
     """
+    job = _submit_half_agents_job(request)
+    return await _wait_job(job)
+
+async def _half_agents_core(request: dict, job):
+    """half-agents 파이프라인 본체 (워커 스레드의 이벤트 루프에서 실행)"""
     try:
         print("🚀 Half-Agents 파이프라인 실행 시작 (Plan → Title → Content → Evaluation)")
         
@@ -328,11 +345,7 @@ async def half_agents_pipeline(request: dict):
         from dotenv import load_dotenv
         load_dotenv()
         
-        # 에이전트들 import (함수 기반)
-        from plan_agent import main as plan_main
-        from title_agent import run as title_run
-        from content_agent import run as content_run
-        from evaluation_agent import run
+        from pipeline_run import start_run, run_pipeline, finish_run
         
         mode = request.get("mode", "use")
         input_data = request.get("input_data")  # None이면 최신 input_log 사용
@@ -370,41 +383,28 @@ async def half_agents_pipeline(request: dict):
                     print("❌ DB와 로그 파일 모두에서 데이터를 찾을 수 없습니다. 최신 로그를 사용합니다.")
                     input_data = None
         
-        # Step 1: PlanAgent 실행
-        print("🚀 Step 1: PlanAgent 실행...")
-        plan = plan_main(mode='use', input_data=input_data)
-        if not plan:
-            raise Exception("Plan 생성 실패")
-        
-        # Step 2: TitleAgent 실행
-        print("🚀 Step 2: TitleAgent 실행...")
-        title = title_run(mode='use')
-        if not title:
-            raise Exception("Title 생성 실패")
-        
-        # Step 3: ContentAgent 실행
-        print("🚀 Step 3: ContentAgent 실행...")
-        content = content_run(mode='use')
-        if not content:
-            raise Exception("Content 생성 실패")
-        
-        full_article = content  # content_run에서 완성된 글을 반환
-        
-        # Step 5: EvaluationAgent 실행
-        print("🚀 Step 5: EvaluationAgent 실행...")
-        evaluation_result = run(
-            criteria_mode="표준",
-            max_loops=2,
-            auto_yes=True,
-            log_dir="test_logs/use",
-            evaluation_mode="both"
-        )
+        # Step 1~4: Plan → Title → Content → Evaluation (run 객체로 단계 간 직접 전달)
+        pipeline_run = start_run(mode='use', input_row=input_data,
+                                 input_source="(half-agents request)" if input_data else "")
+        pipeline_run.subscribe(job.emit)
+        try:
+            run_pipeline(pipeline_run, include_evaluation=True, stage=job.stage)
+        finally:
+            finish_run(pipeline_run.run_id)
+        
+        plan = pipeline_run.plan
+        title = pipeline_run.title
+        full_article = pipeline_run.content  # content_run에서 완성된 글을 반환
+        evaluation_result = pipeline_run.evaluation
         
         print("✅ Half-Agents 파이프라인 완료!")
         
         return {
             "status": "success",
             "message": "Half-Agents 파이프라인 실행 완료",
+            "run_id": pipeline_run.run_id,
+            "timings": pipeline_run.timings,
+            "degradations": pipeline_run.degradations,
             "results": {
                 "title": title.get('title') if isinstance(title, dict) else str(title),
                 "content": full_article,
@@ -415,6 +415,9 @@ async def half_agents_pipeline(request: dict):
             }
         }
         
+    except JobCancelled:
+        print("🛑 Half-Agents 파이프라인 취소됨")
+        raise
     except Exception as e:
         print(f"❌ Half-Agents 파이프라인 실패: {str(e)}")
         import traceback
@@ -426,14 +429,23 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
     """
     실제용: Input → Plan → Title → Content → Evaluation 전체 파이프라인
     UI 입력 → Post Data Requests 저장 → 텍스트 생성 → Evaluation → 결과 업데이트
+    - 실행은 작업 워커 풀에서 진행되며, 완료될 때까지 기다렸다가 결과 반환
+    - 즉시 job_id만 받으려면 POST /api/jobs/all-agents 사용
+    - 같은 postId · 같은 입력으로 실행 중(또는 방금 완료된) 요청이 있으면 그 결과를 함께 받음
     """
+    job, _ = await _submit_all_agents_job(request)
+    return await _wait_job(job)
+
+async def _all_agents_core(request: ContentGenerationRequest, job):
+    """all-agents 파이프라인 본체 (워커 스레드의 이벤트 루프에서 실행)"""
     
     record_id = None
     
     try:
         # 1단계: 이미 생성된 입력 로그 찾기
         print("📝 Step 1: 기존 입력 로그 찾기...")
-        input_data = find_specific_log("use", target_post_id=request.postId)
+        with job.stage("input"):
+            input_data = find_specific_log("use", target_post_id=request.postId)
         if not input_data:
             raise Exception(f"Post ID {request.postId}에 대한 입력 로그를 찾을 수 없습니다. input-only를 먼저 실행해주세요.")
         
@@ -445,41 +457,29 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
         
         # 3단계: 상태를 '처리 중'으로 변경
         print("🔄 Step 2: 상태를 '처리 중'으로 변경...")
-        from pyairtable import Api
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        table = api.table(os.getenv('AIRTABLE_BASE_ID'), 'Post Data Requests')
-        records = table.all(formula=f"{{Post ID}} = '{request.postId}'")
-        if not records:
+        record = _find_post_data_request(request.postId, use_cache=False)
+        if not record:
             raise Exception(f"Post ID {request.postId}에 대한 Post Data Requests 레코드를 찾을 수 없습니다.")
-        record_id = records[0]['id']
+        record_id = record['id']
         await update_post_data_request_status(record_id, '처리 중')
         
-        # 4단계: 에이전트들 import (함수 기반)
+        # 4단계: Plan → Title → Content → (Evaluation) — run 객체로 단계 간 직접 전달
+        from pipeline_run import start_run, run_pipeline, finish_run
+        
+        pipeline_run = start_run(mode='use', input_row=input_data,
+                                 input_source=f"(log: postId={request.postId})")
+        pipeline_run.subscribe(job.emit)
+        if not request.includeEvaluation:
+            print("⏩ EvaluationAgent 건너뜀 (includeEvaluation=False)")
+            job.skip_stage("evaluation", "includeEvaluation=False")
         try:
-            from plan_agent import main as plan_main
-            from title_agent import run as title_run
-            from content_agent import run as content_run
-            from evaluation_agent import run as evaluation_run
-            print("✅ 에이전트 모듈 import 완료")
-        except ImportError as import_error:
-            print(f"❌ 에이전트 import 실패: {import_error}")
-            raise Exception(f"에이전트 모듈을 찾을 수 없습니다: {import_error}")
-        
-        print("🚀 Step 3: PlanAgent 실행...")
-        plan = plan_main(mode='use')  # 이미 저장된 input 로그를 자동으로 찾아서 사용
-        if not plan:
-            raise Exception("Plan 생성 실패")
-        
-        print("🚀 Step 4: TitleAgent 실행...")
-        title = title_run(mode='use')  # 이미 저장된 plan 로그를 자동으로 찾아서 사용
-        if not title:
-            raise Exception("Title 생성 실패")
-        
-        print("🚀 Step 5: ContentAgent 실행...")
-        # ✨ Airtable 연동으로 content_agent 실행
-        content = content_run(mode='use')
-        if not content:
-            raise Exception("Content 생성 실패")
+            run_pipeline(pipeline_run, include_evaluation=request.includeEvaluation, stage=job.stage)
+        finally:
+            finish_run(pipeline_run.run_id)
+        
+        plan = pipeline_run.plan
+        content = pipeline_run.content
+        evaluation_result = pipeline_run.evaluation
         
         # title과 content 분리 (API에서는 title과 content 분리 필요)
         title = content.get("title", "")
@@ -501,20 +501,6 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
             "meta": content.get("meta", {})
         }
         
-        # 7단계: EvaluationAgent 실행 (옵션)
-        evaluation_result = None
-        if request.includeEvaluation:
-            print("🚀 Step 6: EvaluationAgent 실행...")
-            evaluation_result = evaluation_run(
-                criteria_mode="표준",
-                max_loops=2,
-                auto_yes=True,
-                log_dir="test_logs/use",
-                evaluation_mode="both"
-            )
-        else:
-            print("⏩ Step 6: EvaluationAgent 건너뜀 (includeEvaluation=False)")
-        
         print("✅ All-Agents 파이프라인 완료!")
         
         # 8단계: 결과를 Post Data Requests에 업데이트 (상태: 완료)
@@ -568,6 +554,7 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
         print(f"💾 추출된 Content 길이: {len(extracted_content)} 글자")
         
         print("💾 Step 7: 결과를 Airtable에 저장...")
+        job.check_cancelled()
         try:
             await update_post_data_request_status(record_id, '완료', results)
             print("✅ Post Data Requests 업데이트 완료")
@@ -589,13 +576,19 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
             "status": "success",
             "message": "All-Agents 파이프라인 실행 완료",
             "record_id": record_id,
+            "run_id": pipeline_run.run_id,
+            "timings": pipeline_run.timings,
+            "degradations": pipeline_run.degradations,
             "results": results
         }
         
     except Exception as e:
-        print(f"❌ All-Agents 파이프라인 실패: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        if isinstance(e, JobCancelled):
+            print("🛑 All-Agents 파이프라인 취소됨")
+        else:
+            print(f"❌ All-Agents 파이프라인 실패: {str(e)}")
+            import traceback
+            traceback.print_exc()
         
         if record_id:
             try:
@@ -607,77 +600,267 @@ async def all_agents_pipeline(request: ContentGenerationRequest):
             except Exception as update_error:
                 print(f"❌ 상태 업데이트도 실패: {update_error}")
         
+        if isinstance(e, JobCancelled):
+            raise
         raise HTTPException(status_code=500, detail=str(e))
 
+# ===== 비동기 작업(Job) 엔드포인트 =====
+
+def _run_pipeline_job(job, core, request):
+    """워커 스레드에서 파이프라인 코루틴을 전용 이벤트 루프로 실행"""
+    return asyncio.run(core(request, job))
+
+def _dedup_key(kind: str, ident: str, payload: Dict[str, Any], input_entry: Optional[dict]) -> str:
+    """postId + 요청/입력 내용 해시 → 같은 입력의 중복 요청만 하나의 실행으로 합침"""
+    import hashlib
+    raw = json.dumps({"request": payload, "input": input_entry}, ensure_ascii=False, sort_keys=True, default=str)
+    return f"{kind}:{ident}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+
+async def _submit_all_agents_job(request: ContentGenerationRequest):
+    """all-agents 작업 제출 (같은 postId · 같은 입력이면 실행 중/최근 완료 작업에 합침) → (job, attached)"""
+    # 입력 로그 조회는 로그 인덱스(SQLite · 최초 호출 시 전체 재색인) + 파일 stat → 이벤트 루프 밖에서 실행
+    input_entry = await asyncio.to_thread(find_specific_log, "use", target_post_id=request.postId)
+    key = _dedup_key("all-agents", request.postId, request.model_dump(), input_entry)
+    return job_manager.submit_or_attach("all-agents", _run_pipeline_job, _all_agents_core, request,
+                                        meta={"postId": request.postId}, dedup_key=key)
+
+def _submit_half_agents_job(request: dict):
+    return job_manager.submit("half-agents", _run_pipeline_job, _half_agents_core, request,
+                              meta={"mode": request.get("mode", "use")})
+
+def _accepted(job, attached: bool = False) -> Dict[str, Any]:
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "deduplicated": attached,
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result",
+        "events_url": f"/api/jobs/{job.id}/events"
+    }
+
+async def _wait_job(job):
+    """작업 완료까지 이벤트 루프를 막지 않고 대기한 뒤 결과 반환"""
+    try:
+        # 합쳐진 중복 요청이 같은 job을 기다리므로, 한 요청의 연결 종료가 공유 작업을 취소하지 않도록 shield
+        return await asyncio.shield(asyncio.wrap_future(job.future))
+    except HTTPException:
+        raise
+    except (JobCancelled, asyncio.CancelledError):
+        raise HTTPException(status_code=409, detail=f"작업이 취소되었습니다: {job.id}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/jobs/all-agents")
+async def submit_all_agents_job(request: ContentGenerationRequest):
+    """all-agents 파이프라인을 작업으로 제출하고 job_id를 즉시 반환"""
+    job, attached = await _submit_all_agents_job(request)
+    return _accepted(job, attached)
+
+@router.post("/api/jobs/half-agents")
+async def submit_half_agents_job(request: dict):
+    """half-agents 파이프라인을 작업으로 제출하고 job_id를 즉시 반환"""
+    job = _submit_half_agents_job(request)
+    return _accepted(job)
+
+@router.get("/api/jobs")
+async def list_jobs(limit: int = 50):
+    """최근 작업 목록 (최신순)"""
+    return {
+        "status": "success",
+        "max_workers": job_manager.max_workers,
+        "jobs": [job.to_dict() for job in job_manager.list(limit)]
+    }
+
+@router.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """작업 상태 및 단계별 진행 상황 조회"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job.to_dict()
+
+@router.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업의 결과 조회 (미완료 시 202)"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    if job.status == "succeeded":
+        return job.result
+    if job.status in ("failed", "cancelled"):
+        raise HTTPException(status_code=409 if job.status == "cancelled" else 500,
+                            detail=job.error or job.status)
+    from fastapi.responses import JSONResponse
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+SSE_POLL_SEC = float(os.getenv("SSE_POLL_SEC", "0.25"))
+SSE_HEARTBEAT_SEC = float(os.getenv("SSE_HEARTBEAT_SEC", "15"))
+
+def _sse(event: Dict[str, Any]) -> str:
+    data = json.dumps({**event["data"], "at": event["at"]}, ensure_ascii=False, default=str)
+    return f"id: {event['seq']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+async def _job_event_stream(job, after: int):
+    """누적된 이벤트를 순번 이후부터 흘려보내고, done 이벤트 후 종료 (대기 중에는 주기적 heartbeat)"""
+    idle = 0.0
+    while True:
+        events = job.events_after(after)
+        for event in events:
+            after = event["seq"]
+            yield _sse(event)
+            if event["event"] == "done":
+                return
+        if events:
+            idle = 0.0
+            continue
+        await asyncio.sleep(SSE_POLL_SEC)
+        idle += SSE_POLL_SEC
+        if idle >= SSE_HEARTBEAT_SEC:
+            idle = 0.0
+            yield ": ping\n\n"
+
+@router.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, since: int = 0):
+    """
+    작업 진행 이벤트 스트림 (Server-Sent Events)
+    - event: job_start / stage_start / stage_end / stage_skipped / title / section / section_token
+             / content / evaluation / degraded / done
+    - 재접속: Last-Event-ID 헤더(또는 since)의 순번 이후부터 이어서 전송
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    last_id = request.headers.get("last-event-id")
+    after = int(last_id) if last_id and last_id.isdigit() else since
+    from fastapi.responses import StreamingResponse
+    return StreamingResponse(
+        _job_event_stream(job, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """작업 취소 (대기 중이면 즉시, 실행 중이면 다음 단계 시작 전에 중단)"""
+    job = job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return {
+        "status": "success",
+        "job_id": job.id,
+        "job_status": job.status,
+        "cancel_requested": job.cancel_requested
+    }
+
+# ===== 배치 생성 =====
+class BatchRequest(BaseModel):
+    postIds: List[str] = []  # all-agents와 동일하게 처리 (Post Data Requests 상태 갱신 포함)
+    items: List[Dict[str, Any]] = []  # input_log 엔트리 또는 UI 입력 payload (Airtable 상태 갱신 없음)
+    mode: str = "use"  # items 처리 시 로그 모드
+    includeEvaluation: bool = True
+    evaluationMode: str = "both"
+    maxWorkers: Optional[int] = None  # 기본: BATCH_MAX_WORKERS
+
+def _run_batch_job(job, request: BatchRequest):
+    """배치 작업 본체 - 항목별 진행은 job 이벤트(item_done / item별 단계 이벤트)로 전달"""
+    from run_batch import run_batch, run_item
+
+    def _runner(index: int, item):
+        sub = job.child("batch-item", meta={"index": index}, tag=index)
+        if isinstance(item, str):
+            out = asyncio.run(_all_agents_core(
+                ContentGenerationRequest(postId=item, includeEvaluation=request.includeEvaluation), sub))
+            return {
+                "run_id": out.get("run_id"),
+                "record_id": out.get("record_id"),
+                "title": (out.get("results") or {}).get("title", ""),
+                "timings": out.get("timings", {}),
+                "degradations": out.get("degradations", []),
+            }
+        return run_item(item, request.mode, request.includeEvaluation, request.evaluationMode,
+                        listener=sub.emit, stage=sub.stage)
+
+    summary = run_batch(
+        list(request.postIds) + list(request.items),
+        mode=request.mode,
+        include_evaluation=request.includeEvaluation,
+        evaluation_mode=request.evaluationMode,
+        max_workers=request.maxWorkers,
+        runner=_runner,
+        on_item=lambda result: job.emit("item_done", **result),
+        should_stop=lambda: job.cancel_requested,
+        batch_id=job.id,
+    )
+    return {"status": "success", **summary}
+
+@router.post("/api/batch")
+async def submit_batch(request: BatchRequest):
+    """
+    여러 게시글을 한 번에 생성 (작업으로 제출 후 job_id 즉시 반환)
+    - 결과: GET /api/jobs/{job_id}/result → 항목별 결과/실패 + 처리량 통계
+    - 진행: GET /api/jobs/{job_id}/events → item_done 및 항목별 단계 이벤트(item=순번)
+    """
+    total = len(request.postIds) + len(request.items)
+    if not total:
+        raise HTTPException(status_code=400, detail="postIds 또는 items가 필요합니다.")
+    job = job_manager.submit("batch", _run_batch_job, request, meta={"items": total})
+    return _accepted(job)
+
+# ===== Airtable 게이트웨이 캐시 =====
+@router.get("/api/airtable/cache")
+async def get_airtable_cache_stats():
+    """테이블별 TTL 캐시 hit/miss 통계"""
+    from utils.airtable_gateway import cache_stats
+    return {"status": "success", **cache_stats()}
+
+@router.post("/api/airtable/cache/invalidate")
+async def invalidate_airtable_cache(table: Optional[str] = None):
+    """테이블 캐시 무효화 (table 미지정 시 전체)"""
+    from utils.airtable_gateway import invalidate
+    invalidate(table)
+    return {"status": "success", "invalidated": table or "all"}
+
+# ===== LLM 호출 메트릭 =====
+@router.get("/api/llm/metrics")
+async def get_llm_metrics():
+    """단계별 LLM 호출 수/지연시간/토큰 사용량"""
+    from llm import metrics_snapshot, cache_stats
+    return {"status": "success", "stages": metrics_snapshot(), "cache": cache_stats()}
+
 @router.get("/api/logs/list")
-async def get_logs_list(mode: str = "use", limit: int = 50):
+async def get_logs_list(mode: str = "use", limit: int = 50, cursor: Optional[str] = None):
     """
     로그 목록을 가져오는 API
     - 날짜별로 정리된 input_log 파일들의 목록과 간단한 정보 반환
+    - 로그 인덱스 기반 최신순 커서 페이지네이션: 응답의 next_cursor를 다음 요청의 cursor로 전달
     """
     try:
-        print(f"🔍 로그 목록 조회 요청 (mode: {mode}, limit: {limit})")
-        
-        logs_info = []
-        mode_dir = Path(f"test_logs/{mode}")
-        
-        if not mode_dir.exists():
-            return {
-                "status": "success",
-                "message": f"{mode} 모드의 로그 폴더가 존재하지 않습니다.",
-                "logs": []
-            }
-        
-        # 날짜 폴더들 탐색 (최신순)
-        date_dirs = sorted([d for d in mode_dir.iterdir() 
-                          if d.is_dir() and d.name.isdigit() and len(d.name) == 8],
-                         reverse=True)
+        print(f"🔍 로그 목록 조회 요청 (mode: {mode}, limit: {limit}, cursor: {cursor or '-'})")
         
-        for date_dir in date_dirs:
-            # 각 날짜 폴더의 input_log 파일들 탐색
-            log_files = sorted(list(date_dir.glob("*_input_logs.json")) + 
-                             list(date_dir.glob("*_input_log.json")),
-                             key=lambda x: x.stat().st_mtime, reverse=True)
-            
-            for log_file in log_files:
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        logs_data = json.load(f)
-                    
-                    # 파일 내의 각 로그 엔트리 정보 추출
-                    if isinstance(logs_data, list):
-                        for i, log_entry in enumerate(reversed(logs_data)):
-                            log_info = _extract_log_info(log_entry, log_file, f"entry_{len(logs_data)-i}")
-                            if log_info:
-                                logs_info.append(log_info)
-                                
-                    elif isinstance(logs_data, dict):
-                        log_info = _extract_log_info(logs_data, log_file, "single")
-                        if log_info:
-                            logs_info.append(log_info)
-                    
-                    # limit 체크
-                    if len(logs_info) >= limit:
-                        break
-                        
-                except Exception as e:
-                    print(f"⚠️ 로그 파일 처리 실패: {log_file} - {e}")
-                    continue
-            
-            if len(logs_info) >= limit:
-                break
+        from utils import log_index
+        try:
+            entries, next_cursor = log_index.list_entries(mode, limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # 시간순으로 정렬 (최신순)
-        logs_info.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        logs_info = []
+        for log_entry, file_path, entry_index in entries:
+            entry_id = "single" if entry_index < 0 else f"entry_{entry_index + 1}"
+            log_info = _extract_log_info(log_entry, Path(file_path), entry_id)
+            if log_info:
+                logs_info.append(log_info)
         
         print(f"✅ 로그 목록 조회 완료: {len(logs_info)}개 발견")
         
         return {
             "status": "success", 
             "message": f"{len(logs_info)}개의 로그를 찾았습니다.",
-            "logs": logs_info[:limit]
+            "logs": logs_info,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ 로그 목록 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=f"로그 목록 조회 실패: {str(e)}")
@@ -860,55 +1043,67 @@ async def input_agent_only(request: dict):
 
 # ===== DB 처리 함수들 =====
 
-async def get_input_data_from_db(target_id: str) -> Optional[dict]:
+# Post Data Requests 조회 시 가져올 필드 (field projection)
+POST_REQUEST_FIELDS = [
+    'Post ID',
+    'Concept Message', 'Patient Condition',
+    'Treatment Process Message', 'Treatment Result Message', 'Additional Message',
+    'Before Images', 'Process Images', 'After Images',
+    'Before Images Texts', 'Process Images Texts', 'After Images Texts',
+]
+# Post ID별 조회 결과 캐시 TTL(초) — 이미지 URL 만료를 고려해 짧게 유지
+POST_REQUEST_CACHE_TTL = int(os.getenv("AIRTABLE_POST_REQUEST_TTL", "30"))
+
+
+def _find_post_data_request(post_id: str, use_cache: bool = True) -> Optional[dict]:
+    """
+    Post Data Requests에서 Post ID가 일치하는 첫 레코드 조회
+    - filterByFormula + maxRecords=1 + 필요한 필드만 요청 → 전체 테이블 스캔/페이지 순회 없음
+    - 필드 projection이 거부되면(스키마 차이) 전체 필드로 1회 재시도
+    """
+    from pyairtable.formulas import match
+    from utils.airtable_gateway import cached_first
+
+    ttl = POST_REQUEST_CACHE_TTL if use_cache else 0
+    formula = match({'Post ID': post_id})
+    try:
+        return cached_first('Post Data Requests', ttl=ttl, formula=formula, fields=POST_REQUEST_FIELDS)
+    except Exception as e:
+        print(f"⚠️ 필드 지정 조회 실패, 전체 필드로 재시도: {e}")
+        return cached_first('Post Data Requests', ttl=ttl, formula=formula)
+
+
+async def get_input_data_from_db(target_id: str, use_cache: bool = True) -> Optional[dict]:
     """
     DB(Airtable)의 Post Data Requests에서 해당 ID의 최신 데이터를 가져와서
     input_agent 형식으로 변환하여 반환
     
     Args:
         target_id: 검색할 ID (레코드 ID 또는 Post ID)
+        use_cache: Post ID별 단기 캐시 사용 여부 (최신 이미지 URL이 필요하면 False)
         
     Returns:
         input_agent 형식의 딕셔너리 또는 None
     """
     try:
-        from pyairtable import Api
+        from utils.airtable_gateway import cached_first
         import re
         
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        base_id = os.getenv('AIRTABLE_BASE_ID')
-        
-        if not api or not base_id:
+        if not os.getenv('AIRTABLE_API_KEY') or not os.getenv('AIRTABLE_BASE_ID'):
             return None
         
         # ✅ 단순화: target_id를 그대로 Post ID로 사용
         actual_post_id = target_id
         
-        # ✅ Post Data Requests 검색
-        data_requests_table = api.table(base_id, 'Post Data Requests')
-        
-        # ✅ Post Data Requests 테이블에서 정확한 필드명으로 검색
+        # ✅ Post Data Requests 검색 (Post ID 필터 · 첫 매칭에서 중단)
         try:
-            all_records = data_requests_table.all()
-            records = []
-            
-            for record in all_records:
-                fields = record['fields']
-                # Post Data Requests의 정확한 필드명: 'Post ID' (모두 대문자)
-                stored_post_id = fields.get('Post ID')  # Post Data Requests는 'Post ID'
-                
-                if stored_post_id == actual_post_id:
-                    records.append(record)
-                    break
-                    
+            latest_record = _find_post_data_request(actual_post_id, use_cache=use_cache)
         except Exception as e:
             return None
                 
-        if not records:
+        if not latest_record:
             return None
             
-        # 최신 레코드 선택 (created_time 기준)
-        latest_record = max(records, key=lambda x: x.get('createdTime', ''))
         record_data = latest_record['fields']
         record_id = latest_record['id']  # 프록시 URL 생성용
         
@@ -918,14 +1113,13 @@ async def get_input_data_from_db(target_id: str) -> Optional[dict]:
         print(f"  - Process Images: {len(record_data.get('Process Images', []))}개")  
         print(f"  - After Images: {len(record_data.get('After Images', []))}개")
         
-        # Hospital 정보 가져오기
-        hospital_table = api.table(base_id, 'Hospital')
-        hospital_records = hospital_table.all()
+        # Hospital 정보 가져오기 (첫 레코드만 · TTL 캐시)
+        hospital_record = cached_first('Hospital')
         
-        if not hospital_records:
+        if not hospital_record:
             return None
             
-        hospital_info = hospital_records[0]['fields']  # 첫 번째 병원 정보 사용
+        hospital_info = hospital_record['fields']  # 첫 번째 병원 정보 사용
         
         # input_agent 형식으로 변환
         hospital_name = hospital_info.get("hospitalName", "")
@@ -945,19 +1139,22 @@ async def get_input_data_from_db(target_id: str) -> Optional[dict]:
             "question3_visit_images": convert_attachments_to_images(
                 record_data.get("Before Images") or record_data.get("beforeImages", []),
                 record_data.get("Before Images Texts") or record_data.get("beforeImagesText", ""),
-                record_id
+                record_id,
+                field="Before Images"
             ),
             "question4_treatment": record_data.get("Treatment Process Message") or record_data.get("treatmentProcessMessage", ""),
             "question5_therapy_images": convert_attachments_to_images(
                 record_data.get("Process Images") or record_data.get("processImages", []),
                 record_data.get("Process Images Texts") or record_data.get("processImagesText", ""),
-                record_id
+                record_id,
+                field="Process Images"
             ),
             "question6_result": record_data.get("Treatment Result Message") or record_data.get("treatmentResultMessage", ""),
             "question7_result_images": convert_attachments_to_images(
                 record_data.get("After Images") or record_data.get("afterImages", []),
                 record_data.get("After Images Texts") or record_data.get("afterImagesText", ""),
-                record_id
+                record_id,
+                field="After Images"
             ),
             "question8_extra": record_data.get("Additional Message") or record_data.get("additionalMessage", ""),
             "include_tooth_numbers": False,
@@ -983,7 +1180,14 @@ async def get_input_data_from_db(target_id: str) -> Optional[dict]:
         return None
 
 
-def convert_attachments_to_images(attachments, descriptions_text: str = "", record_id: str = ""):
+def attachment_proxy_url(record_id: str, index: int, field: str = "") -> str:
+    """로컬 첨부 캐시 프록시 경로 (서명 URL과 달리 만료되지 않음)"""
+    from urllib.parse import quote
+    url = f"/airtable/attachments/{record_id}/images/{index}"
+    return f"{url}?field={quote(field)}" if field else url
+
+
+def convert_attachments_to_images(attachments, descriptions_text: str = "", record_id: str = "", field: str = ""):
     """
     Airtable attachment 배열을 input_agent의 이미지 형식으로 변환
     
@@ -991,6 +1195,7 @@ def convert_attachments_to_images(attachments, descriptions_text: str = "", reco
         attachments: Airtable attachment 객체 리스트
         descriptions_text: 쉼표로 구분된 설명 텍스트
         record_id: Airtable record ID (프록시 URL 생성용)
+        field: 첨부 필드명 (프록시 URL의 field 파라미터)
         
     Returns:
         input_agent 형식의 이미지 리스트
@@ -1044,7 +1249,7 @@ def convert_attachments_to_images(attachments, descriptions_text: str = "", reco
                 
         # 3순위: 프록시 URL 생성 (fallback)
         elif record_id and attachment_id:
-            proxy_url = f"/airtable/attachments/{record_id}/images/{i}"
+            proxy_url = attachment_proxy_url(record_id, i, field)
             attachment_url = proxy_url
             print(f"⚠️ 실제 URL 없음, 프록시 URL 생성: {proxy_url}")
             
@@ -1063,6 +1268,8 @@ def convert_attachments_to_images(attachments, descriptions_text: str = "", reco
         image_info["path"] = attachment_url
         image_info["record_id"] = record_id
         image_info["attachment_id"] = attachment_id
+        if record_id and attachment_id:
+            image_info["proxy_url"] = attachment_proxy_url(record_id, i, field)
         
         result.append(image_info)
     
@@ -1074,14 +1281,10 @@ def get_emote_images_from_db(active_only: bool = True) -> list[dict]:
     Airtable 'Emote Images' 테이블에서 이모트 이미지를 가져옵니다.
     """
     try:
-        from pyairtable import Api
+        from utils.airtable_gateway import cached_all
         
-        api = Api(os.getenv('AIRTABLE_API_KEY'))
-        base_id = os.getenv('AIRTABLE_BASE_ID')
-        table = api.table(base_id, 'Emote Images')
-        
-        # Active 필드가 빈 값이므로 필터링 없이 모든 레코드 가져오기
-        records = table.all()
+        # Active 필드가 빈 값이므로 필터링 없이 모든 레코드 가져오기 (TTL 캐시)
+        records = cached_all('Emote Images')
         
         results = []
         for rec in records:
@@ -1164,7 +1367,7 @@ def get_images(field: str = "Images"):
             proxy_urls = []
             for i, file in enumerate(files):
                 if file.get("id"):
-                    proxy_url = f"/airtable/attachments/{record['id']}/images/{i}"
+                    proxy_url = attachment_proxy_url(record['id'], i, field)
                     proxy_urls.append(proxy_url)
             
             results.append({
@@ -1181,3 +1384,49 @@ def get_images(field: str = "Images"):
     except requests.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Airtable API 오류: {str(e)}")
 
+
+# ===== 첨부 이미지 프록시 (로컬 캐시) =====
+@router.get("/airtable/attachments/{record_id}/images/{index}")
+def get_attachment_image(record_id: str, index: int, request: Request, field: str = "Images",
+                         refresh: bool = False):
+    """
+    Airtable 첨부 이미지를 로컬 캐시(utils/attachment_cache)에서 응답
+    - 첫 요청에만 Airtable에서 내려받고 이후에는 디스크 파일을 스트리밍
+    - ETag(sha256) + If-None-Match → 304, Range 요청 → 206 부분 응답
+    - 테이블은 Post Data Requests 고정, field는 이미지 필드(attachment_cache.IMAGE_FIELDS)만 허용
+    - refresh=true: 레코드를 다시 확인해 이미지가 바뀌었으면 새로 받음 (ref당 ATTACHMENT_REFRESH_MIN_SEC에 1번)
+    - 래스터 이미지가 아닌 첨부(html/svg 등)는 application/octet-stream + nosniff로 내려받기만 허용
+    """
+    from fastapi.responses import FileResponse, Response
+    from utils import attachment_cache
+
+    if field not in attachment_cache.IMAGE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"허용되지 않은 필드입니다: {field}")
+    try:
+        item = attachment_cache.resolve(record_id, field, index, table=attachment_cache.DEFAULT_TABLE,
+                                        force=refresh)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"첨부 이미지 조회 실패: {e}")
+
+    media_type = attachment_cache.serve_type(item["content_type"])
+    etag = f'"{item["sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400", "X-Content-Type-Options": "nosniff"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match and (if_none_match.strip() == "*"
+                          or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        item["path"],
+        media_type=media_type,
+        headers=headers,
+        filename=item.get("filename") or None,
+        content_disposition_type="inline" if media_type.startswith("image/") else "attachment",
+    )
+
+@router.get("/api/airtable/attachments/cache")
+async def get_attachment_cache_stats():
+    """첨부 이미지 캐시 통계 (hit/다운로드/URL 재발급/삭제, 사용 용량)"""
+    from utils import attachment_cache
+    return {"status": "success", **attachment_cache.stats()}
@@ -0,0 +1,31 @@
+# llm 패키지 - 공용 LLM 클라이언트
+from llm.client import (
+    DEFAULT_STAGE_CONFIGS,
+    DeadlineExceeded,
+    LLMClient,
+    StageConfig,
+    agenerate,
+    deadline_scope,
+    generate,
+    get_model,
+    metrics_snapshot,
+    stage_config,
+    time_left,
+)
+from llm.cache import cache_enabled, cache_stats
+
+__all__ = [
+    "DEFAULT_STAGE_CONFIGS",
+    "DeadlineExceeded",
+    "LLMClient",
+    "StageConfig",
+    "agenerate",
+    "cache_enabled",
+    "cache_stats",
+    "deadline_scope",
+    "generate",
+    "get_model",
+    "metrics_snapshot",
+    "stage_config",
+    "time_left",
+]
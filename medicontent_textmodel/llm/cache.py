@@ -0,0 +1,172 @@
+# llm/cache.py
+# -*- coding: utf-8 -*-
+"""
+LLM 응답 캐시 (내용 주소 기반 · 디스크 저장)
+- 키: sha256(모델 + 생성 설정 + 최종 프롬프트)
+- 저장: cache/llm/{key[:2]}/{key}.json  (LLM_CACHE_DIR로 변경 가능)
+- 정리: 최근 사용 순(LRU, 파일 mtime) 기준으로 용량(LLM_CACHE_MAX_MB) / 보관기간(LLM_CACHE_MAX_AGE_DAYS) 초과분 삭제
+- 사용 여부 (opt-in)
+    LLM_CACHE=off                → 전체 비활성
+    LLM_CACHE=on                 → 모든 단계 활성
+    LLM_CACHE_STAGES=plan,title  → 지정 단계만 활성 (all 가능)
+    기본값: test 모드에서 결정적 단계(evaluation, title_select)만 활성
+            — 실제 설정이 temperature 0일 때만 (LLM_{STAGE}_TEMPERATURE로 올리면 자동 제외)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", str(ROOT_DIR / "cache" / "llm")))
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+MAX_AGE_SEC = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "7")) * 86400
+EVICT_EVERY = 50  # 쓰기 N회마다 정리
+
+DETERMINISTIC_STAGES = ("evaluation", "title_select")
+
+
+def _deterministic(config) -> bool:
+    return config is None or config.temperature == 0
+
+
+def cache_enabled(stage: str, mode: Optional[str] = None, config=None) -> bool:
+    flag = os.getenv("LLM_CACHE", "auto").strip().lower()
+    if flag in ("off", "0", "false", "no"):
+        return False
+    if flag in ("on", "1", "true", "yes"):
+        return True
+    stages = {s.strip() for s in os.getenv("LLM_CACHE_STAGES", "").split(",") if s.strip()}
+    if "all" in stages or stage in stages:
+        return True
+    return mode == "test" and stage in DETERMINISTIC_STAGES and _deterministic(config)
+
+
+def cache_key(config, prompt: str) -> str:
+    payload = json.dumps({"config": asdict(config), "prompt": prompt}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.writes_since_evict = 0
+
+    def bump(self, stage: str, field: str):
+        with self._lock:
+            s = self.stages.setdefault(stage, {"hits": 0, "misses": 0, "writes": 0})
+            s[field] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for name, s in self.stages.items():
+                total = s["hits"] + s["misses"]
+                stages[name] = {**s, "hit_rate": round(s["hits"] / total, 3) if total else 0.0}
+            return {"stages": stages, "evictions": self.evictions}
+
+
+stats = _Stats()
+_evict_lock = threading.Lock()
+
+
+def _path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def get(key: str, stage: str) -> Optional[str]:
+    p = _path(key)
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+        if MAX_AGE_SEC and time.time() - data.get("created_at", 0) > MAX_AGE_SEC:
+            p.unlink(missing_ok=True)
+            raise FileNotFoundError(p)
+        os.utime(p)  # LRU: 최근 사용 시각 갱신
+        stats.bump(stage, "hits")
+        return data["text"]
+    except (FileNotFoundError, ValueError, KeyError, OSError):
+        stats.bump(stage, "misses")
+        return None
+
+
+def put(key: str, stage: str, text: str, model: str = ""):
+    p = _path(key)
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({
+            "stage": stage,
+            "model": model,
+            "created_at": time.time(),
+            "text": text,
+        }, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+        stats.bump(stage, "writes")
+    except OSError as e:
+        print(f"⚠️ LLM 캐시 저장 실패: {e}")
+        return
+
+    with stats._lock:
+        stats.writes_since_evict += 1
+        due = stats.writes_since_evict >= EVICT_EVERY
+        if due:
+            stats.writes_since_evict = 0
+    if due:
+        evict()
+
+
+def evict() -> int:
+    """보관기간 초과 → 삭제, 이후 용량 초과 시 오래 안 쓴 순서로 삭제"""
+    if not CACHE_DIR.exists():
+        return 0
+    with _evict_lock:
+        now = time.time()
+        entries = []
+        removed = 0
+        for p in CACHE_DIR.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if MAX_AGE_SEC and now - st.st_mtime > MAX_AGE_SEC:
+                p.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        if total > MAX_BYTES:
+            for _, size, p in sorted(entries):
+                p.unlink(missing_ok=True)
+                removed += 1
+                total -= size
+                if total <= MAX_BYTES:
+                    break
+        with stats._lock:
+            stats.evictions += removed
+        return removed
+
+
+def clear() -> int:
+    removed = 0
+    for p in CACHE_DIR.glob("*/*.json"):
+        p.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def cache_stats() -> Dict[str, Any]:
+    snap = stats.snapshot()
+    snap.update({
+        "dir": str(CACHE_DIR),
+        "max_mb": round(MAX_BYTES / 1024 / 1024, 1),
+        "max_age_days": round(MAX_AGE_SEC / 86400, 2),
+    })
+    return snap
@@ -0,0 +1,360 @@
+# llm/client.py
+# -*- coding: utf-8 -*-
+"""
+공용 LLM(Gemini) 클라이언트
+- 단계(stage)별 모델/temperature 설정: plan, title, title_select, content, evaluation
+  환경변수로 덮어쓰기 → LLM_{STAGE}_MODEL, LLM_{STAGE}_TEMPERATURE, LLM_{STAGE}_MAX_TOKENS
+- GenerativeModel은 (모델, 생성 설정) 조합별로 1번만 만들고 재사용
+- 재시도/백오프 정책 공통화 (LLM_MAX_RETRIES, LLM_RETRY_DELAY)
+- 호출별 지연시간/토큰 사용량 집계 → metrics_snapshot()
+- 동기 generate / 비동기 agenerate
+- 응답 캐시(llm/cache.py): 단계/모드별 opt-in, 같은 모델·설정·프롬프트면 재호출 없이 반환
+- 데드라인(deadline_scope): 블록 안의 호출은 남은 시간을 요청 timeout으로 쓰고,
+  남은 시간으로 감당 못 하는 재시도/대기는 하지 않고 DeadlineExceeded로 즉시 종료
+- 동시 호출 상한(LLM_MAX_CONCURRENCY, 프로세스 전역): 배치/병렬 섹션/동시 작업이 겹쳐도 API 호출 수 제한
+- 스트리밍: on_token 콜백을 주면 stream=True로 호출해 조각(chunk)마다 전달, 반환값은 전체 텍스트
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace, asdict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from llm import cache as llm_cache
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class StageConfig:
+    model: str
+    temperature: Optional[float] = None       # None이면 모델 기본값
+    max_output_tokens: Optional[int] = None
+    top_p: Optional[float] = None
+    top_k: Optional[int] = None
+
+    def generation_config(self) -> Optional[Dict[str, Any]]:
+        cfg = {
+            "temperature": self.temperature,
+            "max_output_tokens": self.max_output_tokens,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+        }
+        cfg = {k: v for k, v in cfg.items() if v is not None}
+        if not cfg:
+            return None
+        cfg["candidate_count"] = 1
+        return cfg
+
+
+# 기존 에이전트별 GeminiClient 설정을 그대로 옮긴 기본값
+DEFAULT_STAGE_CONFIGS: Dict[str, StageConfig] = {
+    "plan": StageConfig("models/gemini-1.5-flash", 0.7, 8192, 0.95, 40),
+    "title": StageConfig("models/gemini-1.5-flash", 0.7, 2048, 0.95, 40),
+    # 선택/채점 단계는 greedy(temperature 0, top_k 1)로 고정 → 같은 입력이면 같은 결과 (응답 캐시 기본 대상)
+    "title_select": StageConfig("models/gemini-1.5-flash", 0.0, 2048, 1.0, 1),
+    "content": StageConfig("models/gemini-1.5-flash", 0.65, 4096, 0.95, 40),
+    "evaluation": StageConfig("gemini-1.5-pro", 0.0, None, 1.0, 1),
+}
+
+
+def stage_config(stage: str) -> StageConfig:
+    """단계 기본 설정 + 환경변수 덮어쓰기"""
+    base = DEFAULT_STAGE_CONFIGS.get(stage) or DEFAULT_STAGE_CONFIGS["content"]
+    prefix = f"LLM_{stage.upper()}_"
+    overrides: Dict[str, Any] = {}
+    if os.getenv(prefix + "MODEL"):
+        overrides["model"] = os.getenv(prefix + "MODEL")
+    if os.getenv(prefix + "TEMPERATURE"):
+        overrides["temperature"] = float(os.getenv(prefix + "TEMPERATURE"))
+    if os.getenv(prefix + "MAX_TOKENS"):
+        overrides["max_output_tokens"] = int(os.getenv(prefix + "MAX_TOKENS"))
+    return replace(base, **overrides) if overrides else base
+
+
+# ===== 모델 레지스트리 =====
+_configured = False
+_models: Dict[Tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def _ensure_configured():
+    global _configured
+    if _configured:
+        return
+    with _lock:
+        if _configured:
+            return
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY가 필요합니다(.env)")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _configured = True
+
+
+def get_model(config: StageConfig):
+    """(모델, 생성 설정) 조합별 GenerativeModel 캐시"""
+    key = tuple(asdict(config).items())
+    model = _models.get(key)
+    if model is None:
+        _ensure_configured()
+        import google.generativeai as genai
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(config.model, generation_config=config.generation_config())
+                _models[key] = model
+    return model
+
+
+# ===== 메트릭 =====
+class _Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, latency: float, ok: bool, retries: int,
+               prompt_tokens: int = 0, output_tokens: int = 0):
+        with self._lock:
+            m = self._stages.setdefault(stage, {
+                "calls": 0, "errors": 0, "retries": 0,
+                "latency_total_sec": 0.0, "latency_max_sec": 0.0,
+                "prompt_tokens": 0, "output_tokens": 0,
+            })
+            m["calls"] += 1
+            m["errors"] += 0 if ok else 1
+            m["retries"] += retries
+            m["latency_total_sec"] += latency
+            m["latency_max_sec"] = max(m["latency_max_sec"], latency)
+            m["prompt_tokens"] += prompt_tokens
+            m["output_tokens"] += output_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for stage, m in self._stages.items():
+                d = dict(m)
+                d["latency_avg_sec"] = round(m["latency_total_sec"] / m["calls"], 3) if m["calls"] else 0.0
+                d["latency_total_sec"] = round(m["latency_total_sec"], 3)
+                d["latency_max_sec"] = round(m["latency_max_sec"], 3)
+                out[stage] = d
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+metrics = _Metrics()
+
+
+def metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    return metrics.snapshot()
+
+
+def _usage(resp) -> Tuple[int, int]:
+    usage = getattr(resp, "usage_metadata", None)
+    if not usage:
+        return 0, 0
+    return (int(getattr(usage, "prompt_token_count", 0) or 0),
+            int(getattr(usage, "candidates_token_count", 0) or 0))
+
+
+def _extract_text(resp) -> str:
+    try:
+        text = getattr(resp, "text", None)
+    except Exception:
+        # 안전필터 등으로 text 접근 자체가 실패하는 경우 → 후보 파츠에서 복구
+        text = None
+    if text:
+        return text
+    if getattr(resp, "candidates", None):
+        parts = getattr(resp.candidates[0].content, "parts", []) or []
+        text = "".join(getattr(p, "text", "") for p in parts if getattr(p, "text", ""))
+        if text:
+            return text
+    raise ValueError("응답에 text 없음")
+
+
+def _chunk_text(chunk) -> str:
+    try:
+        return getattr(chunk, "text", "") or ""
+    except Exception:
+        return ""
+
+
+# ===== 데드라인 =====
+class DeadlineExceeded(TimeoutError):
+    """데드라인 안에 LLM 호출을 끝낼 수 없음 → 호출 측에서 fallback으로 전환"""
+
+
+# time.monotonic() 기준 절대 시각 (None이면 제한 없음)
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    블록 안의 generate 호출에 데드라인 적용 (바깥 scope가 더 이르면 바깥 기준)
+    - contextvar 기반 → 스레드풀에 넘길 때는 contextvars.copy_context().run으로 전달
+    """
+    outer = _deadline.get()
+    if deadline is None or (outer is not None and outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """현재 scope의 남은 시간(초), 데드라인이 없으면 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# ===== 호출 =====
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+RETRY_DELAY = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 0 이하면 제한 없음
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY) if MAX_CONCURRENCY > 0 else None
+
+
+@contextmanager
+def _call_slot(stage: str):
+    """전역 동시 호출 슬롯 확보 (데드라인이 있으면 남은 시간까지만 대기)"""
+    if _slots is None:
+        yield
+        return
+    left = time_left()
+    if not _slots.acquire(timeout=max(left, 0) if left is not None else None):
+        raise DeadlineExceeded(f"[{stage}] 동시 호출 슬롯 대기 중 데드라인 초과")
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def generate(prompt: str, stage: str = "content", temperature: Optional[float] = None,
+             config: Optional[StageConfig] = None, mode: Optional[str] = None,
+             on_token: Optional[Callable[[str], Any]] = None) -> str:
+    """
+    단계 설정으로 텍스트 생성 (재시도 + 지수 백오프 + 메트릭 기록)
+    mode: 파이프라인 모드(use|test) — 응답 캐시 기본 정책 판단용
+    on_token: 스트리밍 조각 콜백 (재시도 시 처음부터 다시 전달, 캐시 hit은 전체 텍스트 1번)
+    """
+    config = config or stage_config(stage)
+    if temperature is not None and temperature != config.temperature:
+        config = replace(config, temperature=temperature)
+
+    key = None
+    if llm_cache.cache_enabled(stage, mode, config):
+        key = llm_cache.cache_key(config, prompt)
+        cached = llm_cache.get(key, stage)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+    model = get_model(config)
+
+    t0 = time.time()
+    for attempt in range(MAX_RETRIES):
+        left = time_left()
+        if left is not None and left <= 0:
+            metrics.record(stage, time.time() - t0, False, attempt)
+            raise DeadlineExceeded(f"[{stage}] 데드라인 초과로 호출 중단 (시도 {attempt + 1}/{MAX_RETRIES})")
+        try:
+            with _call_slot(stage):
+                left = time_left()
+                kwargs: Dict[str, Any] = {} if left is None else {"request_options": {"timeout": max(left, 0.1)}}
+                if on_token is None:
+                    resp = model.generate_content(prompt, **kwargs)
+                    text = _extract_text(resp)
+                else:
+                    resp = model.generate_content(prompt, stream=True, **kwargs)
+                    pieces = []
+                    for chunk in resp:
+                        piece = _chunk_text(chunk)
+                        if piece:
+                            pieces.append(piece)
+                            on_token(piece)
+                    text = "".join(pieces)
+                    if not text:
+                        raise ValueError("응답에 text 없음")
+            metrics.record(stage, time.time() - t0, True, attempt, *_usage(resp))
+            if key:
+                llm_cache.put(key, stage, text, model=config.model)
+            return text
+        except DeadlineExceeded:
+            metrics.record(stage, time.time() - t0, False, attempt)
+            raise
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                metrics.record(stage, time.time() - t0, False, attempt)
+                raise
+            delay = RETRY_DELAY * (2 ** attempt)
+            left = time_left()
+            if left is not None and left <= delay:
+                # 대기 후 재시도할 시간이 없음 → 백오프로 데드라인을 넘기지 않고 바로 종료
+                metrics.record(stage, time.time() - t0, False, attempt)
+                raise DeadlineExceeded(f"[{stage}] 데드라인까지 {max(left, 0):.1f}s, 재시도 생략: {e}") from e
+            print(f"⚠️ Gemini 호출 실패 [{stage}] (시도 {attempt + 1}/{MAX_RETRIES}): {e}")
+            time.sleep(delay)
+
+    raise RuntimeError("모든 재시도 실패")
+
+
+async def agenerate(prompt: str, stage: str = "content", temperature: Optional[float] = None,
+                    config: Optional[StageConfig] = None, mode: Optional[str] = None) -> str:
+    """비동기 버전 (이벤트 루프를 막지 않도록 워커 스레드에서 실행)"""
+    return await asyncio.to_thread(generate, prompt, stage, temperature, config, mode)
+
+
+class LLMClient:
+    """
+    단계별 클라이언트 (기존 GeminiClient 자리 대체)
+    - generate / generate_text / agenerate
+    - model / temperature / max_output_tokens 속성은 결과 meta 기록용으로 유지
+    """
+
+    def __init__(self, stage: str, mode: Optional[str] = None):
+        self.stage = stage
+        self.mode = mode
+
+    @property
+    def config(self) -> StageConfig:
+        return stage_config(self.stage)
+
+    @property
+    def model(self) -> str:
+        return self.config.model
+
+    model_name = model
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return self.config.temperature
+
+    @property
+    def max_output_tokens(self) -> Optional[int]:
+        return self.config.max_output_tokens
+
+    def generate(self, prompt: str, temperature: Optional[float] = None, mode: Optional[str] = None,
+                 on_token: Optional[Callable[[str], Any]] = None) -> str:
+        return generate(prompt, stage=self.stage, temperature=temperature, mode=mode or self.mode,
+                        on_token=on_token)
+
+    generate_text = generate
+
+    async def agenerate(self, prompt: str, temperature: Optional[float] = None, mode: Optional[str] = None) -> str:
+        return await agenerate(prompt, stage=self.stage, temperature=temperature, mode=mode or self.mode)
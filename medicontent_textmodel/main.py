@@ -1,4 +1,7 @@
 # medicontent_textmodel/main.py - 수정된 버전
+import os
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -23,6 +26,22 @@ app.add_middleware(
 # routes.py의 라우터 등록 ⭐ 중요!
 app.include_router(routes.router)
 
+@app.on_event("startup")
+async def warmup_models():
+    """형태소 분석기(Kiwi) 미리 로딩 - 첫 SEO 평가 지연 방지 (KIWI_WARMUP=0이면 생략)"""
+    if os.getenv("KIWI_WARMUP", "1") == "0":
+        return
+
+    def _warmup():
+        try:
+            from evaluation_agent import warmup_kiwi
+            warmup_kiwi()
+        except Exception as e:
+            print(f"⚠️ Kiwi 워밍업 건너뜀: {e}")
+
+    # 서버 기동을 막지 않도록 백그라운드 스레드에서 로딩
+    threading.Thread(target=_warmup, name="kiwi-warmup", daemon=True).start()
+
 @app.get("/")
 async def root():
     return {"message": "MediContent TextModel API 실행 중!"}
@@ -0,0 +1,14 @@
+# tests/conftest.py
+# -*- coding: utf-8 -*-
+"""테스트 공통 설정 — 에이전트 모듈을 스크립트 실행과 같은 경로로 import"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "agents"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+# 모듈 import 시점에 키 존재만 확인 (테스트는 LLM을 호출하지 않음)
+os.environ.setdefault("GEMINI_API_KEY", "test")
@@ -0,0 +1,69 @@
+# tests/test_incremental_eval.py
+# -*- coding: utf-8 -*-
+"""문단 캐시 규칙 검사(rule_score_incremental) == 전체 텍스트 검사(rule_score_all)"""
+import random
+import re
+
+import pytest
+
+import evaluation_agent as ea
+
+# 문단 경계("\n\n")를 사이에 둔 조각 → \s* 패턴이 문단을 넘어 매치되는 경우
+TEXTS = [
+    ("임플란트 치료", "치료\n\n과정을 설명합니다.\n\n100\n\n% 만족"),
+    ("이벤트", "가\n\n이벤트\n\n가 안내\n\n부작용\n\n없음"),
+    ("전후 사진", "before\n\nafter\n\n![사진](a.png)\n\n<img src=x>"),
+    ("", "원\n\n부터 시작하는 가격\n\n\n\n리뷰\n\n 이벤트"),
+    ("제목", ""),
+]
+
+FRAGMENTS = ["치료", "과정", "결과", "100", "%", "할인", "이벤트", "가", "부작용", "없음", "없다",
+             "전후", "before", "after", "원", "부터", "리뷰", "작성", "시", "타", "병원", "공식", "인증",
+             "최고", "유일", "![a](b.png)", "<img src=x>", "가나다"]
+SEPARATORS = ["\n\n", "\n\n\n", "\n", " ", "", "  \n\n "]
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) + rng.choice(SEPARATORS) for _ in range(rng.randint(0, 30)))
+
+
+def _custom_patterns():
+    """문단을 넘는 \\s*, 줄 앵커, 전방 탐색 등 문단 단위로 나눌 수 없는 패턴 섞기"""
+    return {
+        1: [re.compile(p, re.I) for p in (r"치료\s*과정", r"100\s*%", r"(?m)^리뷰$", r"이벤트(?=\s*가)")],
+        2: [re.compile(p, re.I) for p in (r"부작용\s+없", r"\b전후\b", r"원.{0,3}부터", r"(?s)가.{0,4}나")],
+        3: [re.compile(p) for p in (r"공식\W*인증", r"[^가]\n\n가", r"후기|리뷰")],
+    }
+
+
+@pytest.fixture(scope="module")
+def medical_patterns():
+    return ea.evaluation_rules("medical").patterns
+
+
+@pytest.mark.parametrize("title,content", TEXTS)
+def test_medical_rules_match_full_scan(medical_patterns, title, content):
+    assert ea.rule_score_incremental(title, content, medical_patterns) == \
+        ea.rule_score_all(title, content, medical_patterns)
+
+
+@pytest.mark.parametrize("title,content", TEXTS)
+def test_spanning_patterns_match_full_scan(title, content):
+    pats = _custom_patterns()
+    assert ea.rule_score_incremental(title, content, pats) == ea.rule_score_all(title, content, pats)
+
+
+def test_random_edits_match_full_scan(medical_patterns):
+    """같은 패턴으로 연속 수정 → 캐시에 남은 문단과 새 문단이 섞여도 결과 동일"""
+    rng = random.Random(20240820)
+    custom = _custom_patterns()
+    content = _random_text(rng)
+    for _ in range(300):
+        paragraphs = content.split("\n\n")
+        i = rng.randrange(len(paragraphs))
+        paragraphs[i] = _random_text(rng)
+        content = "\n\n".join(paragraphs)
+        title = rng.choice(["", "치료", "이벤트 가", "100 %"])
+        for pats in (medical_patterns, custom):
+            assert ea.rule_score_incremental(title, content, pats) == \
+                ea.rule_score_all(title, content, pats), (title, content)
@@ -0,0 +1,68 @@
+# tests/test_phrase_lexicon.py
+# -*- coding: utf-8 -*-
+"""PhraseLexicon.count / sub == 패턴별 re.findall 개수 합 / 조합 정규식 re.sub"""
+import random
+import re
+
+import pytest
+
+from utils.phrase_lexicon import PhraseLexicon
+
+PATTERNS = [
+    "최고", "유일", "후기|경험담|리뷰", "100%", r"100\s*%", r"\b원\s*부터\b", r"부작용\s*없(음|다)",
+    r"\d{1,3}\s?%", "이벤트", r"이벤트\s*가", "before", r"\bafter\b", "İ", "ß",
+]
+
+WORDS = ["최고", "유일", "후기", "리뷰", "경험담", "100", "%", "원", "부터", "부작용", "없음", "없다",
+         "이벤트", "가", "before", "BEFORE", "After", "after", "İ", "ß", "SS", "가나", "12"]
+SEPARATORS = ["", " ", "\n", "\n\n", "  "]
+
+
+def _texts():
+    rng = random.Random(20240823)
+    for _ in range(400):
+        yield "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(rng.randint(0, 25)))
+
+
+@pytest.fixture(params=[False, True], ids=["case", "ignore_case"])
+def lexicon_and_patterns(request):
+    flags = re.I if request.param else 0
+    lexicon = PhraseLexicon()
+    lexicon.register("words", PATTERNS, ignore_case=request.param)
+    return lexicon, [re.compile(p, flags) for p in PATTERNS], flags
+
+
+def test_count_matches_findall(lexicon_and_patterns):
+    lexicon, compiled, _ = lexicon_and_patterns
+    for text in _texts():
+        assert lexicon.count("words", text) == sum(len(p.findall(text)) for p in compiled), text
+
+
+def test_sub_matches_combined_regex(lexicon_and_patterns):
+    lexicon, _, flags = lexicon_and_patterns
+    combined = re.compile("|".join(f"(?:{p})" for p in PATTERNS), flags)
+    for text in _texts():
+        assert lexicon.sub("words", text, "") == combined.sub("", text), text
+        assert lexicon.sub("words", text, lambda m: f"[{m.group(0)}]") == \
+            combined.sub(lambda m: f"[{m.group(0)}]", text), text
+
+
+def test_first_matches_match_search(lexicon_and_patterns):
+    lexicon, compiled, _ = lexicon_and_patterns
+    for text in _texts():
+        expected = [m.group(0) for m in (p.search(text) for p in compiled) if m]
+        assert lexicon.first_matches(text, ["words"])["words"] == expected, text
+
+
+def test_pattern_flags_are_kept():
+    """컴파일된 패턴 플래그 · 전역 인라인 플래그 · re.X 주석이 있어도 패턴 단독 re와 같은 결과"""
+    compiled = [re.compile(r"^리뷰$", re.M), re.compile(r"(?s)이벤트.가"),
+                re.compile(r"최 고  # 공백 무시", re.X), re.compile(r"before", re.I)]
+    lexicon = PhraseLexicon()
+    lexicon.register("flags", compiled)
+    expected = re.compile("(?m:^리뷰$)|(?s:이벤트.가)|(?x:최 고  # 공백 무시\n)|(?i:before)")
+    for text in _texts():
+        assert lexicon.count("flags", text) == sum(len(p.findall(text)) for p in compiled), text
+        assert lexicon.first_matches(text, ["flags"])["flags"] == \
+            [m.group(0) for m in (p.search(text) for p in compiled) if m], text
+        assert lexicon.sub("flags", text, "") == expected.sub("", text), text
@@ -0,0 +1,177 @@
+# utils/airtable_gateway.py
+"""
+Airtable 게이트웨이 (프로세스 공용)
+- pyairtable.Api 1개를 재사용 → 내부 requests.Session keep-alive로 TLS 핸드셰이크 재사용
+- Table 객체 캐시
+- 자주 바뀌지 않는 테이블('Hospital', 'Emote Images')은 TTL 캐시 + hit/miss 카운터
+- TTL은 환경변수 AIRTABLE_TTL_<TABLE> (예: AIRTABLE_TTL_HOSPITAL=600, 0이면 캐시 안 함)로 조정
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 테이블별 기본 TTL(초) — 목록에 없는 테이블은 캐시하지 않음
+DEFAULT_TABLE_TTLS: Dict[str, int] = {
+    "Hospital": 600,
+    "Emote Images": 600,
+}
+
+
+class TTLCache:
+    """키별 만료시간을 가진 단순 캐시 (스레드 안전 · hit/miss 카운트)"""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item and item[0] > time.time():
+                self.hits += 1
+                return True, item[1]
+            if item:
+                self._data.pop(key, None)
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_api = None
+_tables: Dict[str, Any] = {}
+_caches: Dict[str, TTLCache] = {}
+_lock = threading.Lock()
+
+
+def get_api():
+    """프로세스 공용 pyairtable.Api (연결 재사용)"""
+    global _api
+    if _api is None:
+        with _lock:
+            if _api is None:
+                api_key = os.getenv("AIRTABLE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("AIRTABLE_API_KEY 환경변수가 필요합니다(.env)")
+                from pyairtable import Api
+                _api = Api(api_key)
+    return _api
+
+
+def get_table(name: str):
+    """테이블 이름으로 Table 객체 반환 (base는 AIRTABLE_BASE_ID)"""
+    table = _tables.get(name)
+    if table is None:
+        base_id = os.getenv("AIRTABLE_BASE_ID")
+        if not base_id:
+            raise RuntimeError("AIRTABLE_BASE_ID 환경변수가 필요합니다(.env)")
+        table = get_api().table(base_id, name)
+        with _lock:
+            _tables[name] = table
+    return table
+
+
+def table_ttl(name: str) -> int:
+    env_key = "AIRTABLE_TTL_" + "".join(ch if ch.isalnum() else "_" for ch in name).upper()
+    val = os.getenv(env_key)
+    if val is not None:
+        try:
+            return int(val)
+        except ValueError:
+            pass
+    return DEFAULT_TABLE_TTLS.get(name, 0)
+
+
+def _cache_for(name: str) -> TTLCache:
+    cache = _caches.get(name)
+    if cache is None:
+        with _lock:
+            cache = _caches.setdefault(name, TTLCache(name))
+    return cache
+
+
+def cached_all(name: str, ttl: Optional[int] = None, **options) -> List[dict]:
+    """
+    table.all(**options) 결과를 TTL 동안 재사용
+    - ttl 미지정 시 테이블 기본값(table_ttl) 사용, 0이면 매번 조회
+    - 반환 리스트는 공유 캐시의 얕은 복사본이므로 레코드 dict는 수정하지 말 것
+    """
+    ttl = table_ttl(name) if ttl is None else ttl
+    cache = _cache_for(name)
+    key = tuple(sorted((k, repr(v)) for k, v in options.items()))
+    if ttl > 0:
+        hit, records = cache.get(key)
+        if hit:
+            return list(records)
+    else:
+        cache.misses += 1
+
+    records = get_table(name).all(**options)
+    cache.set(key, records, ttl)
+    return list(records)
+
+
+def cached_first(name: str, ttl: Optional[int] = None, **options) -> Optional[dict]:
+    """
+    table.first(**options) — maxRecords=1로 첫 페이지에서 바로 중단
+    - formula/fields 등 옵션 조합별로 TTL 캐시 (못 찾은 경우는 캐시하지 않음)
+    """
+    ttl = table_ttl(name) if ttl is None else ttl
+    cache = _cache_for(name)
+    key = ("first",) + tuple(sorted((k, repr(v)) for k, v in options.items()))
+    if ttl > 0:
+        hit, record = cache.get(key)
+        if hit:
+            return record
+    else:
+        cache.misses += 1
+
+    record = get_table(name).first(**options)
+    if record:
+        cache.set(key, record, ttl)
+    return record
+
+
+def invalidate(name: Optional[str] = None):
+    """테이블 캐시 무효화 (name 미지정 시 전체)"""
+    if name is None:
+        for cache in list(_caches.values()):
+            cache.invalidate()
+    elif name in _caches:
+        _caches[name].invalidate()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        "tables": {name: {**cache.stats(), "ttl": table_ttl(name)} for name, cache in _caches.items()},
+        "connected": _api is not None,
+    }
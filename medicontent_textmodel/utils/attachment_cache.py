@@ -0,0 +1,288 @@
+# utils/attachment_cache.py
+# -*- coding: utf-8 -*-
+"""
+Airtable 첨부 이미지 로컬 캐시 (/airtable/attachments/{record_id}/images/{i} 프록시용)
+- Airtable 첨부 URL은 서명 URL이라 몇 시간 뒤 만료 → 생성된 HTML의 이미지가 깨짐
+  → 첫 요청 때 1번만 내려받아 디스크에 저장하고 이후에는 로컬 파일로 응답
+- 저장 구조 (ATTACHMENT_CACHE_DIR, 기본 cache/attachments)
+    blobs/{sha256[:2]}/{sha256}            내용 주소 방식 → 같은 이미지는 1개만 저장, sha256 = ETag
+    refs/{record}.{field}.{index}.json     (레코드, 필드, 순번) → sha256 / attachment id / 파일명 / MIME
+- ref는 ATTACHMENT_REF_TTL_SEC(기본 600초)마다 레코드를 다시 읽어 확인
+    attachment id가 같으면 다시 받지 않음, 바뀌었으면(이미지 교체) 새로 받음
+    다운로드가 만료(403/410)로 실패하면 레코드를 다시 읽어 새 서명 URL로 1회 재시도
+    Airtable 조회가 실패하면 기존 파일로 응답 (stale)
+- 용량 제한: ATTACHMENT_CACHE_MAX_MB(기본 512) 초과 시 가장 오래 안 쓴 blob부터 삭제
+- 공개 프록시이므로 범위 제한
+    테이블은 DEFAULT_TABLE 고정, 필드는 IMAGE_FIELDS(convert_attachments_to_images가 만드는 이미지 필드)만 허용
+    force(refresh) 재확인은 ref당 ATTACHMENT_REFRESH_MIN_SEC(기본 60초)에 1번만
+    MIME은 SAFE_IMAGE_TYPES만 그대로 응답 (html/svg 등은 serve_type()이 application/octet-stream으로)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("ATTACHMENT_CACHE_DIR", str(ROOT_DIR / "cache" / "attachments")))
+MAX_BYTES = int(float(os.getenv("ATTACHMENT_CACHE_MAX_MB", "512")) * 1024 * 1024)
+REF_TTL_SEC = float(os.getenv("ATTACHMENT_REF_TTL_SEC", "600"))
+DOWNLOAD_TIMEOUT_SEC = float(os.getenv("ATTACHMENT_DOWNLOAD_TIMEOUT_SEC", "30"))
+REFRESH_MIN_SEC = float(os.getenv("ATTACHMENT_REFRESH_MIN_SEC", "60"))
+DEFAULT_TABLE = "Post Data Requests"
+IMAGE_FIELDS = ("Images", "Before Images", "Process Images", "After Images")
+SAFE_IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/avif",
+                    "image/heic", "image/heif")
+
+_EXPIRED_STATUS = (401, 403, 404, 410)
+
+
+class _UrlExpired(Exception):
+    """서명 URL 만료 (레코드를 다시 읽어 새 URL 발급 필요)"""
+
+_key_locks: Dict[Tuple, threading.Lock] = {}
+_lock = threading.Lock()
+_evict_lock = threading.Lock()
+_session = None
+_stats = {"hits": 0, "revalidated": 0, "downloads": 0, "refreshed_urls": 0,
+          "stale": 0, "evicted": 0, "bytes_downloaded": 0}
+
+
+def _safe(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(name))
+
+
+def _blob_path(sha: str) -> Path:
+    return CACHE_DIR / "blobs" / sha[:2] / sha
+
+
+def _ref_path(record_id: str, field: str, index: int) -> Path:
+    return CACHE_DIR / "refs" / f"{_safe(record_id)}.{_safe(field)}.{index}.json"
+
+
+def _http():
+    """다운로드용 공용 세션 (keep-alive)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+# ===== ref =====
+def _load_ref(record_id: str, field: str, index: int) -> Optional[dict]:
+    try:
+        return json.loads(_ref_path(record_id, field, index).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_ref(record_id: str, field: str, index: int, ref: dict) -> None:
+    try:
+        _write_atomic(_ref_path(record_id, field, index), json.dumps(ref, ensure_ascii=False).encode("utf-8"))
+    except OSError as e:
+        print(f"⚠️ 첨부 캐시 ref 저장 실패: {record_id}/{field}/{index} - {e}")
+
+
+def _served(ref: dict) -> Dict[str, Any]:
+    path = _blob_path(ref["sha256"])
+    try:
+        os.utime(path)  # LRU 기준 = 마지막 사용 시각
+    except OSError:
+        pass
+    return {**ref, "path": path}
+
+
+# ===== Airtable =====
+def _attachment(record_id: str, field: str, index: int, table: str) -> dict:
+    """레코드를 캐시 없이 다시 읽어 첨부 객체 반환 (서명 URL은 매번 새로 발급됨)"""
+    from utils.airtable_gateway import get_table
+
+    record = get_table(table).get(record_id)
+    files = (record or {}).get("fields", {}).get(field) or []
+    if not isinstance(files, list) or not 0 <= index < len(files) or not isinstance(files[index], dict):
+        raise LookupError(f"첨부 없음: {record_id} / {field} / {index}")
+    return files[index]
+
+
+def _attachment_url(att: dict) -> str:
+    if att.get("url"):
+        return att["url"]
+    thumbs = att.get("thumbnails") or {}
+    for size in ("full", "large", "small"):
+        if (thumbs.get(size) or {}).get("url"):
+            return thumbs[size]["url"]
+    return ""
+
+
+def _download(url: str) -> Tuple[str, int, str]:
+    """스트리밍 다운로드 → blob 저장, (sha256, size, content_type) 반환"""
+    resp = _http().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT_SEC)
+    try:
+        if resp.status_code != 200:
+            if resp.status_code in _EXPIRED_STATUS:
+                raise _UrlExpired(resp.status_code)
+            raise RuntimeError(f"다운로드 실패 HTTP {resp.status_code}")
+        tmp_dir = CACHE_DIR / "blobs"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp = tmp_dir / f".dl.{os.getpid()}.{threading.get_ident()}.tmp"
+        h = hashlib.sha256()
+        size = 0
+        with open(tmp, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=1 << 16):
+                if chunk:
+                    h.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        sha = h.hexdigest()
+        target = _blob_path(sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, target)
+        content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
+        return sha, size, content_type
+    finally:
+        resp.close()
+
+
+def _fetch(record_id: str, field: str, index: int, table: str, att: dict) -> dict:
+    """첨부 1개 다운로드 (서명 URL 만료 시 레코드 재조회 후 1회 재시도)"""
+    for attempt in range(2):
+        url = _attachment_url(att)
+        if not url:
+            raise LookupError(f"첨부 URL 없음: {record_id} / {field} / {index}")
+        try:
+            sha, size, content_type = _download(url)
+            break
+        except _UrlExpired as e:
+            if attempt:
+                raise RuntimeError(f"첨부 URL 만료 (재발급 후에도 HTTP {e.args[0]})")
+            _stats["refreshed_urls"] += 1
+            print(f"🔁 첨부 URL 만료(HTTP {e.args[0]}) → 레코드 재조회: {record_id}/{field}/{index}")
+            att = _attachment(record_id, field, index, table)
+    _stats["downloads"] += 1
+    _stats["bytes_downloaded"] += size
+    return {
+        "sha256": sha,
+        "size": size,
+        "content_type": att.get("type") or content_type or "application/octet-stream",
+        "filename": att.get("filename", ""),
+        "attachment_id": att.get("id", ""),
+        "checked_at": time.time(),
+    }
+
+
+# ===== 조회 =====
+def serve_type(content_type: str) -> str:
+    """응답 MIME — 래스터 이미지 외(text/html, image/svg+xml 등)는 브라우저가 실행하지 않도록 octet-stream"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type if content_type in SAFE_IMAGE_TYPES else "application/octet-stream"
+
+
+def resolve(record_id: str, field: str, index: int, table: str = DEFAULT_TABLE,
+            force: bool = False) -> Dict[str, Any]:
+    """
+    (레코드, 필드, 순번) 첨부의 로컬 파일 정보 반환
+    → {"path", "sha256", "size", "content_type", "filename", "attachment_id", "checked_at"}
+    - force=True면 ref TTL과 상관없이 레코드를 다시 확인 (마지막 확인 후 REFRESH_MIN_SEC 이내면 무시)
+    - 허용되지 않은 필드이거나 없는 첨부는 LookupError
+    """
+    if field not in IMAGE_FIELDS:
+        raise LookupError(f"허용되지 않은 첨부 필드: {field}")
+    key = (table, record_id, field, index)
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        ref = _load_ref(record_id, field, index)
+        has_blob = bool(ref) and _blob_path(ref["sha256"]).exists()
+        age = time.time() - ref.get("checked_at", 0) if ref else float("inf")
+        if force and age < REFRESH_MIN_SEC:
+            force = False
+        if has_blob and not force and age < REF_TTL_SEC:
+            _stats["hits"] += 1
+            return _served(ref)
+
+        try:
+            att = _attachment(record_id, field, index, table)
+        except LookupError:
+            raise
+        except Exception as e:
+            if has_blob:
+                _stats["stale"] += 1
+                print(f"⚠️ Airtable 조회 실패 → 캐시 파일로 응답: {record_id}/{field}/{index} - {e}")
+                return _served(ref)
+            raise
+
+        if has_blob and att.get("id") and att.get("id") == ref.get("attachment_id"):
+            ref["checked_at"] = time.time()
+            _save_ref(record_id, field, index, ref)
+            _stats["revalidated"] += 1
+            return _served(ref)
+
+        ref = _fetch(record_id, field, index, table, att)
+        _save_ref(record_id, field, index, ref)
+        print(f"✅ 첨부 캐시 저장: {record_id}/{field}/{index} ({ref['size'] / 1024:.1f}KB)")
+
+    evict()
+    return _served(ref)
+
+
+# ===== 용량 관리 =====
+def _blobs() -> List[Tuple[float, int, Path]]:
+    items = []
+    for p in (CACHE_DIR / "blobs").glob("*/*"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        items.append((st.st_mtime, st.st_size, p))
+    return items
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """총 용량이 max_bytes를 넘으면 오래 안 쓴 blob부터 삭제 (ref는 다음 조회 때 다시 받음)"""
+    limit = MAX_BYTES if max_bytes is None else max_bytes
+    if limit <= 0:
+        return 0
+    with _evict_lock:
+        items = _blobs()
+        total = sum(size for _, size, _ in items)
+        if total <= limit:
+            return 0
+        removed = 0
+        for _, size, path in sorted(items, key=lambda x: x[0]):
+            if total <= limit * 0.9:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+    if removed:
+        _stats["evicted"] += removed
+        print(f"🧹 첨부 캐시 {removed}개 삭제 (용량 제한 {limit / 1024 / 1024:.0f}MB)")
+    return removed
+
+
+def stats() -> Dict[str, Any]:
+    items = _blobs()
+    return {
+        **_stats,
+        "files": len(items),
+        "bytes": sum(size for _, size, _ in items),
+        "max_bytes": MAX_BYTES,
+        "refresh_min_sec": REFRESH_MIN_SEC,
+        "dir": str(CACHE_DIR),
+    }
@@ -0,0 +1,103 @@
+# utils/attachment_ready.py
+# -*- coding: utf-8 -*-
+"""
+첨부 이미지 준비 대기 (Post Data Requests)
+- InputAgent 직후 Airtable 레코드에 첨부 URL이 아직 안 붙었을 수 있음
+  → 고정 대기 대신 레코드를 다시 조회하며 기대한 이미지 수만큼 URL이 생기면 바로 반환
+- 조회 간격: ATTACHMENT_POLL_INITIAL_SEC에서 시작해 2배씩 증가 (최대 ATTACHMENT_POLL_MAX_INTERVAL_SEC)
+- 최대 대기: ATTACHMENT_WAIT_MAX_SEC (기본 30초, 0이면 1회만 조회)
+- 결과의 timing(시도 횟수/대기 시간/준비 여부)은 run 로그에 기록
+"""
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ATTACHMENT_WAIT_MAX_SEC = float(os.getenv("ATTACHMENT_WAIT_MAX_SEC", "30"))
+ATTACHMENT_POLL_INITIAL_SEC = float(os.getenv("ATTACHMENT_POLL_INITIAL_SEC", "0.5"))
+ATTACHMENT_POLL_MAX_INTERVAL_SEC = float(os.getenv("ATTACHMENT_POLL_MAX_INTERVAL_SEC", "5"))
+
+IMAGE_FIELDS = ("question3_visit_images", "question5_therapy_images", "question7_result_images")
+
+# convert_attachments_to_images가 URL을 못 찾았을 때 쓰는 프록시 경로 → 아직 준비 안 된 것으로 간주
+_PROXY_PREFIX = "/airtable/attachments/"
+
+
+def expected_counts(row: Optional[dict]) -> Dict[str, int]:
+    """input_log 엔트리의 이미지 필드별 개수 (0개인 필드는 제외)"""
+    row = row or {}
+    return {f: len(row.get(f) or []) for f in IMAGE_FIELDS if row.get(f)}
+
+
+def _ready_count(images) -> int:
+    return sum(
+        1 for img in images or []
+        if isinstance(img, dict) and img.get("url") and not str(img["url"]).startswith(_PROXY_PREFIX)
+    )
+
+
+def missing_counts(data: Optional[dict], expected: Dict[str, int]) -> Dict[str, int]:
+    """필드별 아직 URL이 없는 이미지 수 (빈 dict면 준비 완료)"""
+    data = data or {}
+    missing = {}
+    for field, count in expected.items():
+        lack = count - _ready_count(data.get(field))
+        if lack > 0:
+            missing[field] = lack
+    return missing
+
+
+def wait_for_attachments(fetch: Callable[[], Optional[dict]],
+                         expected: Dict[str, int],
+                         max_wait: Optional[float] = None,
+                         initial_interval: Optional[float] = None,
+                         max_interval: Optional[float] = None) -> Tuple[Optional[dict], Dict[str, Any]]:
+    """
+    fetch()로 레코드를 다시 조회하며 expected의 이미지 URL이 모두 생길 때까지 대기
+    - 준비되면 즉시 반환, max_wait을 넘기면 마지막 조회 결과로 반환 (ready=False)
+    - fetch 예외는 해당 시도 실패로만 보고 다음 시도 진행
+    Returns:
+        (마지막 조회 결과, timing)
+    """
+    max_wait = ATTACHMENT_WAIT_MAX_SEC if max_wait is None else max_wait
+    interval = ATTACHMENT_POLL_INITIAL_SEC if initial_interval is None else initial_interval
+    max_interval = ATTACHMENT_POLL_MAX_INTERVAL_SEC if max_interval is None else max_interval
+
+    t0 = time.monotonic()
+    deadline = t0 + max(0.0, max_wait)
+    attempts = 0
+    data: Optional[dict] = None
+    missing: Dict[str, int] = dict(expected)
+    last_error = ""
+
+    while True:
+        attempts += 1
+        try:
+            fetched = fetch()
+            if fetched:
+                data = fetched
+                missing = missing_counts(data, expected)
+        except Exception as e:
+            last_error = str(e)
+            print(f"⚠️ 첨부 조회 실패 (시도 {attempts}): {e}")
+
+        if data is not None and not missing:
+            break
+        left = deadline - time.monotonic()
+        if left <= 0:
+            break
+        pending = ", ".join(f"{k} {v}개" for k, v in missing.items()) or "레코드 없음"
+        print(f"⏳ 첨부 URL 대기 중 (시도 {attempts}, 미준비: {pending}) → {min(interval, left):.1f}s 후 재조회")
+        time.sleep(min(interval, left))
+        interval = min(interval * 2, max_interval)
+
+    timing = {
+        "ready": data is not None and not missing,
+        "attempts": attempts,
+        "waited_sec": round(time.monotonic() - t0, 3),
+        "max_wait_sec": max_wait,
+        "expected": dict(expected),
+        "missing": missing,
+    }
+    if last_error and not timing["ready"]:
+        timing["error"] = last_error
+    return data, timing
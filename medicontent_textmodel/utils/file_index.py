@@ -0,0 +1,204 @@
+# utils/file_index.py
+# -*- coding: utf-8 -*-
+"""
+파일명 인덱스 (프로세스 공용) — 이미지 파일 찾기용
+- 루트 디렉터리들을 1번만 훑어서 파일명(소문자) → 경로 목록 인덱스 생성
+  → 이미지마다 rglob("*")으로 작업 디렉터리 전체를 다시 훑지 않음
+- test_logs / cache / .git / 가상환경 등 EXCLUDE_DIRS는 색인하지 않음
+- 최신 상태 유지: 디렉터리 mtime 확인 (FILE_INDEX_CHECK_SEC 간격, 기본 1초)
+    파일 추가/삭제/이름 변경은 부모 디렉터리 mtime을 바꾸므로 바뀐 디렉터리만 다시 나열
+    조회 결과가 없으면 간격과 상관없이 1번 더 확인 (방금 복사한 파일 대비)
+"""
+import fnmatch
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+CHECK_INTERVAL_SEC = float(os.getenv("FILE_INDEX_CHECK_SEC", "1"))
+EXCLUDE_DIRS = {
+    ".git", "__pycache__", "test_logs", "cache", ".cache", "node_modules",
+    "venv", ".venv", "seper_env", ".idea", ".vscode",
+}
+
+
+class FileIndex:
+    """루트 디렉터리들 아래 파일의 (소문자 파일명 → 경로) 인덱스"""
+
+    def __init__(self, roots: Iterable, exclude_dirs: Optional[Set[str]] = None):
+        self.roots: Tuple[str, ...] = tuple(os.path.abspath(r) for r in roots)
+        self.exclude_dirs = set(EXCLUDE_DIRS if exclude_dirs is None else exclude_dirs)
+        self._dirs: Dict[str, int] = {}          # 디렉터리 → mtime_ns
+        self._files: Dict[str, List[str]] = {}   # 디렉터리 → 파일명 목록
+        self._subdirs: Dict[str, List[str]] = {}  # 디렉터리 → 하위 디렉터리 목록
+        self._by_name: Dict[str, Set[str]] = {}  # 소문자 파일명 → 경로
+        self._checked = 0.0
+        self._lock = threading.RLock()
+        self.stats = {"scans": 0, "rescanned_dirs": 0, "lookups": 0}
+        self._build()
+
+    # ----- 색인 -----
+    def _build(self) -> None:
+        with self._lock:
+            self._dirs.clear()
+            self._files.clear()
+            self._subdirs.clear()
+            self._by_name.clear()
+            for root in self.roots:
+                if os.path.isdir(root) and root not in self._dirs:
+                    self._add_tree(root)
+            self._checked = time.monotonic()
+            self.stats["scans"] += 1
+
+    def _list_dir(self, directory: str) -> bool:
+        """디렉터리 1개를 나열해 파일/하위 디렉터리 기록 (하위는 재귀하지 않음)"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            return False
+        files, subdirs = [], []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.exclude_dirs:
+                        subdirs.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+        for name in self._files.get(directory, []):
+            paths = self._by_name.get(name.lower())
+            if paths is not None:
+                paths.discard(os.path.join(directory, name))
+                if not paths:
+                    del self._by_name[name.lower()]
+        for name in files:
+            self._by_name.setdefault(name.lower(), set()).add(os.path.join(directory, name))
+        self._dirs[directory] = mtime_ns
+        self._files[directory] = files
+        self._subdirs[directory] = subdirs
+        return True
+
+    def _add_tree(self, directory: str) -> None:
+        stack = [directory]
+        while stack:
+            d = stack.pop()
+            if d in self._dirs or not self._list_dir(d):
+                continue
+            stack.extend(self._subdirs[d])
+
+    def _remove_tree(self, directory: str) -> None:
+        stack = [directory]
+        while stack:
+            d = stack.pop()
+            if d not in self._dirs:
+                continue
+            for name in self._files.pop(d, []):
+                paths = self._by_name.get(name.lower())
+                if paths is not None:
+                    paths.discard(os.path.join(d, name))
+                    if not paths:
+                        del self._by_name[name.lower()]
+            stack.extend(self._subdirs.pop(d, []))
+            self._dirs.pop(d, None)
+
+    def refresh(self, force: bool = False) -> int:
+        """mtime이 바뀐 디렉터리만 다시 나열 → 다시 나열한 디렉터리 수"""
+        with self._lock:
+            if not force and time.monotonic() - self._checked < CHECK_INTERVAL_SEC:
+                return 0
+            changed = 0
+            for directory, mtime_ns in list(self._dirs.items()):
+                if directory not in self._dirs:
+                    continue  # 앞에서 상위 디렉터리와 함께 제거됨
+                try:
+                    current = os.stat(directory).st_mtime_ns
+                except OSError:
+                    self._remove_tree(directory)
+                    changed += 1
+                    continue
+                if current == mtime_ns:
+                    continue
+                before = set(self._subdirs.get(directory, []))
+                self._list_dir(directory)
+                after = set(self._subdirs.get(directory, []))
+                for gone in before - after:
+                    self._remove_tree(gone)
+                for new in after - before:
+                    self._add_tree(new)
+                changed += 1
+            for root in self.roots:
+                if root not in self._dirs and os.path.isdir(root):
+                    self._add_tree(root)
+                    changed += 1
+            self._checked = time.monotonic()
+            self.stats["rescanned_dirs"] += changed
+            return changed
+
+    # ----- 조회 -----
+    def _lookup(self, filename: str) -> List[str]:
+        with self._lock:
+            return list(self._by_name.get(filename.lower(), ()))
+
+    def find_all(self, filename: str) -> List[Path]:
+        """파일명(대소문자 무시)이 같은 파일 전체"""
+        self.stats["lookups"] += 1
+        filename = Path(filename).name
+        if not filename:
+            return []
+        self.refresh()
+        hits = self._lookup(filename)
+        if not hits and self.refresh(force=True):
+            hits = self._lookup(filename)
+        return [Path(p) for p in hits]
+
+    def find(self, filename: str) -> Optional[Path]:
+        """파일명이 같은 파일 중 가장 최근에 수정된 것"""
+        best, best_mtime = None, None
+        for p in self.find_all(filename):
+            try:
+                mtime = p.stat().st_mtime
+            except OSError:
+                continue
+            if best_mtime is None or mtime > best_mtime:
+                best, best_mtime = p, mtime
+        return best
+
+    def match(self, pattern: str, directory=None) -> List[Path]:
+        """glob 패턴(대소문자 구분)에 맞는 파일 (directory 지정 시 그 디렉터리 바로 아래만, 이름순)"""
+        self.stats["lookups"] += 1
+        self.refresh()
+        with self._lock:
+            if directory is not None:
+                d = os.path.abspath(directory)
+                if d not in self._dirs:
+                    self.refresh(force=True)
+                names = [os.path.join(d, n) for n in self._files.get(d, [])]
+            else:
+                names = [os.path.join(d, n) for d, files in self._files.items() for n in files]
+        return sorted(Path(p) for p in names if fnmatch.fnmatchcase(os.path.basename(p), pattern))
+
+
+# ===== 공용 인덱스 =====
+_indexes: Dict[Tuple, FileIndex] = {}
+_lock = threading.Lock()
+
+
+def get_index(roots: Iterable) -> FileIndex:
+    """같은 루트 조합이면 프로세스 안에서 인덱스 1개를 공유"""
+    roots = tuple(roots)
+    key = tuple(os.path.abspath(r) for r in roots)
+    index = _indexes.get(key)
+    if index is None:
+        with _lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = FileIndex(roots)
+    return index
+
+
+def stats() -> Dict[str, Dict]:
+    return {", ".join(key): {**idx.stats, "dirs": len(idx._dirs), "names": len(idx._by_name)}
+            for key, idx in _indexes.items()}
@@ -0,0 +1,127 @@
+# utils/image_fingerprint.py
+# -*- coding: utf-8 -*-
+"""
+이미지 지문(fingerprint) 캐시 — content_agent 이미지 중복 제거용
+- Airtable 첨부: attachment id가 곧 지문 → 파일 I/O 없음
+- URL(http/https, /airtable/attachments 프록시): 내용을 읽지 않음 → None (호출 측이 경로로 대체)
+- 로컬 파일: (정규화 절대경로, size, mtime_ns) → 내용 해시
+    1MB 단위 스트리밍 blake2b, 메모리 캐시 + SQLite(WAL) 영속 캐시
+    → 같은 파일은 프로세스/실행이 바뀌어도 다시 읽지 않음, 파일이 바뀌면(size/mtime) 새로 계산
+- 캐시 경로: IMAGE_FINGERPRINT_DB (기본 cache/image_fingerprints.sqlite3)
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DB_PATH = Path(os.getenv("IMAGE_FINGERPRINT_DB", str(ROOT_DIR / "cache" / "image_fingerprints.sqlite3")))
+CHUNK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    path     TEXT    NOT NULL PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT    NOT NULL
+);
+"""
+
+_REMOTE_PREFIXES = ("http://", "https://", "/airtable/attachments/")
+
+_memory: Dict[str, Tuple[int, int, str]] = {}
+_local = threading.local()
+_stats = {"hits": 0, "db_hits": 0, "hashed": 0, "attachments": 0, "remote": 0, "missing": 0}
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """스레드별 연결 (영속 캐시를 못 쓰면 None → 메모리 캐시만 사용)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        return conn
+    try:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+    except sqlite3.Error as e:
+        print(f"⚠️ 이미지 지문 캐시 DB 사용 불가 → 메모리 캐시만 사용: {e}")
+        conn = None
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def _hash_file(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _local_fingerprint(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        _stats["missing"] += 1
+        return None
+    key = os.path.normcase(os.path.abspath(path))
+    size, mtime_ns = st.st_size, st.st_mtime_ns
+
+    item = _memory.get(key)
+    if item is not None and item[:2] == (size, mtime_ns):
+        _stats["hits"] += 1
+        return item[2]
+
+    conn = _connect()
+    if conn is not None:
+        try:
+            row = conn.execute("SELECT size, mtime_ns, digest FROM fingerprints WHERE path = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row and tuple(row[:2]) == (size, mtime_ns):
+            _memory[key] = (size, mtime_ns, row[2])
+            _stats["db_hits"] += 1
+            return row[2]
+
+    try:
+        digest = _hash_file(path)
+    except OSError:
+        _stats["missing"] += 1
+        return None
+    _memory[key] = (size, mtime_ns, digest)
+    _stats["hashed"] += 1
+    if conn is not None:
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                             (key, size, mtime_ns, digest))
+        except sqlite3.Error as e:
+            print(f"⚠️ 이미지 지문 캐시 저장 실패: {e}")
+    return digest
+
+
+def fingerprint(path: str, attachment_id: str = "") -> Optional[str]:
+    """
+    이미지 지문 반환 ("att:{id}" / "hash:{digest}")
+    - URL이거나 파일을 읽을 수 없으면 None
+    """
+    if attachment_id:
+        _stats["attachments"] += 1
+        return f"att:{attachment_id}"
+    path = (path or "").strip()
+    if not path:
+        return None
+    if path.lower().startswith(_REMOTE_PREFIXES):
+        _stats["remote"] += 1
+        return None
+    digest = _local_fingerprint(path)
+    return f"hash:{digest}" if digest else None
+
+
+def stats() -> Dict[str, int]:
+    return {**_stats, "memory_entries": len(_memory)}
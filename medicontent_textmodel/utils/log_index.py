@@ -0,0 +1,309 @@
+# utils/log_index.py
+# -*- coding: utf-8 -*-
+"""
+input_log 인덱스 (SQLite · WAL)
+- test_logs/{mode}/{YYYYMMDD}/*_input_log(s).json(l) 엔트리를 1행씩 색인
+- InputAgent.save_log / update_log 직후 index_file()로 해당 파일만 다시 색인
+- 조회: postId / case_id / 날짜별 최신 엔트리 → 인덱스 1회 조회 (디렉터리 전체 스캔 없음)
+- 목록: (date, mtime, file, entry) 내림차순 커서 페이지네이션
+- 조회 결과는 파일 mtime과 대조 → 지워졌거나 외부에서 수정된 파일은 자동 재색인
+- 조회 결과가 없으면 로그 파일 목록(stat)과 인덱스를 대조해 누락/변경된 파일만 재색인 후 다시 조회
+  → index_file 실패(경고만 남김)로 빠진 엔트리도 다음 조회 때 복구됨
+- 인덱스 DB가 처음 만들어질 때 기존 로그 트리를 자동 백필
+- 수동 재구축: python -m utils.log_index --rebuild
+"""
+
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.log_store import INPUT_LOG_PATTERNS, load_log
+
+LOG_ROOT = Path(os.getenv("LOG_ROOT", "test_logs"))
+INDEX_PATH = Path(os.getenv("LOG_INDEX_PATH", str(LOG_ROOT / "log_index.sqlite3")))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS input_logs (
+    file_path   TEXT    NOT NULL,
+    entry_index INTEGER NOT NULL,   -- 배열 내 위치 (단일 dict 파일은 -1)
+    mode        TEXT    NOT NULL,
+    date        TEXT    NOT NULL,   -- 날짜 폴더명 (YYYYMMDD)
+    case_id     TEXT,
+    post_id     TEXT,
+    file_mtime  REAL    NOT NULL,
+    payload     TEXT    NOT NULL,
+    PRIMARY KEY (file_path, entry_index)
+);
+CREATE INDEX IF NOT EXISTS idx_input_logs_post ON input_logs (mode, post_id, date, file_mtime);
+CREATE INDEX IF NOT EXISTS idx_input_logs_case ON input_logs (mode, case_id, date, file_mtime);
+CREATE INDEX IF NOT EXISTS idx_input_logs_order ON input_logs (mode, date, file_mtime, file_path, entry_index);
+"""
+
+_ORDER = "ORDER BY date DESC, file_mtime DESC, file_path DESC, entry_index DESC"
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+# ===== 연결 =====
+def _connect() -> sqlite3.Connection:
+    """스레드별 연결 (첫 생성 시 스키마 + 백필)"""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        return conn
+
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with _init_lock:
+        is_new = not INDEX_PATH.exists()
+        conn = sqlite3.connect(str(INDEX_PATH), timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not _initialized or is_new:
+            conn.executescript(_SCHEMA)
+            _initialized = True
+    _local.conn = conn
+    _local.pid = os.getpid()
+
+    if is_new:
+        count = rebuild()
+        print(f"✅ 로그 인덱스 생성 및 백필 완료: {count}개 엔트리 ({INDEX_PATH})")
+    return conn
+
+
+def _key(path: Path) -> str:
+    """저장 키: 작업 디렉터리 기준 상대경로 (save_log가 쓰는 경로와 동일)"""
+    path = Path(path)
+    if path.is_absolute():
+        try:
+            path = path.relative_to(Path.cwd())
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def _mode_and_date(path: Path) -> Tuple[str, str]:
+    return path.parent.parent.name, path.parent.name
+
+
+def _read_entries(path: Path) -> List[Tuple[int, dict]]:
+    data = load_log(path)
+    if isinstance(data, list):
+        return [(i, e) for i, e in enumerate(data) if isinstance(e, dict)]
+    if isinstance(data, dict):
+        return [(-1, data)]
+    return []
+
+
+# ===== 색인 =====
+def _index_file(conn: sqlite3.Connection, path: Path) -> int:
+    key = _key(path)
+    try:
+        mtime = path.stat().st_mtime
+        entries = _read_entries(path)
+    except FileNotFoundError:
+        conn.execute("DELETE FROM input_logs WHERE file_path = ?", (key,))
+        return 0
+    mode, date = _mode_and_date(path)
+    conn.execute("DELETE FROM input_logs WHERE file_path = ?", (key,))
+    conn.executemany(
+        "INSERT INTO input_logs (file_path, entry_index, mode, date, case_id, post_id, file_mtime, payload) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (key, idx, mode, date, entry.get("case_id"), entry.get("postId"), mtime,
+             json.dumps(entry, ensure_ascii=False))
+            for idx, entry in entries
+        ],
+    )
+    return len(entries)
+
+
+def index_file(path) -> int:
+    """로그 파일 1개 재색인 (저장 경로를 막지 않도록 실패는 경고만)"""
+    try:
+        conn = _connect()
+        with conn:
+            return _index_file(conn, Path(path))
+    except Exception as e:
+        print(f"⚠️ 로그 인덱스 갱신 실패: {path} - {e}")
+        return 0
+
+
+def remove_file(path):
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM input_logs WHERE file_path = ?", (_key(Path(path)),))
+
+
+def rebuild(log_root: Optional[Path] = None) -> int:
+    """로그 트리 전체를 다시 색인 (기존 행은 모두 삭제)"""
+    root = Path(log_root) if log_root else LOG_ROOT
+    conn = _connect()
+    count = 0
+    with conn:
+        conn.execute("DELETE FROM input_logs")
+        if root.exists():
+            for mode_dir in sorted(d for d in root.iterdir() if d.is_dir()):
+                for date_dir in sorted(d for d in mode_dir.iterdir()
+                                       if d.is_dir() and d.name.isdigit() and len(d.name) == 8):
+                    for pattern in INPUT_LOG_PATTERNS:
+                        for log_file in date_dir.glob(pattern):
+                            try:
+                                count += _index_file(conn, log_file)
+                            except Exception as e:
+                                print(f"⚠️ 로그 파일 색인 실패: {log_file} - {e}")
+    return count
+
+
+# ===== 조회 =====
+def _fresh(conn: sqlite3.Connection, file_path: str, file_mtime: float) -> bool:
+    """색인 시점 이후 파일이 지워졌거나 바뀌었으면 재색인하고 False"""
+    path = Path(file_path)
+    try:
+        if path.stat().st_mtime == file_mtime:
+            return True
+    except FileNotFoundError:
+        pass
+    with conn:
+        _index_file(conn, path)
+    return False
+
+
+def reconcile(mode: str, date: Optional[str] = None) -> int:
+    """
+    디스크의 로그 파일과 인덱스 대조 → 색인 안 됐거나 mtime이 다른 파일만 재색인 (재색인한 파일 수)
+    - 파일 내용은 읽지 않고 stat만 비교 (바뀐 파일만 파싱)
+    """
+    mode_dir = LOG_ROOT / mode
+    if not mode_dir.exists():
+        return 0
+    if date:
+        date_dirs = [mode_dir / date]
+    else:
+        date_dirs = [d for d in mode_dir.iterdir() if d.is_dir() and d.name.isdigit() and len(d.name) == 8]
+
+    conn = _connect()
+    sql = "SELECT file_path, MAX(file_mtime) FROM input_logs WHERE mode = ?"
+    params: List[Any] = [mode]
+    if date:
+        sql += " AND date = ?"
+        params.append(date)
+    indexed = dict(conn.execute(sql + " GROUP BY file_path", params).fetchall())
+
+    stale = []
+    for date_dir in date_dirs:
+        if not date_dir.is_dir():
+            continue
+        for pattern in INPUT_LOG_PATTERNS:
+            for log_file in date_dir.glob(pattern):
+                try:
+                    mtime = log_file.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if indexed.get(_key(log_file)) != mtime:
+                    stale.append(log_file)
+    for log_file in stale:
+        try:
+            with conn:
+                _index_file(conn, log_file)
+        except Exception as e:
+            print(f"⚠️ 로그 파일 색인 실패: {log_file} - {e}")
+    if stale:
+        print(f"🔁 로그 인덱스 보정: {len(stale)}개 파일 재색인 ({mode}{'/' + date if date else ''})")
+    return len(stale)
+
+
+def find_latest(mode: str, case_id: Optional[str] = None, post_id: Optional[str] = None,
+                date: Optional[str] = None) -> Optional[Tuple[dict, str, int]]:
+    """
+    case_id 또는 postId가 일치하는 최신 엔트리 → (entry, file_path, entry_index)
+    - 기존 파일 스캔과 같은 순서: 최신 날짜 → 최신 파일 → 배열 뒤쪽 엔트리
+    - 인덱스에 없으면 reconcile()로 디스크와 대조한 뒤 1번 더 조회 (색인 실패로 빠진 엔트리 대비)
+    """
+    conds = []
+    params: List[Any] = [mode]
+    if case_id:
+        conds.append("case_id = ?")
+        params.append(case_id)
+    if post_id:
+        conds.append("post_id = ?")
+        params.append(post_id)
+    if not conds:
+        return None
+    sql = f"SELECT file_path, entry_index, file_mtime, payload FROM input_logs WHERE mode = ? AND ({' OR '.join(conds)})"
+    if date:
+        sql += " AND date = ?"
+        params.append(date)
+    sql += f" {_ORDER} LIMIT 1"
+
+    conn = _connect()
+    reconciled = False
+    for _ in range(5):
+        row = conn.execute(sql, params).fetchone()
+        if row is None:
+            if reconciled or not reconcile(mode, date):
+                return None
+            reconciled = True
+            continue
+        file_path, entry_index, file_mtime, payload = row
+        if _fresh(conn, file_path, file_mtime):
+            return json.loads(payload), file_path, entry_index
+    return None
+
+
+def _encode_cursor(row: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(row)).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple:
+    try:
+        date, mtime, file_path, entry_index = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return date, float(mtime), file_path, int(entry_index)
+    except Exception:
+        raise ValueError(f"잘못된 cursor: {cursor}")
+
+
+def list_entries(mode: str, limit: int = 50,
+                 cursor: Optional[str] = None) -> Tuple[List[Tuple[dict, str, int]], Optional[str]]:
+    """
+    최신순 엔트리 목록 → ([(entry, file_path, entry_index), ...], next_cursor)
+    - next_cursor가 None이면 마지막 페이지
+    """
+    sql = "SELECT date, file_mtime, file_path, entry_index, payload FROM input_logs WHERE mode = ?"
+    params: List[Any] = [mode]
+    if cursor:
+        sql += " AND (date, file_mtime, file_path, entry_index) < (?, ?, ?, ?)"
+        params.extend(_decode_cursor(cursor))
+    sql += f" {_ORDER} LIMIT ?"
+    params.append(limit + 1)
+
+    rows = _connect().execute(sql, params).fetchall()
+    next_cursor = _encode_cursor(rows[limit - 1][:4]) if len(rows) > limit and limit > 0 else None
+    return [(json.loads(r[4]), r[2], r[3]) for r in rows[:limit]], next_cursor
+
+
+def stats() -> Dict[str, Any]:
+    conn = _connect()
+    rows = conn.execute("SELECT mode, COUNT(*), COUNT(DISTINCT file_path) FROM input_logs GROUP BY mode").fetchall()
+    return {
+        "path": str(INDEX_PATH),
+        "modes": {mode: {"entries": n, "files": files} for mode, n, files in rows},
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="input_log 인덱스 관리")
+    ap.add_argument("--rebuild", action="store_true", help="로그 트리 전체를 다시 색인")
+    ap.add_argument("--root", default="", help="로그 루트 (기본: test_logs)")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        n = rebuild(Path(args.root) if args.root else None)
+        print(f"✅ 로그 인덱스 재구축 완료: {n}개 엔트리 ({INDEX_PATH})")
+    print(json.dumps(stats(), ensure_ascii=False, indent=2))
@@ -0,0 +1,162 @@
+# utils/log_store.py
+# -*- coding: utf-8 -*-
+"""
+input_log 파일 저장소
+- 신규 로그: *_input_logs.jsonl (한 줄 = 엔트리 1개) → append는 파일 끝에 1줄 추가 (O(1))
+- 수정: 임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 항상 완전한 파일만 봄)
+- 쓰기는 날짜 폴더 단위 파일 잠금(fcntl / msvcrt) → uvicorn 워커 여러 개가 동시에 써도 유실 없음
+- 읽기: .jsonl / 기존 *_input_logs.json, *_input_log.json(배열 또는 dict) 모두 지원
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Union
+
+# 최신 규격 우선
+INPUT_LOG_PATTERNS = ("*_input_logs.jsonl", "*_input_logs.json", "*_input_log.json")
+INPUT_LOG_SUFFIX = "_input_logs.jsonl"
+LOCK_NAME = ".input_logs.lock"
+
+
+# ===== 잠금 =====
+@contextmanager
+def file_lock(path: Path):
+    """path가 속한 폴더의 잠금 파일로 프로세스 간 배타 잠금"""
+    lock_path = Path(path).parent / LOCK_NAME
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+# ===== 읽기 =====
+def _is_jsonl(path: Path) -> bool:
+    return Path(path).suffix == ".jsonl"
+
+
+def load_log(path: Path) -> Union[List[dict], dict]:
+    """
+    로그 파일 내용 반환 (기존 json.load 결과와 같은 모양)
+    - .jsonl → 엔트리 리스트 (쓰는 중인 마지막 줄처럼 깨진 줄은 건너뜀)
+    - .json  → 배열 또는 dict 그대로
+    """
+    path = Path(path)
+    if not _is_jsonl(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(item, dict):
+                entries.append(item)
+    return entries
+
+
+def read_entries(path: Path) -> List[dict]:
+    """엔트리 리스트로 통일해서 반환 (단일 dict 파일은 1개짜리 리스트)"""
+    data = load_log(path)
+    if isinstance(data, list):
+        return [e for e in data if isinstance(e, dict)]
+    if isinstance(data, dict):
+        return [data]
+    return []
+
+
+def latest_entry(path: Path) -> Optional[dict]:
+    """배열이면 마지막 원소, dict면 그대로"""
+    data = load_log(path)
+    if isinstance(data, list) and data:
+        return data[-1]
+    if isinstance(data, dict):
+        return data
+    return None
+
+
+def glob_input_logs(directory: Path, recursive: bool = False) -> List[Path]:
+    """신규(.jsonl)/기존(.json) input_log 파일 목록"""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    finder = directory.rglob if recursive else directory.glob
+    hits: List[Path] = []
+    for pattern in INPUT_LOG_PATTERNS:
+        hits.extend(finder(pattern))
+    return hits
+
+
+# ===== 쓰기 =====
+def _dump_line(item: dict) -> str:
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def append_entry(path: Path, item: dict):
+    """엔트리 1개 추가 (.jsonl은 1줄 append, 기존 .json 배열은 잠금 후 교체)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(path):
+        if _is_jsonl(path):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(_dump_line(item))
+                f.flush()
+            return
+        entries = read_entries(path) if path.exists() else []
+        entries.append(item)
+        _replace(path, entries)
+
+
+def _replace(path: Path, entries: Iterable[Any]):
+    """임시 파일 작성 후 os.replace (원자적 교체) — 잠금 안에서 호출"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        if _is_jsonl(path):
+            f.writelines(_dump_line(e) for e in entries)
+        else:
+            json.dump(list(entries), f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def update_entries(path: Path, fn: Callable[[List[dict]], bool]) -> bool:
+    """
+    잠금 → 읽기 → fn(entries)로 제자리 수정 → 원자적 교체
+    - fn이 True를 반환할 때만 저장 (동시 update 간 유실 방지)
+    """
+    path = Path(path)
+    with file_lock(path):
+        if not path.exists():
+            return False
+        entries = read_entries(path)
+        if not fn(entries):
+            return False
+        _replace(path, entries)
+        return True
@@ -0,0 +1,159 @@
+# utils/paragraph_cache.py
+# -*- coding: utf-8 -*-
+"""
+문단 단위 계산 캐시 — 국소 수정(apply_patches) 후 재평가용
+- 본문을 빈 줄("\\n\\n") 기준 문단으로 나누고 문단 내용 해시별로 계산 결과를 저장
+  → 패치가 문단 2개만 바꿨으면 그 2개만 다시 계산, 나머지는 캐시 재사용
+- ParagraphCache: 스레드 안전 LRU (EVAL_PARAGRAPH_CACHE_MAX, 기본 4096 문단)
+    없는 문단만 모아 compute_batch 1회 호출 (Kiwi.tokenize처럼 묶어서 처리하는 계산용)
+- diff(): 수정 전/후 문단 목록 비교 → 바뀐(추가) 문단 / 사라진 문단
+- line_local(): 정규식 매치가 줄바꿈을 넘지 않고 앞뒤 문맥(^, $, 전후방 탐색)에 영향받지 않는지
+    → True면 문단별 검사 결과를 합친 값 = 전체 텍스트 검사 결과
+"""
+import difflib
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+SEP = "\n\n"
+CACHE_MAX = int(os.getenv("EVAL_PARAGRAPH_CACHE_MAX", "4096"))
+
+
+def split(text: str) -> List[str]:
+    """빈 줄 기준 문단 목록 (SEP.join(split(t)) == t)"""
+    return (text or "").split(SEP)
+
+
+def digest(paragraph: str) -> str:
+    return hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def diff(before: str, after: str) -> Tuple[List[str], List[str]]:
+    """수정 전/후 문단 비교 → (바뀌거나 추가된 문단, 사라진 문단) — 공백뿐인 문단은 제외"""
+    a, b = split(before), split(after)
+    changed: List[str] = []
+    removed: List[str] = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        removed.extend(p for p in a[i1:i2] if p.strip())
+        changed.extend(p for p in b[j1:j2] if p.strip())
+    return changed, removed
+
+
+class ParagraphCache:
+    """문단 해시 → 계산 결과 LRU"""
+
+    def __init__(self, max_entries: int = CACHE_MAX):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_many(self, paragraphs: Sequence[str],
+                 compute_batch: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """문단별 결과 (캐시에 없는 문단만 compute_batch로 한 번에 계산, 같은 문단은 1번만)"""
+        keys = [digest(p) for p in paragraphs]
+        found: Dict[str, Any] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._items:
+                    self._items.move_to_end(k)
+                    found[k] = self._items[k]
+        missing: Dict[str, str] = {}
+        for k, p in zip(keys, paragraphs):
+            if k not in found:
+                missing.setdefault(k, p)
+        self.stats["hits"] += len(keys) - sum(1 for k in keys if k in missing)
+        self.stats["misses"] += len(missing)
+        if missing:
+            values = compute_batch(list(missing.values()))
+            with self._lock:
+                for k, v in zip(missing, values):
+                    found[k] = self._items[k] = v
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+        return [found[k] for k in keys]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# ===== 정규식 분석 =====
+_NL = ord("\n")
+_LOCAL_AT = {"AT_BOUNDARY", "AT_NON_BOUNDARY", "AT_UNI_BOUNDARY", "AT_UNI_NON_BOUNDARY",
+             "AT_LOC_BOUNDARY", "AT_LOC_NON_BOUNDARY"}
+
+
+def _class_has_newline(items) -> bool:
+    negate, hit = False, False
+    for op, av in items:
+        name = str(op)
+        if name == "NEGATE":
+            negate = True
+        elif name == "LITERAL":
+            hit = hit or av == _NL
+        elif name == "RANGE":
+            hit = hit or av[0] <= _NL <= av[1]
+        elif name == "CATEGORY":
+            # \s, \D, \W 및 줄바꿈 범주는 '\n'을 포함 (\S, \d, \w는 포함 안 함)
+            cat = str(av)
+            hit = hit or ("SPACE" in cat and "NOT_SPACE" not in cat) or "NOT_DIGIT" in cat \
+                or "NOT_WORD" in cat or cat.endswith("_LINEBREAK")
+        else:
+            return True  # 알 수 없는 구성요소 → 보수적으로 '넘을 수 있음'
+    return hit != negate
+
+
+def _local(parsed, dotall: bool) -> bool:
+    for op, av in parsed:
+        name = str(op)
+        if name == "LITERAL":
+            if av == _NL:
+                return False
+        elif name == "NOT_LITERAL":
+            if av != _NL:
+                return False
+        elif name == "ANY":
+            if dotall:
+                return False
+        elif name == "IN":
+            if _class_has_newline(av):
+                return False
+        elif name == "AT":
+            if str(av) not in _LOCAL_AT:
+                return False
+        elif name == "BRANCH":
+            if not all(_local(sub, dotall) for sub in av[1]):
+                return False
+        elif name == "SUBPATTERN":
+            _, add_flags, del_flags, sub = av
+            sub_dotall = (dotall or bool(add_flags & re.S)) and not del_flags & re.S
+            if not _local(sub, sub_dotall):
+                return False
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            if not _local(av[2], dotall):
+                return False
+        elif name == "ATOMIC_GROUP":
+            if not _local(av, dotall):
+                return False
+        else:
+            return False  # 전후방 탐색, 역참조, 조건부 그룹 등
+    return True
+
+
+def line_local(pattern: "re.Pattern") -> bool:
+    """매치가 '\\n'을 포함할 수 없고 \\b 외의 위치 조건이 없는 정규식인지"""
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return False
+    return _local(parsed, bool(parsed.state.flags & re.S))
@@ -0,0 +1,381 @@
+# utils/phrase_lexicon.py
+# -*- coding: utf-8 -*-
+"""
+금칙어/어뷰징 단어 목록 공용 매처
+- 여러 곳에서 패턴마다 따로 re.search / re.findall 하던 목록을 이름별로 등록해 한 번에 검사
+    title_forbidden (title_agent) / content_forbidden (content_agent) / seo_abusing (evaluation_agent)
+    의료법 체크리스트 규칙(BASE_PATTERNS + CSV 보강)은 체크리스트별 PhraseLexicon 인스턴스
+- 패턴 분류
+    리터럴(또는 리터럴만의 최상위 alternation, 예: "후기|경험담|리뷰") → 모든 목록이 공유하는 Aho-Corasick 자동자 1개
+    나머지 정규식(\\b, \\s*, \\d 등) → 패턴별 정규식 (목록 전체 조합 정규식은 sub용)
+        정규식마다 반드시 포함되는 리터럴을 뽑아 두고, 텍스트에 그 리터럴이 없으면 정규식을 실행하지 않음
+- 텍스트 1회 스캔으로 목록별 · 패턴별 매치 위치(span) 반환
+    패턴별 결과는 re.finditer와 동일 (가장 왼쪽 · alternation 순서 우선 · 겹치지 않게)
+    → re.search 첫 매치(first_matches) / 포함 여부(contains)와 같은 값
+    개수만 필요하면(counts) 단일 리터럴은 str.count로 셈 → re.findall 개수와 같은 값
+- 자동자: pyahocorasick이 설치돼 있으면 C 구현 사용, 없으면 리터럴별 str.find 스캔으로 대체 (결과 동일)
+- 대소문자 무시 패턴은 소문자 텍스트에서 찾음 (소문자 변환으로 길이가 바뀌는 텍스트는 정규식으로 처리)
+- 플래그: 컴파일된 패턴의 플래그(re.M, re.S 등)와 패턴 앞의 전역 인라인 플래그((?m) 등)는 패턴별로 유지
+    (조합 정규식에서는 (?ms:...) 같은 범위 플래그로 바꿔 묶음, re.X 패턴은 리터럴 사전 검사 안 함)
+"""
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import ahocorasick  # pyahocorasick (선택)
+except ImportError:
+    ahocorasick = None
+
+Span = Tuple[int, int]
+PatternLike = Union[str, "re.Pattern"]
+
+_META = set(".^$*+?{}[]|()")
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+_SCOPED_FLAGS = ((re.A, "a"), (re.I, "i"), (re.M, "m"), (re.S, "s"), (re.X, "x"))
+
+
+# ===== 패턴 분석 =====
+def _split_top(pattern: str) -> List[str]:
+    """최상위 '|' 기준 분리 (괄호/문자 클래스/이스케이프 안의 '|'는 무시)"""
+    parts, buf, depth, in_class, i = [], [], 0, False, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            buf.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            parts.append("".join(buf))
+            buf = []
+            i += 1
+            continue
+        buf.append(ch)
+        i += 1
+    parts.append("".join(buf))
+    return parts
+
+
+def _as_literal(pattern: str) -> Optional[str]:
+    """정규식 메타문자가 없는 패턴 → 리터럴 문자열 (아니면 None)"""
+    out, i = [], 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                return None  # \b, \d, \s 등
+            out.append(pattern[i + 1])
+            i += 2
+            continue
+        if ch in _META:
+            return None
+        out.append(ch)
+        i += 1
+    return "".join(out) or None
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    매치에 반드시 포함되는 가장 긴 리터럴 (최상위 alternation이 있으면 None)
+    예: r"부작용\\s*없(음|다)" → "부작용", r"\\b최고\\b" → "최고"
+    → 텍스트에 이 리터럴이 없으면 정규식 실행 생략
+    """
+    if len(_split_top(pattern)) > 1:
+        return None
+    runs: List[str] = []
+    buf: List[str] = []
+    depth, in_class, i, n = 0, False, 0, len(pattern)
+
+    def flush():
+        if buf:
+            runs.append("".join(buf))
+            buf.clear()
+
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < n:
+            if depth == 0 and not in_class and not pattern[i + 1].isalnum():
+                buf.append(pattern[i + 1])
+            else:
+                flush()
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            flush()
+            in_class = True
+        elif ch == "(":
+            flush()
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch in "?*{":
+            if buf:
+                buf.pop()  # 수량자가 붙은 앞 글자는 없어도 매치됨
+            flush()
+            if ch == "{":
+                close = pattern.find("}", i)
+                i = n if close == -1 else close
+        elif ch in "+.^$":
+            flush()
+        elif depth == 0:
+            buf.append(ch)
+        i += 1
+    flush()
+    return max(runs, key=len) if runs else None
+
+
+def _literal_alternatives(pattern: str) -> Optional[List[str]]:
+    alts = [_as_literal(p) for p in _split_top(pattern)]
+    return alts if all(alts) else None
+
+
+def _scoped(source: str, flags: int) -> str:
+    """전역 플래그를 범위 플래그로 바꾼 그룹 — '|'로 묶어도 패턴 단독과 같은 매치"""
+    end = 0
+    while True:
+        m = _GLOBAL_FLAGS.match(source, end)
+        if not m:
+            break
+        end = m.end()
+    letters = "".join(ch for flag, ch in _SCOPED_FLAGS if flags & flag)
+    tail = "\n" if flags & re.X else ""  # re.X 패턴 끝의 '#' 주석이 닫는 괄호를 삼키지 않도록
+    return f"(?{letters}:{source[end:]}{tail})"
+
+
+class _Pattern:
+    __slots__ = ("source", "ignore_case", "regex", "alts", "required")
+
+    def __init__(self, source: str, ignore_case: bool, flags: int = 0):
+        self.source = source
+        self.ignore_case = ignore_case
+        self.regex = re.compile(source, flags | (re.I if ignore_case else 0))
+        if self.regex.flags & re.X:
+            self.alts = self.required = None  # 공백/주석 무시 → 소스 그대로는 리터럴이 아님
+            return
+        alts = _literal_alternatives(source)
+        self.alts = [a.lower() for a in alts] if alts and ignore_case else alts
+        # 패턴 안의 전역 인라인 플래그((?i) 등)로 대소문자를 무시하는 경우는 사전 검사 안 함
+        required = None if alts or (self.regex.flags & re.I and not ignore_case) else _required_literal(source)
+        self.required = required.lower() if required and ignore_case else required
+
+    def absent(self, text: str, lowered: Optional[str]) -> bool:
+        """필수 리터럴이 텍스트에 없으면 True (정규식 실행 불필요)"""
+        if not self.required:
+            return False
+        if self.ignore_case:
+            return lowered is not None and self.required not in lowered
+        return self.required not in text
+
+
+def _leftmost(occurrences: List[Tuple[int, int, int]]) -> List[Span]:
+    """(start, alt 순번, end) 발생 목록 → finditer와 같은 겹치지 않는 매치"""
+    spans: List[Span] = []
+    last_end = 0
+    for start, _, end in sorted(occurrences):
+        if start >= last_end:
+            spans.append((start, end))
+            last_end = end
+    return spans
+
+
+# ===== 매처 =====
+class PhraseLexicon:
+    """이름별 패턴 목록 → 1회 스캔으로 목록별 · 패턴별 매치"""
+
+    def __init__(self):
+        self._lists: Dict[str, List[_Pattern]] = {}
+        self._combined: Dict[str, "re.Pattern"] = {}
+        self._automata: Optional[Dict[bool, object]] = None
+        self._lock = threading.Lock()
+
+    # ----- 등록 -----
+    def register(self, name: str, patterns: Iterable[PatternLike], ignore_case: bool = False) -> None:
+        """
+        목록 등록 (같은 이름이면 교체)
+        patterns: 정규식 문자열 또는 컴파일된 패턴 (컴파일된 패턴은 자체 re.I 플래그를 따름)
+        """
+        items: List[_Pattern] = []
+        for p in patterns:
+            if isinstance(p, re.Pattern):
+                items.append(_Pattern(p.pattern, bool(p.flags & re.I), p.flags))
+            elif p:
+                items.append(_Pattern(p, ignore_case))
+        combined = "|".join(_scoped(p.source, p.regex.flags) for p in items)
+        with self._lock:
+            self._lists[name] = items
+            self._combined[name] = re.compile(combined or r"(?!)")
+            self._automata = None
+
+    def names(self) -> List[str]:
+        return list(self._lists)
+
+    def combined(self, name: str) -> "re.Pattern":
+        """목록 전체를 '|'로 묶은 정규식 (re.sub 등 치환용)"""
+        return self._combined[name]
+
+    # ----- 자동자 -----
+    def _build(self) -> Dict[bool, object]:
+        """대소문자 구분 여부별 {리터럴: [(목록, 패턴 순번, alt 순번), ...]} + (있으면) Aho-Corasick"""
+        automata = self._automata
+        if automata is not None:
+            return automata
+        with self._lock:
+            if self._automata is not None:
+                return self._automata
+            table: Dict[bool, Dict[str, List[Tuple[str, int, int]]]] = {False: {}, True: {}}
+            for name, items in self._lists.items():
+                for pidx, p in enumerate(items):
+                    for aidx, lit in enumerate(p.alts or []):
+                        table[p.ignore_case].setdefault(lit, []).append((name, pidx, aidx))
+            automata = {}
+            for icase, words in table.items():
+                if ahocorasick is not None and words:
+                    A = ahocorasick.Automaton()
+                    for lit, payloads in words.items():
+                        A.add_word(lit, (len(lit), payloads))
+                    A.make_automaton()
+                    automata[icase] = (words, A)
+                else:
+                    automata[icase] = (words, None)
+            self._automata = automata
+            return automata
+
+    @staticmethod
+    def _occurrences(text: str, words: Dict[str, list], A, wanted: Optional[set], first_only: bool = False):
+        """
+        리터럴 발생 위치 전체(겹침 포함) → {(목록, 패턴 순번): [(start, alt, end)]}
+        first_only: 리터럴별 첫 발생만 (str.find 대체 경로에서 첫 매치만 필요할 때)
+        """
+        occ: Dict[Tuple[str, int], List[Tuple[int, int, int]]] = {}
+        if A is not None:
+            for end, (length, payloads) in A.iter(text):
+                start = end - length + 1
+                for name, pidx, aidx in payloads:
+                    if wanted is None or name in wanted:
+                        occ.setdefault((name, pidx), []).append((start, aidx, end + 1))
+            return occ
+        for lit, payloads in words.items():
+            targets = [pl for pl in payloads if wanted is None or pl[0] in wanted]
+            if not targets:
+                continue
+            pos = text.find(lit)
+            while pos != -1:
+                for name, pidx, aidx in targets:
+                    occ.setdefault((name, pidx), []).append((pos, aidx, pos + len(lit)))
+                pos = -1 if first_only else text.find(lit, pos + 1)
+        return occ
+
+    # ----- 조회 -----
+    def scan(self, text: str, names: Optional[Sequence[str]] = None,
+             first_only: bool = False) -> Dict[str, List[List[Span]]]:
+        """
+        text 1회 스캔 → {목록: [패턴별 매치 span 목록]} (패턴 순서는 등록 순서)
+        first_only: 패턴별 첫 매치만 (re.search와 같음)
+        """
+        text = text or ""
+        wanted = set(names) if names is not None else None
+        automata = self._build()
+        occ: Dict[Tuple[str, int], List[Tuple[int, int, int]]] = {}
+        occ.update(self._occurrences(text, *automata[False], wanted, first_only))
+        lowered = text.lower()
+        icase_ok = len(lowered) == len(text)
+        if icase_ok:
+            occ.update(self._occurrences(lowered, *automata[True], wanted, first_only))
+
+        result: Dict[str, List[List[Span]]] = {}
+        for name in (names if names is not None else self._lists):
+            spans_list: List[List[Span]] = []
+            for pidx, p in enumerate(self._lists[name]):
+                if p.alts is not None and (icase_ok or not p.ignore_case):
+                    spans = _leftmost(occ.get((name, pidx), []))
+                    spans_list.append(spans[:1] if first_only else spans)
+                elif p.absent(text, lowered if icase_ok else None):
+                    spans_list.append([])
+                elif first_only:
+                    m = p.regex.search(text)
+                    spans_list.append([m.span()] if m else [])
+                else:
+                    spans_list.append([m.span() for m in p.regex.finditer(text)])
+            result[name] = spans_list
+        return result
+
+    def counts(self, text: str, names: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """
+        목록별 매치 수 (패턴별 re.findall 개수의 합)
+        - 위치가 필요 없으므로 단일 리터럴 패턴은 str.count (겹치지 않는 개수 = findall 개수)
+        """
+        text = text or ""
+        lowered = text.lower()
+        icase_ok = len(lowered) == len(text)
+        result: Dict[str, int] = {}
+        for name in (names if names is not None else self._lists):
+            total = 0
+            for p in self._lists[name]:
+                if p.alts is not None and len(p.alts) == 1 and (icase_ok or not p.ignore_case):
+                    total += (lowered if p.ignore_case else text).count(p.alts[0])
+                elif not p.absent(text, lowered if icase_ok else None):
+                    total += sum(1 for _ in p.regex.finditer(text))
+            result[name] = total
+        return result
+
+    def count(self, name: str, text: str) -> int:
+        return self.counts(text, [name])[name]
+
+    def contains(self, name: str, text: str) -> bool:
+        return any(self.scan(text, [name], first_only=True)[name])
+
+    def first_matches(self, text: str, names: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+        """목록별 · 패턴별 첫 매치 문자열 (패턴마다 re.search(...).group(0)과 같음, 매치 없는 패턴은 제외)"""
+        text = text or ""
+        return {
+            name: [text[s[0][0]:s[0][1]] for s in spans if s]
+            for name, spans in self.scan(text, names, first_only=True).items()
+        }
+
+    def sub(self, name: str, text: str, repl: Union[str, Callable]) -> str:
+        """목록 전체 조합 정규식으로 치환 (매치가 없으면 정규식 실행 생략)"""
+        if not text or not self.contains(name, text):
+            return text
+        return self._combined[name].sub(repl, text)
+
+
+# ===== 공용 인스턴스 =====
+LEXICON = PhraseLexicon()
+
+
+def register(name: str, patterns: Iterable[PatternLike], ignore_case: bool = False) -> None:
+    LEXICON.register(name, patterns, ignore_case=ignore_case)
+
+
+def scan(text: str, names: Optional[Sequence[str]] = None) -> Dict[str, List[List[Span]]]:
+    return LEXICON.scan(text, names)
+
+
+def counts(text: str, names: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    return LEXICON.counts(text, names)
+
+
+def count(name: str, text: str) -> int:
+    return LEXICON.count(name, text)
+
+
+def contains(name: str, text: str) -> bool:
+    return LEXICON.contains(name, text)
+
+
+def sub(name: str, text: str, repl: Union[str, Callable]) -> str:
+    return LEXICON.sub(name, text, repl)
+
+
+def combined(name: str) -> "re.Pattern":
+    return LEXICON.combined(name)
@@ -0,0 +1,79 @@
+# utils/reference_registry.py
+# -*- coding: utf-8 -*-
+"""
+참조 데이터 레지스트리 (프로세스 공용)
+- persona_table.csv / select_data.csv / category_data.csv / test_hospital_info.json 등
+  요청마다 다시 읽던 파일을 (종류, 경로)별로 1번만 로드해서 공유
+- 파일 시그니처(mtime_ns, size)가 바뀌면 다음 조회 때 다시 로드
+- 반환값은 여러 요청이 같이 쓰는 공유 객체 → 읽기 전용으로 다룰 것
+  (수정이 필요하면 복사본을 만들어 파일에 쓰고 put()으로 교체)
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Signature = Optional[Tuple[int, int]]
+
+_entries: Dict[Tuple, Tuple[Signature, Any]] = {}
+_key_locks: Dict[Tuple, threading.Lock] = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "loads": 0}
+
+
+def file_signature(path) -> Signature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _key(kind: str, path, extra: Tuple) -> Tuple:
+    return (kind, os.path.abspath(path)) + tuple(extra)
+
+
+def get(kind: str, path, loader: Callable[[Path], Any], *extra) -> Any:
+    """
+    (kind, path, *extra)별 공유 값 반환
+    - 파일 시그니처가 같으면 캐시 그대로, 다르면 loader(path)로 다시 로드
+    - 같은 키의 동시 로드는 1번만 수행
+    """
+    key = _key(kind, path, extra)
+    sig = file_signature(path)
+    item = _entries.get(key)
+    if item is not None and item[0] == sig:
+        _stats["hits"] += 1
+        return item[1]
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        item = _entries.get(key)
+        sig = file_signature(path)
+        if item is not None and item[0] == sig:
+            _stats["hits"] += 1
+            return item[1]
+        value = loader(Path(path))
+        _entries[key] = (sig, value)
+        _stats["loads"] += 1
+        return value
+
+
+def put(kind: str, path, value: Any, *extra):
+    """직접 파일을 갱신한 뒤 새 값을 등록 (현재 시그니처 기준)"""
+    _entries[_key(kind, path, extra)] = (file_signature(path), value)
+
+
+def invalidate(kind: Optional[str] = None):
+    with _lock:
+        for key in list(_entries):
+            if kind is None or key[0] == kind:
+                _entries.pop(key, None)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "entries": sorted({key[0] for key in _entries}),
+    }
@@ -0,0 +1,124 @@
+# utils/table_cache.py
+# -*- coding: utf-8 -*-
+"""
+참조 테이블 바이너리 캐시
+- CSV/JSON 원본을 파싱한 결과(DataFrame, 트리 인덱스, 체크리스트 행 등)를 pickle(protocol 5)로 저장
+  → 다음 기동부터는 인코딩 판별/CSV 파싱 없이 바로 로드 (워커 여러 개가 같은 캐시 파일 공유)
+- 파일명: cache/tables/{원본 stem}.{kind}.{내용 해시}.v{버전}.pkl
+    내용 해시: 원본 바이트 blake2b → 체크아웃/복사로 mtime이 바뀌어도 재사용, 내용이 바뀌면 새 파일
+    버전: FORMAT_VERSION + 호출 측 builder 버전 → 파싱 로직이 바뀌면 올려서 무효화
+- 새 캐시를 쓸 때 같은 (stem, kind)의 이전 버전 파일은 자동 삭제
+- 캐시 경로는 TABLE_CACHE_DIR로 변경 가능, TABLE_CACHE=off면 항상 원본에서 빌드
+"""
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("TABLE_CACHE_DIR", str(ROOT_DIR / "cache" / "tables")))
+FORMAT_VERSION = 1
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "builds": 0, "removed": 0}
+
+
+def _enabled() -> bool:
+    return os.getenv("TABLE_CACHE", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def content_signature(path: Union[str, Path]) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _safe_stem(path: Path) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in path.stem)
+
+
+def cache_path(path: Union[str, Path], kind: str, version: Union[int, str] = 0,
+               cache_dir: Optional[Path] = None) -> Path:
+    path = Path(path)
+    d = Path(cache_dir) if cache_dir else CACHE_DIR
+    return d / f"{_safe_stem(path)}.{kind}.{content_signature(path)}.v{FORMAT_VERSION}-{version}.pkl"
+
+
+def _cleanup_superseded(current: Path, source: Path, kind: str) -> int:
+    removed = 0
+    for p in current.parent.glob(f"{_safe_stem(source)}.{kind}.*.pkl"):
+        if p != current:
+            try:
+                p.unlink()
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        _stats["removed"] += removed
+        print(f"🧹 이전 테이블 캐시 {removed}개 삭제 ({source.name}, {kind})")
+    return removed
+
+
+def cached_object(path: Union[str, Path], kind: str, builder: Callable[[Path], Any],
+                  version: Union[int, str] = 0, cache_dir: Optional[Path] = None) -> Any:
+    """
+    원본 파일(path)에서 builder(path)로 만든 객체를 캐시
+    - 원본이 없으면 builder 결과를 그대로 반환 (캐시 안 함)
+    - 캐시 읽기/쓰기 실패는 경고만 출력하고 원본 빌드로 진행
+    """
+    path = Path(path)
+    if not _enabled() or not path.exists():
+        return builder(path)
+
+    target = cache_path(path, kind, version, cache_dir)
+    if target.exists():
+        try:
+            with open(target, "rb") as f:
+                value = pickle.load(f)
+            _stats["hits"] += 1
+            return value
+        except Exception as e:
+            print(f"⚠️ 테이블 캐시 읽기 실패 → 다시 빌드: {target.name} - {e}")
+
+    value = builder(path)
+    _stats["builds"] += 1
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+        with _lock:
+            _cleanup_superseded(target, path, kind)
+    except OSError as e:
+        print(f"⚠️ 테이블 캐시 저장 실패: {target.name} - {e}")
+    return value
+
+
+def cached_table(path: Union[str, Path], reader: Callable[[Path], Any], version: Union[int, str] = 0,
+                 cache_dir: Optional[Path] = None):
+    """CSV → DataFrame 캐시 (reader는 read_csv_kr 등 원본 파서)"""
+    return cached_object(path, "table", reader, version=version, cache_dir=cache_dir)
+
+
+def remove_legacy(directory: Union[str, Path], pattern: str) -> int:
+    """이전 규격 캐시 파일 정리 (예: cache/{md5}.tree.pkl)"""
+    removed = 0
+    for p in Path(directory).glob(pattern):
+        try:
+            p.unlink()
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        _stats["removed"] += removed
+        print(f"🧹 이전 규격 캐시 {removed}개 삭제 ({directory}/{pattern})")
+    return removed
+
+
+def stats() -> Dict[str, Any]:
+    return {**_stats, "dir": str(CACHE_DIR)}